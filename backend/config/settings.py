@@ -161,6 +161,72 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Cache
+# Shared Redis cache in production so every worker sees the same listing
+# version and cached counts; per-process memory cache otherwise
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'holisticmatch',
+        }
+    }
+
+# Professional list counts: cached per filter set for this many seconds, and
+# above this many rows PostgreSQL's planner estimate replaces COUNT(*)
+PROFESSIONAL_COUNT_CACHE_TTL = config('PROFESSIONAL_COUNT_CACHE_TTL', default=30, cast=int)
+PROFESSIONAL_COUNT_ESTIMATE_THRESHOLD = config('PROFESSIONAL_COUNT_ESTIMATE_THRESHOLD', default=10000, cast=int)
+# Whole list responses, keyed per canonical request and listing version;
+# writes invalidate by bumping the version, the TTL only bounds memory
+PROFESSIONAL_LIST_CACHE_TTL = config('PROFESSIONAL_LIST_CACHE_TTL', default=300, cast=int)
+# Rendered detail responses, written through on updates and dropped on
+# deletes; the TTL only bounds memory
+PROFESSIONAL_DETAIL_CACHE_TTL = config('PROFESSIONAL_DETAIL_CACHE_TTL', default=3600, cast=int)
+PROFESSIONAL_FACET_CACHE_TTL = config('PROFESSIONAL_FACET_CACHE_TTL', default=60, cast=int)
+# Detail lookups of ids that don't exist, answered 404 from cache meanwhile
+PROFESSIONAL_NOT_FOUND_CACHE_TTL = config('PROFESSIONAL_NOT_FOUND_CACHE_TTL', default=30, cast=int)
+# Cache stampede protection (caching.single_flight): one request recomputes
+# an expired list page or facet set; the others serve the previous result,
+# kept this many seconds, or wait up to PROFESSIONAL_RECOMPUTE_WAIT for it.
+# The recompute lock expires after PROFESSIONAL_RECOMPUTE_LOCK_TIMEOUT
+PROFESSIONAL_STALE_CACHE_TTL = config('PROFESSIONAL_STALE_CACHE_TTL', default=3600, cast=int)
+PROFESSIONAL_RECOMPUTE_WAIT = config('PROFESSIONAL_RECOMPUTE_WAIT', default=2.0, cast=float)
+PROFESSIONAL_RECOMPUTE_LOCK_TIMEOUT = config('PROFESSIONAL_RECOMPUTE_LOCK_TIMEOUT', default=10, cast=int)
+# Processes reuse their copy of the listing version for this many seconds
+# instead of reading it on every cache lookup, so a write reaches other
+# processes' in-memory caches within this delay. Cache hit/miss counters
+# reach the shared cache every PROFESSIONAL_CACHE_STATS_FLUSH_INTERVAL seconds
+PROFESSIONAL_CACHE_VERSION_TTL = config('PROFESSIONAL_CACHE_VERSION_TTL', default=1.0, cast=float)
+PROFESSIONAL_CACHE_STATS_FLUSH_INTERVAL = config('PROFESSIONAL_CACHE_STATS_FLUSH_INTERVAL', default=10.0, cast=float)
+# Browser/proxy lifetime of the cities-per-state responses; they revalidate
+# by ETag afterwards, and the city table rarely changes
+CITY_CATALOG_MAX_AGE = config('CITY_CATALOG_MAX_AGE', default=86400, cast=int)
+
+# Shared-cache (CDN / reverse proxy) headers of public list and detail
+# responses, and the purger Professional writes call (see professionals/cdn.py)
+PROFESSIONAL_CACHE_MAX_AGE = config('PROFESSIONAL_CACHE_MAX_AGE', default=0, cast=int)
+PROFESSIONAL_CACHE_S_MAXAGE = config('PROFESSIONAL_CACHE_S_MAXAGE', default=60, cast=int)
+PROFESSIONAL_CACHE_STALE_WHILE_REVALIDATE = config('PROFESSIONAL_CACHE_STALE_WHILE_REVALIDATE', default=300, cast=int)
+PROFESSIONAL_SURROGATE_KEY_HEADER = config('PROFESSIONAL_SURROGATE_KEY_HEADER', default='Surrogate-Key')
+PROFESSIONAL_CDN_PURGER = config('PROFESSIONAL_CDN_PURGER', default='professionals.cdn.NullPurger')
+
+# In-memory bitmap search index for the professionals list (per worker process)
+# See professionals/search_index.py
+PROFESSIONAL_SEARCH_INDEX = config('PROFESSIONAL_SEARCH_INDEX', default=False, cast=bool)
+PROFESSIONAL_SEARCH_INDEX_TTL = config('PROFESSIONAL_SEARCH_INDEX_TTL', default=60, cast=int)
+
+# NumPy feature matrix behind /professionals/match/ (per worker process)
+# See professionals/matching.py
+PROFESSIONAL_MATCH_MATRIX_TTL = config('PROFESSIONAL_MATCH_MATRIX_TTL', default=60, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=config('JWT_ACCESS_TOKEN_LIFETIME', default=24, cast=int)),
@@ -251,6 +317,9 @@ if IS_PYTEST_TEST:
         }
     }
     
+    # Record CDN purges in professionals.cdn.purged
+    PROFESSIONAL_CDN_PURGER = 'professionals.cdn.LocMemPurger'
+
     # Faster password hashing for test speed
     PASSWORD_HASHERS = [
         'django.contrib.auth.hashers.MD5PasswordHasher',
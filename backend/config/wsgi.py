@@ -9,3 +9,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Build in-memory structures at worker start instead of on the first request
+import logging  # noqa: E402
+
+from professionals import matching, meta, search_index  # noqa: E402
+
+try:
+    meta.get_meta()  # builds the city catalog too
+    matching.get_matrix()
+    if search_index.is_enabled():
+        search_index.get_index()
+except Exception:
+    logging.getLogger(__name__).exception('In-memory warm-up failed; structures will build on first use')
@@ -0,0 +1,418 @@
+"""
+Caching helpers for the professionals app.
+
+The "listing version" is a counter in the shared cache bumped on every
+Professional save/delete. Cache keys for list-derived data embed it, so a
+write invalidates all of them at once without purging individual keys.
+List and detail responses are kept in two-tier caches (tiered_cache.py).
+"""
+import hashlib
+import hmac
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .tiered_cache import TieredCache, forget_version, read_version
+
+LISTING_VERSION_KEY = 'professionals:listing-version'
+
+# Seconds between checks while waiting for another caller's recompute
+RECOMPUTE_POLL_INTERVAL = 0.05
+
+# Parameters that select a page or its order rather than the result set
+PAGINATION_PARAMS = {'limit', 'offset', 'cursor', 'pagination', 'count', 'ordering'}
+
+# Opaque values that must not be case-folded (cursors are base64)
+CASE_SENSITIVE_PARAMS = {'cursor'}
+
+
+def _version_ttl():
+    return getattr(settings, 'PROFESSIONAL_CACHE_VERSION_TTL', 1)
+
+
+def get_listing_version():
+    """
+    Current listing version, re-read from the shared cache at most every
+    PROFESSIONAL_CACHE_VERSION_TTL seconds per process
+    """
+    version = read_version(LISTING_VERSION_KEY, _version_ttl())
+    if version is None:
+        cache.add(LISTING_VERSION_KEY, 1, timeout=None)
+        version = read_version(LISTING_VERSION_KEY, _version_ttl()) or 1
+    return version
+
+
+def bump_listing_version():
+    """Move the listing version on; this process sees it at once, others within the version TTL"""
+    try:
+        version = cache.incr(LISTING_VERSION_KEY)
+    except ValueError:
+        # Key missing (first write, or evicted): any new value invalidates
+        cache.add(LISTING_VERSION_KEY, 2, timeout=None)
+        version = cache.get(LISTING_VERSION_KEY, 2)
+    forget_version(LISTING_VERSION_KEY)
+    return version
+
+
+def canonical_params(query_params, exclude=PAGINATION_PARAMS):
+    """
+    Normalize query parameters into a stable, hashable form
+    Keys are sorted, values stripped and case-folded, and comma-separated or
+    repeated values sorted, so '?state=sp&service=Yoga,Reiki' and
+    '?service=reiki,yoga&state=SP' are the same filter set
+    """
+    items = []
+    for key in sorted(query_params.keys()):
+        if key in exclude:
+            continue
+        values = query_params.getlist(key) if hasattr(query_params, 'getlist') else [query_params[key]]
+        fold = (lambda part: part) if key in CASE_SENSITIVE_PARAMS else str.casefold
+        parts = sorted({
+            fold(part.strip())
+            for value in values
+            for part in str(value).split(',')
+            if part.strip()
+        })
+        if parts:
+            items.append((key, tuple(parts)))
+    return tuple(items)
+
+
+def params_hash(query_params, exclude=PAGINATION_PARAMS):
+    """Short digest of canonical_params()"""
+    return hashlib.sha1(repr(canonical_params(query_params, exclude)).encode()).hexdigest()
+
+
+def count_cache_key(query_params):
+    return f'professionals:count:v{get_listing_version()}:{params_hash(query_params)}'
+
+
+def get_cached_count(query_params, compute):
+    """Filtered COUNT(*) cached per filter set and listing version"""
+    key = count_cache_key(query_params)
+    count = cache.get(key)
+    if count is None:
+        count = compute()
+        cache.set(key, count, getattr(settings, 'PROFESSIONAL_COUNT_CACHE_TTL', 30))
+    return count
+
+
+# List pages: keys embed the listing version, so L1 copies can't go stale
+list_cache = TieredCache('professionals:list', maxsize=500, ttl=60)
+
+# Facet counts, keyed like list pages on the listing version
+facet_cache = TieredCache('professionals:facets', maxsize=200, ttl=60)
+
+# Detail responses are deleted or rewritten per key on writes; every write
+# also bumps the listing version, which drops other processes' L1 copies
+detail_cache = TieredCache(
+    'professionals:detail', maxsize=1000, ttl=60,
+    version_key=LISTING_VERSION_KEY, version_ttl=_version_ttl(),
+)
+DETAIL_NOT_FOUND = 'not-found'
+
+# Digests of stored email verification tokens, one set per version. The set
+# is keyed by the version, which is read on every check: a process lagging
+# behind a new token would reject it
+VERIFICATION_TOKENS_VERSION_KEY = 'professionals:verification-tokens-version'
+verification_tokens_cache = TieredCache(
+    'professionals:verification-tokens', maxsize=1, ttl=60, timeout=24 * 60 * 60,
+)
+
+
+def list_cache_key(request, version=None):
+    """
+    Response cache key for a list request
+    Covers every parameter, pagination included, plus the host (pagination
+    links are absolute URLs)
+    """
+    if version is None:
+        version = get_listing_version()
+    digest = params_hash(request.query_params, exclude=())
+    return f'v{version}:{request.get_host()}:{digest}'
+
+
+def list_stale_key(request):
+    """Last list response computed for a request, whatever the version"""
+    digest = params_hash(request.query_params, exclude=())
+    return f'professionals:list:stale:{request.get_host()}:{digest}'
+
+
+def facet_cache_key(query_params, version=None):
+    """Facets depend on the filters only, not on pagination or ordering"""
+    if version is None:
+        version = get_listing_version()
+    return f'v{version}:{params_hash(query_params)}'
+
+
+def facet_stale_key(query_params):
+    return f'professionals:facets:stale:{params_hash(query_params)}'
+
+
+def single_flight(tiered, key, compute, timeout, stale_key=None, stats_name=None):
+    """
+    The cached value of key, computed by one caller at a time
+    Returns (value, state): state is 'HIT' (from the cache), 'MISS'
+    (computed by this caller) or 'STALE' (the previous value under
+    stale_key, served while another caller recomputes)
+
+    On a miss, the caller that takes a lock in the shared cache (cache.add,
+    expiring after PROFESSIONAL_RECOMPUTE_LOCK_TIMEOUT) computes. The others
+    serve the stale value if there is one, or else poll for the result for up
+    to PROFESSIONAL_RECOMPUTE_WAIT seconds before computing it themselves.
+    compute() returns the value to cache, or None for results that must not
+    be cached (returned as is, state 'MISS')
+    """
+    value = tiered.get(key)
+    if value is not None:
+        if stats_name:
+            record_cache_event(stats_name, hit=True)
+        return value, 'HIT'
+
+    lock_key = f'{tiered.shared_key(key)}:lock'
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, getattr(settings, 'PROFESSIONAL_RECOMPUTE_LOCK_TIMEOUT', 10)):
+        stale = cache.get(stale_key) if stale_key else None
+        if stale is not None:
+            if stats_name:
+                record_cache_event(stats_name, hit=True)
+            return stale, 'STALE'
+        deadline = time.monotonic() + getattr(settings, 'PROFESSIONAL_RECOMPUTE_WAIT', 2.0)
+        while time.monotonic() < deadline:
+            time.sleep(RECOMPUTE_POLL_INTERVAL)
+            value = cache.get(tiered.shared_key(key))
+            if value is not None:
+                if stats_name:
+                    record_cache_event(stats_name, hit=True)
+                return value, 'HIT'
+            if cache.get(lock_key) is None:
+                break  # The holder gave up without caching (error or uncacheable)
+        token = None
+
+    if stats_name:
+        record_cache_event(stats_name, hit=False)
+    try:
+        value = compute()
+        if value is not None:
+            tiered.set(key, value, timeout)
+            if stale_key:
+                cache.set(stale_key, value, getattr(settings, 'PROFESSIONAL_STALE_CACHE_TTL', 3600))
+    finally:
+        # Release only our own lock: it may have expired and been re-taken
+        if token is not None and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+    return value, 'MISS'
+
+
+def make_etag(*parts):
+    """Strong, quoted ETag from the values a representation depends on"""
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _renderer_format(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return getattr(renderer, 'format', None)
+
+
+def list_etag(request, version=None):
+    """
+    ETag of a list response: the listing version plus every parameter
+    Any Professional write moves the version, so it changes with the data
+    """
+    if version is None:
+        version = get_listing_version()
+    return make_etag(
+        'list', version, request.get_host(),
+        params_hash(request.query_params, exclude=()), _renderer_format(request),
+    )
+
+
+def detail_etag(professional, renderer_format='json'):
+    """
+    ETag of a detail response: the profile's updated_at plus the nested user
+    fields, which change without touching the profile
+    """
+    user = professional.user
+    return make_etag(
+        'detail', professional.pk, professional.updated_at.isoformat(),
+        user.username, user.email, renderer_format,
+    )
+
+
+def get_cached_detail(pk):
+    """
+    Cached (JSON bytes, ETag, updated_at) of a detail response,
+    DETAIL_NOT_FOUND for an id recently looked up in vain, or None
+    """
+    entry = detail_cache.get(pk)
+    record_cache_event('detail', hit=entry is not None)
+    return entry
+
+
+def set_cached_detail(pk, body, etag, last_modified, overwrite=True):
+    """Store a rendered detail response; overwrite=False keeps an existing one"""
+    store = detail_cache.set if overwrite else detail_cache.add
+    store(pk, (body, etag, last_modified), getattr(settings, 'PROFESSIONAL_DETAIL_CACHE_TTL', 3600))
+
+
+def delete_cached_detail(pk):
+    detail_cache.delete(pk)
+
+
+def set_detail_not_found(pk):
+    """
+    Remember briefly that no professional has this id, so repeated lookups
+    (crawlers walking ids) skip the database. Creating a professional deletes
+    the entry like any other save
+    """
+    detail_cache.set(pk, DETAIL_NOT_FOUND, getattr(settings, 'PROFESSIONAL_NOT_FOUND_CACHE_TTL', 30))
+
+
+def _token_digest(token):
+    # Keyed: an unkeyed hash of a 6-digit code is reversible by enumeration
+    return hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def _stored_token_digests(version):
+    from .models import EmailVerificationToken  # Import here to avoid circular imports
+    tokens = EmailVerificationToken.objects.values_list('token', flat=True)
+    return frozenset(_token_digest(token) for token in tokens.iterator())
+
+
+def cache_is_shared():
+    """
+    Whether the default cache is one store for every process (Redis), rather
+    than the per-process memory used without REDIS_URL
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def verification_token_may_exist(token):
+    """
+    False when token is certainly not a stored verification token
+    Checked against a cached set of keyed digests of every stored token,
+    rebuilt after any token write. Expired tokens stay in the set so they
+    still get the "expired" answer. True only means the database must be asked
+
+    Only a shared cache can say "certainly not": a per-process cache never
+    sees the version bump of a token created in another worker. Without one,
+    and whenever the version or its set is missing, the answer is True
+    """
+    if not cache_is_shared():
+        return True
+    version = cache.get(VERIFICATION_TOKENS_VERSION_KEY)
+    if version is None:
+        _reset_verification_tokens_version()
+        version = cache.get(VERIFICATION_TOKENS_VERSION_KEY)
+    digests = verification_tokens_cache.get(version)
+    if digests is None:
+        # Built for the next check; this one goes to the database
+        verification_tokens_cache.add(version, _stored_token_digests(version))
+        return True
+    return _token_digest(token) in digests
+
+
+def _reset_verification_tokens_version():
+    # Never restart from a small number: if only the version key was evicted,
+    # an old set stored under a reused version would reject new tokens
+    cache.add(VERIFICATION_TOKENS_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_verification_tokens():
+    """Called after token writes commit: every process rebuilds the set"""
+    try:
+        cache.incr(VERIFICATION_TOKENS_VERSION_KEY)
+    except ValueError:
+        _reset_verification_tokens_version()
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add ETag and, given a datetime, Last-Modified to a response"""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """
+    304 when If-None-Match / If-Modified-Since match the current validators,
+    else None. Called before serializing, so a match skips that work
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def _stats_key(name, event):
+    return f'professionals:cache-stats:{name}:{event}'
+
+
+# Hit/miss counts of this process not yet added to the shared counters
+_pending_stats = {}
+_pending_stats_lock = threading.Lock()
+_stats_flushed_at = time.monotonic()
+
+
+def record_cache_event(name, hit):
+    """
+    Count a hit or miss of a named cache
+    Counted in process memory and added to the shared counters at most every
+    PROFESSIONAL_CACHE_STATS_FLUSH_INTERVAL seconds, so requests don't each
+    pay a shared-cache round trip for it
+    """
+    global _stats_flushed_at
+    key = _stats_key(name, 'hits' if hit else 'misses')
+    now = time.monotonic()
+    with _pending_stats_lock:
+        _pending_stats[key] = _pending_stats.get(key, 0) + 1
+        due = now - _stats_flushed_at >= getattr(settings, 'PROFESSIONAL_CACHE_STATS_FLUSH_INTERVAL', 10)
+        if due:
+            _stats_flushed_at = now
+    if due:
+        flush_cache_stats()
+
+
+def flush_cache_stats():
+    """Add this process's pending hit/miss counts to the shared counters"""
+    with _pending_stats_lock:
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+    for key, count in pending.items():
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            if not cache.add(key, count, timeout=None):
+                cache.incr(key, count)
+
+
+def get_cache_stats(name):
+    """{'hits', 'misses', 'hit_ratio'} of a named cache across all processes"""
+    flush_cache_stats()
+    hits = cache.get(_stats_key(name, 'hits'), 0)
+    misses = cache.get(_stats_key(name, 'misses'), 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+
+
+def clear_pending_cache_stats():
+    """Drop this process's unflushed hit/miss counts (tests)"""
+    with _pending_stats_lock:
+        _pending_stats.clear()
+
+
+def reset_cache_stats(name):
+    keys = [_stats_key(name, 'hits'), _stats_key(name, 'misses')]
+    with _pending_stats_lock:
+        for key in keys:
+            _pending_stats.pop(key, None)
+    cache.delete_many(keys)
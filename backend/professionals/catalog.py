@@ -0,0 +1,151 @@
+"""
+In-process catalog of Brazilian cities.
+Built once per worker from the City table so city lookups (autocomplete,
+cities per state, city/state validation) never touch the database. City
+writes bump a version in the shared cache, and every process picks up the
+new version's catalog on its next access: from the shared cache if another
+worker already built it, else from the database.
+"""
+import bisect
+import hashlib
+import json
+import threading
+
+from django.core.cache import cache
+
+from .text import collation_key, normalize_search_text
+from .tiered_cache import TieredCache
+
+CATALOG_VERSION_KEY = 'professionals:city-catalog-version'
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+class CityCatalog:
+    """
+    Immutable snapshot of (state, name) city rows
+    Names are kept in a sorted array of accent- and case-folded keys, so a
+    prefix search is a binary search plus a short forward scan
+    """
+
+    def __init__(self, rows=(), version=None):
+        self.version = version
+        rows = list(rows)
+        self._entries = sorted(
+            (normalize_search_text(name), name, state)
+            for state, name in rows
+        )
+        self._keys = [key for key, _, _ in self._entries]
+        self._names = {(state, key): name for key, name, state in self._entries}
+
+        by_state = {}
+        for state, name in rows:
+            by_state.setdefault(state, []).append(name)
+        self._by_state = {
+            state: sorted(names, key=collation_key)
+            for state, names in by_state.items()
+        }
+        # Response bodies of the cities-per-state endpoint, rendered once
+        self._state_payloads = {}
+        for state, names in self._by_state.items():
+            body = json.dumps(
+                {'state': state, 'cities': names, 'count': len(names)},
+                ensure_ascii=False, separators=(',', ':'),
+            ).encode('utf-8')
+            self._state_payloads[state] = (body, '"%s"' % hashlib.sha1(body).hexdigest())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def has_city(self, name, state):
+        """Whether state has a city called name, ignoring case and accents"""
+        return self.canonical_name(name, state) is not None
+
+    def canonical_name(self, name, state):
+        """
+        The catalog's spelling of a city name ('sao paulo' -> 'São Paulo'),
+        or None when state has no such city
+        """
+        return self._names.get(((state or '').upper(), normalize_search_text(name)))
+
+    def cities(self, state):
+        """City names of a state in Portuguese alphabetical order"""
+        return list(self._by_state.get(state.upper(), ()))
+
+    def state_payload(self, state):
+        """
+        (JSON bytes, ETag) of {'state', 'cities', 'count'} for a state, or
+        None when the state has no cities
+        """
+        return self._state_payloads.get(state.upper())
+
+    def autocomplete(self, prefix, limit=AUTOCOMPLETE_LIMIT, state=None):
+        """
+        Cities whose name starts with prefix, alphabetical, at most limit
+        'cam', 'CAM' and 'Cãm' all match 'Campinas' and 'Camaçari'
+        """
+        key = normalize_search_text(prefix)
+        if not key or limit <= 0:
+            return []
+        state = state.upper() if state else None
+        results = []
+        for i in range(bisect.bisect_left(self._keys, key), len(self._keys)):
+            if not self._keys[i].startswith(key):
+                break
+            _, name, city_state = self._entries[i]
+            if state and city_state != state:
+                continue
+            results.append({'name': name, 'state': city_state})
+            if len(results) >= limit:
+                break
+        return results
+
+
+# One catalog per version: L1 holds this process's copy, L2 lets a worker
+# (re)starting after a City change load the one another worker built
+_catalogs = TieredCache('professionals:city-catalog', maxsize=1, ttl=None, timeout=24 * 60 * 60)
+_lock = threading.Lock()
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def build_catalog(version=None):
+    from .models import City  # Import here to avoid circular imports
+    return CityCatalog(City.objects.values_list('state', 'name'), version=version)
+
+
+def get_catalog():
+    """This process's catalog, rebuilt if City changed since it was built"""
+    version = get_catalog_version()
+    catalog = _catalogs.get(version)
+    if catalog is None:
+        with _lock:
+            catalog = _catalogs.get(version)
+            if catalog is None:
+                catalog = build_catalog(version)
+                _catalogs.set(version, catalog)
+    return catalog
+
+
+def invalidate_catalog():
+    """
+    Make every process rebuild its catalog
+    Called from City signals and by the import_cities command; call it after
+    any other bulk write that skips signals
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 2, timeout=None)
+    _catalogs.clear_local()
+
+
+def reset_catalog():
+    """Drop this process's catalog (tests)"""
+    _catalogs.clear_local()
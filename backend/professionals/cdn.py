@@ -0,0 +1,108 @@
+"""
+Shared-cache (CDN / reverse proxy) support for the public professional
+endpoints.
+
+List and detail responses get a Cache-Control that lets a shared cache keep
+them for PROFESSIONAL_CACHE_S_MAXAGE seconds (and serve them stale while it
+refetches), plus surrogate keys naming what they contain:
+
+- professional-<id>: the detail page, and every list page showing them
+- professional-list-v<version>: every list page rendered at a listing version
+- professional-list: every list page
+
+Professional writes purge the affected keys through the purger configured in
+PROFESSIONAL_CDN_PURGER, a dotted path to a BasePurger subclass (like
+EMAIL_BACKEND). Purging runs after commit and never fails the write.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+LIST_KEY = 'professional-list'
+
+# Keys purged by LocMemPurger, newest last (like django.core.mail.outbox)
+purged = []
+
+
+def professional_key(pk):
+    return f'professional-{pk}'
+
+
+def list_version_key(version):
+    return f'{LIST_KEY}-v{version}'
+
+
+class BasePurger:
+    """Removes every cached response tagged with any of the given keys"""
+
+    def purge(self, keys):
+        raise NotImplementedError('subclasses of BasePurger must provide a purge() method')
+
+
+class NullPurger(BasePurger):
+    """No shared cache in front of the app: nothing to purge"""
+
+    def purge(self, keys):
+        pass
+
+
+class LocMemPurger(BasePurger):
+    """Records purged keys in cdn.purged (tests and local development)"""
+
+    def purge(self, keys):
+        purged.extend(keys)
+
+
+def get_purger():
+    return import_string(settings.PROFESSIONAL_CDN_PURGER)()
+
+
+def purge(keys):
+    """Purge keys once the current transaction commits"""
+    keys = list(keys)
+
+    def run():
+        try:
+            get_purger().purge(keys)
+        except Exception:
+            logger.exception('CDN purge failed for %s', ' '.join(keys))
+
+    transaction.on_commit(run)
+
+
+def purge_professional(pk, listing_version):
+    """
+    A professional changed: their detail page and the list pages of the
+    listing version that write superseded
+    """
+    keys = [professional_key(pk), list_version_key(listing_version - 1)]
+    if listing_version <= 2:
+        # The version counter may have been reset (cache flushed or evicted),
+        # so pages from before it can't be targeted by version
+        keys.append(LIST_KEY)
+    purge(keys)
+
+
+def patch_public_cache(response, request, keys):
+    """
+    Let shared caches store a public read, tagged with surrogate keys
+    Authenticated requests (e.g. owners checking their own edit) are marked
+    private so they always reach the app
+    """
+    if request.META.get('HTTP_AUTHORIZATION'):
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=settings.PROFESSIONAL_CACHE_MAX_AGE,
+        s_maxage=settings.PROFESSIONAL_CACHE_S_MAXAGE,
+        stale_while_revalidate=settings.PROFESSIONAL_CACHE_STALE_WHILE_REVALIDATE,
+    )
+    response[settings.PROFESSIONAL_SURROGATE_KEY_HEADER] = ' '.join(keys)
+    return response
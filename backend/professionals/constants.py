@@ -17,9 +17,26 @@ SERVICE_TYPES = [
     'Pilates Holístico',
 ]
 
+# Brazilian state codes (UF)
+BRAZILIAN_STATES = [
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA',
+    'MT', 'MS', 'MG', 'PA', 'PB', 'PR', 'PE', 'PI', 'RJ', 'RN',
+    'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
+]
+
 # Attendance type choices
 ATTENDANCE_CHOICES = [
     ('presencial', 'Presencial'),
     ('online', 'Online'),
     ('ambos', 'Ambos'),
 ]
+
+# Price ranges (R$) shown as facets in the search sidebar: [min, max)
+# None means unbounded
+PRICE_BUCKETS = [
+    (None, 100),
+    (100, 200),
+    (200, 300),
+    (300, 500),
+    (500, None),
+]
@@ -0,0 +1,153 @@
+# Coordinates (latitude, longitude) of Brazilian cities by state
+# Used to fill City.latitude/longitude for proximity search - no external geocoding
+# Covers every city seeded by migration 0006 plus the São Paulo and Rio de Janeiro
+# metro areas; values are city-centre approximations (2 decimal places, ~1 km)
+
+CITY_COORDINATES = {
+    'AC': {
+        'Rio Branco': (-9.97, -67.81),
+        'Cruzeiro do Sul': (-7.63, -72.67),
+    },
+    'AL': {
+        'Maceió': (-9.67, -35.74),
+        'Arapiraca': (-9.75, -36.66),
+    },
+    'AP': {
+        'Macapá': (0.03, -51.07),
+        'Santana': (-0.06, -51.18),
+    },
+    'AM': {
+        'Manaus': (-3.12, -60.02),
+        'Itacoatiara': (-3.14, -58.44),
+        'Coari': (-4.08, -63.14),
+    },
+    'BA': {
+        'Salvador': (-12.97, -38.50),
+        'Feira de Santana': (-12.27, -38.97),
+        'Vitória da Conquista': (-14.86, -40.84),
+        'Camaçari': (-12.70, -38.32),
+        'Lauro de Freitas': (-12.89, -38.33),
+    },
+    'CE': {
+        'Fortaleza': (-3.73, -38.53),
+        'Caucaia': (-3.74, -38.66),
+        'Juazeiro do Norte': (-7.21, -39.32),
+        'Maracanaú': (-3.88, -38.63),
+    },
+    'DF': {
+        'Brasília': (-15.79, -47.88),
+    },
+    'ES': {
+        'Vitória': (-20.32, -40.34),
+        'Vila Velha': (-20.33, -40.29),
+        'Serra': (-20.13, -40.31),
+    },
+    'GO': {
+        'Goiânia': (-16.69, -49.26),
+        'Anápolis': (-16.33, -48.95),
+        'Aparecida de Goiânia': (-16.82, -49.24),
+    },
+    'MA': {
+        'São Luís': (-2.53, -44.30),
+        'Imperatriz': (-5.53, -47.49),
+    },
+    'MT': {
+        'Cuiabá': (-15.60, -56.10),
+        'Várzea Grande': (-15.65, -56.13),
+    },
+    'MS': {
+        'Campo Grande': (-20.47, -54.62),
+        'Dourados': (-22.22, -54.81),
+    },
+    'MG': {
+        'Belo Horizonte': (-19.92, -43.94),
+        'Uberlândia': (-18.92, -48.28),
+        'Contagem': (-19.93, -44.05),
+        'Juiz de Fora': (-21.76, -43.35),
+        'Betim': (-19.97, -44.20),
+    },
+    'PA': {
+        'Belém': (-1.46, -48.49),
+        'Ananindeua': (-1.37, -48.37),
+        'Santarém': (-2.44, -54.71),
+    },
+    'PB': {
+        'João Pessoa': (-7.12, -34.86),
+        'Campina Grande': (-7.23, -35.88),
+    },
+    'PE': {
+        'Recife': (-8.05, -34.88),
+        'Jaboatão dos Guararapes': (-8.11, -35.01),
+        'Olinda': (-8.01, -34.85),
+    },
+    'PI': {
+        'Teresina': (-5.09, -42.80),
+        'Parnaíba': (-2.90, -41.78),
+    },
+    'PR': {
+        'Curitiba': (-25.43, -49.27),
+        'Londrina': (-23.31, -51.16),
+        'Maringá': (-23.42, -51.94),
+        'São José dos Pinhais': (-25.53, -49.21),
+        'Colombo': (-25.29, -49.22),
+    },
+    'RJ': {
+        'Rio de Janeiro': (-22.91, -43.17),
+        'Niterói': (-22.88, -43.10),
+        'Duque de Caxias': (-22.79, -43.31),
+        'Nova Iguaçu': (-22.76, -43.45),
+        'São Gonçalo': (-22.83, -43.05),
+        'São João de Meriti': (-22.80, -43.37),
+        'Mesquita': (-22.78, -43.43),
+    },
+    'RN': {
+        'Natal': (-5.79, -35.21),
+        'Mossoró': (-5.19, -37.34),
+    },
+    'RO': {
+        'Porto Velho': (-8.76, -63.90),
+        'Ariquemes': (-9.91, -63.04),
+    },
+    'RR': {
+        'Boa Vista': (2.82, -60.67),
+    },
+    'RS': {
+        'Porto Alegre': (-30.03, -51.23),
+        'Caxias do Sul': (-29.17, -51.18),
+        'Pelotas': (-31.77, -52.34),
+        'Canoas': (-29.92, -51.18),
+        'Gravataí': (-29.94, -50.99),
+        'Viamão': (-30.08, -51.02),
+        'Novo Hamburgo': (-29.68, -51.13),
+        'São Leopoldo': (-29.76, -51.15),
+    },
+    'SC': {
+        'Florianópolis': (-27.60, -48.55),
+        'Joinville': (-26.30, -48.85),
+        'Blumenau': (-26.92, -49.07),
+    },
+    'SE': {
+        'Aracaju': (-10.91, -37.07),
+        'Lagarto': (-10.92, -37.65),
+    },
+    'SP': {
+        'São Paulo': (-23.55, -46.63),
+        'Guarulhos': (-23.46, -46.53),
+        'Campinas': (-22.91, -47.06),
+        'Santo André': (-23.66, -46.53),
+        'Sorocaba': (-23.50, -47.46),
+        'Ribeirão Preto': (-21.18, -47.81),
+        'Santos': (-23.96, -46.33),
+        'Osasco': (-23.53, -46.79),
+        'São Bernardo do Campo': (-23.69, -46.56),
+        'Diadema': (-23.69, -46.62),
+        'Mauá': (-23.67, -46.46),
+        'Taboão da Serra': (-23.60, -46.78),
+        'Carapicuíba': (-23.52, -46.84),
+        'Jundiaí': (-23.19, -46.88),
+    },
+    'TO': {
+        'Palmas': (-10.18, -48.33),
+        'Araguaína': (-7.19, -48.21),
+    },
+}
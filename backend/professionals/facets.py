@@ -0,0 +1,90 @@
+"""
+Facet counts for the professionals search sidebar.
+Counts how many professionals match each service, state, attendance type
+and price bucket under the current filters.
+"""
+from django.db.models import Count, Q
+
+from .constants import SERVICE_TYPES, ATTENDANCE_CHOICES, PRICE_BUCKETS
+from .filters import ProfessionalFilter
+from .models import Professional, ProfessionalService
+
+# Parameters each facet ignores: a facet is counted under every filter except
+# its own, so selecting 'SP' still shows how many professionals other states have
+FACET_PARAMS = {
+    'service': ('service', 'service_match'),
+    'state': ('state',),
+    'attendance_type': ('attendance_type',),
+    'price': ('price_min', 'price_max'),
+}
+
+
+def _filtered_queryset(params, exclude, request=None):
+    data = params.copy()
+    for key in exclude:
+        data.pop(key, None)
+    filterset = ProfessionalFilter(data, queryset=Professional.objects.all(), request=request)
+    # Grouped queries must not carry the default/relevance ordering
+    return filterset.qs.order_by()
+
+
+def _service_counts(queryset):
+    rows = (
+        ProfessionalService.objects.filter(professional__in=queryset.values('pk'))
+        .values('service')
+        .annotate(count=Count('professional_id'))
+        .order_by()
+    )
+    counts = {row['service']: row['count'] for row in rows}
+    return [{'value': s, 'count': counts.get(s, 0)} for s in SERVICE_TYPES]
+
+
+def _state_counts(queryset):
+    rows = queryset.values('state').annotate(count=Count('id')).order_by('state')
+    return [{'value': row['state'], 'count': row['count']} for row in rows]
+
+
+def _attendance_counts(queryset):
+    rows = queryset.values('attendance_type').annotate(count=Count('id'))
+    counts = {row['attendance_type']: row['count'] for row in rows}
+    return [{'value': value, 'count': counts.get(value, 0)} for value, _ in ATTENDANCE_CHOICES]
+
+
+def _price_bucket_filter(low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(price_per_session__gte=low)
+    if high is not None:
+        condition &= Q(price_per_session__lt=high)
+    return condition
+
+
+def _price_counts(queryset):
+    """All buckets in a single conditional aggregate"""
+    totals = queryset.aggregate(**{
+        f'bucket_{i}': Count('id', filter=_price_bucket_filter(low, high))
+        for i, (low, high) in enumerate(PRICE_BUCKETS)
+    })
+    return [
+        {'min': low, 'max': high, 'count': totals[f'bucket_{i}']}
+        for i, (low, high) in enumerate(PRICE_BUCKETS)
+    ]
+
+
+FACET_COUNTERS = {
+    'service': _service_counts,
+    'state': _state_counts,
+    'attendance_type': _attendance_counts,
+    'price': _price_counts,
+}
+
+
+def compute_facets(params, request=None):
+    """
+    Facet counts for a set of list query parameters
+    One grouped query per facet; params must already be validated
+    """
+    return {
+        facet: counter(_filtered_queryset(params, FACET_PARAMS[facet], request))
+        for facet, counter in FACET_COUNTERS.items()
+    }
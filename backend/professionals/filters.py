@@ -2,32 +2,315 @@
 Filters for the professionals app.
 Implements search and filtering logic.
 """
+from functools import reduce
+import math
+import operator
+
+from django import forms
+from django.db import connections
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
 from django_filters import rest_framework as filters
-from .models import Professional
+from .models import Professional, ProfessionalListing, ProfessionalService
+from .constants import SERVICE_TYPES
+from .text import normalize_search_text
+from .search import search_professionals
+
+
+# Case-folded service name -> canonical name from SERVICE_TYPES
+_CANONICAL_SERVICES = {s.casefold(): s for s in SERVICE_TYPES}
+
+SERVICE_MATCH_CHOICES = (
+    ('any', 'Any of the services'),
+    ('all', 'All of the services'),
+)
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = 111.195
+DEFAULT_RADIUS_KM = 25
+
+ORDERING_CHOICES = (
+    ('newest', 'Newest first'),
+    ('price', 'Cheapest first'),
+    ('-price', 'Most expensive first'),
+    ('distance', 'Nearest first (needs lat/lon)'),
+)
+
+# Sort keys per ordering value. Each ends in a unique key (id) for keyset
+# pagination and matches an index read forwards or backwards:
+# (-created_at, -id) and (price_per_session, -created_at, -id), with state
+# prefixes for the most common filter. distance sorts the radius candidates
+ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'price': ('price_per_session', '-created_at', '-id'),
+    '-price': ('-price_per_session', 'created_at', 'id'),
+    'distance': ('distance_km', 'id'),
+}
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) enclosing a circle around (lat, lon)
+    Slightly larger than the circle, so it only ever over-selects
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    lon_delta = min(radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat), 180.0)
+    return lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta
+
+
+def haversine_distance(lat, lon):
+    """Great-circle distance in km from (lat, lon) to the row's coordinates"""
+    lat1, lon1 = Radians(Value(lat)), Radians(Value(lon))
+    lat2, lon2 = Radians(F('latitude')), Radians(F('longitude'))
+    a = (
+        Power(Sin((lat2 - lat1) / 2), 2)
+        + Cos(lat1) * Cos(lat2) * Power(Sin((lon2 - lon1) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def filter_by_distance(queryset, lat, lon, radius_km):
+    """
+    Professionals within radius_km of (lat, lon), annotated with distance_km
+    The bounding box is a range scan on the (latitude, longitude) index; the
+    exact haversine distance is then computed only for those candidates
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    return (
+        queryset.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon))
+        .annotate(distance_km=haversine_distance(lat, lon))
+        .filter(distance_km__lte=radius_km)
+    )
+
+
+def canonical_service(value):
+    """
+    Map user input to the stored service name
+    Lookups against ProfessionalService are exact, so 'reiki' must become 'Reiki'
+    """
+    value = value.strip()
+    return _CANONICAL_SERVICES.get(value.casefold(), value)
+
+
+def split_values(value):
+    """Split a comma-separated parameter into unique, stripped, non-empty values"""
+    values = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if part and part not in values:
+            values.append(part)
+    return values
+
+
+class MultiValueWidget(forms.TextInput):
+    """
+    Read repeated query parameters as one comma-separated value
+    '?state=SP&state=RJ' and '?state=SP,RJ' both reach the filter as 'SP,RJ'
+    """
+
+    def value_from_datadict(self, data, files, name):
+        if hasattr(data, 'getlist'):
+            values = data.getlist(name)
+        else:
+            values = data.get(name)
+        if isinstance(values, (list, tuple)):
+            values = [v for v in values if v not in (None, '')]
+            return ','.join(str(v) for v in values) if values else None
+        return values
+
+
+def parse_services(value):
+    """Split a comma-separated service list into unique canonical names"""
+    services = []
+    for part in split_values(value):
+        service = canonical_service(part)
+        if service not in services:
+            services.append(service)
+    return services
+
+
+def parse_states(value):
+    """Comma-separated states, upper-cased like the stored values"""
+    return split_values((value or '').upper())
+
+
+def parse_attendance_types(value):
+    """Comma-separated attendance types, lower-cased like the stored values"""
+    return split_values((value or '').lower())
+
+
+class ServiceSearchBackend:
+    """
+    Portable service search through the ProfessionalService lookup table
+    Works on every database (used for SQLite in development and tests)
+    """
+
+    def filter(self, queryset, services, match_all=False):
+        links = ProfessionalService.objects.filter(service__in=services)
+        if match_all and len(services) > 1:
+            links = (
+                links.values('professional_id')
+                .annotate(matched=Count('service'))
+                .filter(matched=len(services))
+            )
+        return queryset.filter(pk__in=links.values('professional_id'))
+
+
+class PostgresServiceSearchBackend(ServiceSearchBackend):
+    """
+    Service search using JSONB containment (@>) on the services array
+    Backed by the GIN indexes created in migrations 0008 (Professional) and
+    0016 (ProfessionalListing)
+    """
+
+    def filter(self, queryset, services, match_all=False):
+        if match_all:
+            return queryset.filter(services__contains=services)
+        return queryset.filter(
+            reduce(operator.or_, (Q(services__contains=[s]) for s in services))
+        )
+
+
+def get_service_backend(queryset):
+    """
+    Pick the service search backend for the database serving this queryset
+    Professional and the ProfessionalListing read model both carry the
+    services array with a GIN index on PostgreSQL
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return PostgresServiceSearchBackend()
+    return ServiceSearchBackend()
+
+
+def _filter_in(queryset, field, values):
+    """Equality for one value, IN for several - both use the field's indexes"""
+    if not values:
+        return queryset
+    if len(values) == 1:
+        return queryset.filter(**{field: values[0]})
+    return queryset.filter(**{f'{field}__in': values})
 
 
 class ProfessionalFilter(filters.FilterSet):
     """
     Filter for Professional queryset
-    Supports filtering by service, location, price range, and attendance type
+    Supports filtering by service, location, price range, and attendance type,
+    plus relevance-ranked full-text search (q) over name and bio
+    service, state and attendance_type take several values, comma-separated
+    or repeated ('?state=SP,RJ' or '?state=SP&state=RJ'), matching any of them
     """
-    service = filters.CharFilter(method='filter_service')
-    city = filters.CharFilter(lookup_expr='icontains')
-    state = filters.CharFilter(lookup_expr='iexact')
+    q = filters.CharFilter(method='filter_q')
+    service = filters.CharFilter(method='filter_service', widget=MultiValueWidget)
+    service_match = filters.ChoiceFilter(choices=SERVICE_MATCH_CHOICES, method='filter_service_match')
+    city = filters.CharFilter(method='filter_city')
+    state = filters.CharFilter(method='filter_state', widget=MultiValueWidget)
     price_min = filters.NumberFilter(field_name='price_per_session', lookup_expr='gte')
     price_max = filters.NumberFilter(field_name='price_per_session', lookup_expr='lte')
-    attendance_type = filters.CharFilter(lookup_expr='iexact')
-    
+    attendance_type = filters.CharFilter(method='filter_attendance_type', widget=MultiValueWidget)
+    lat = filters.NumberFilter(method='filter_geo_param', min_value=-90, max_value=90)
+    lon = filters.NumberFilter(method='filter_geo_param', min_value=-180, max_value=180)
+    radius_km = filters.NumberFilter(method='filter_geo_param', min_value=0.1, max_value=500)
+    ordering = filters.ChoiceFilter(choices=ORDERING_CHOICES, method='filter_ordering')
+
     class Meta:
         model = Professional
-        fields = ['service', 'city', 'state', 'price_min', 'price_max', 'attendance_type']
-    
+        fields = [
+            'q', 'service', 'city', 'state', 'price_min', 'price_max', 'attendance_type',
+            'lat', 'lon', 'radius_km', 'ordering',
+        ]
+
+    def filter_queryset(self, queryset):
+        """
+        Apply the field filters, then the proximity filter (needs lat, lon and
+        radius_km together), then the requested ordering
+        Without ?ordering the default ordering (or q's relevance) is kept
+        """
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        lat, lon = data.get('lat'), data.get('lon')
+        if lat is not None and lon is not None:
+            radius_km = data.get('radius_km') or DEFAULT_RADIUS_KM
+            queryset = filter_by_distance(queryset, float(lat), float(lon), float(radius_km))
+        ordering = data.get('ordering')
+        if ordering:
+            queryset = queryset.order_by(*ORDERINGS[ordering])
+        return queryset
+
+    def is_valid(self):
+        """lat and lon must be given together"""
+        valid = super().is_valid()
+        if valid:
+            data = self.form.cleaned_data
+            if (data.get('lat') is None) != (data.get('lon') is None):
+                self.form.add_error('lat' if data.get('lat') is None else 'lon', 'Informe lat e lon juntos')
+                return False
+            if data.get('ordering') == 'distance' and data.get('lat') is None:
+                self.form.add_error('ordering', 'Ordenação por distância requer lat e lon')
+                return False
+        return valid
+
     def filter_service(self, queryset, name, value):
         """
-        Filter by service type in JSONB services array
-        Simple approach that works with both SQLite and PostgreSQL
+        Filter by one or more comma-separated service names
+        service_match=all requires every service, the default (any) requires one
+        Matching is exact and index-backed on every database
+        """
+        services = parse_services(value)
+        if not services:
+            return queryset
+        match_all = self.form.cleaned_data.get('service_match') == 'all'
+        return get_service_backend(queryset).filter(queryset, services, match_all=match_all)
+
+    def filter_city(self, queryset, name, value):
+        """
+        Accent- and case-insensitive partial match on city
+        Runs against city_normalized: 'sao paulo', 'SÃO' and 'paulo' all match
+        'São Paulo'. On PostgreSQL the LIKE is served by a trigram GIN index
+        """
+        term = normalize_search_text(value)
+        if not term:
+            return queryset
+        return queryset.filter(city_normalized__contains=term)
+
+    def filter_state(self, queryset, name, value):
+        """
+        One or more states (comma-separated or repeated), case-insensitive
+        States are stored upper-case (see Professional.save()), so the input is
+        normalized instead of using iexact, which can't use the state indexes
+        """
+        return _filter_in(queryset, 'state', parse_states(value))
+
+    def filter_attendance_type(self, queryset, name, value):
+        """One or more attendance types, case-insensitive (stored lower-case)"""
+        return _filter_in(queryset, 'attendance_type', parse_attendance_types(value))
+
+    def filter_q(self, queryset, name, value):
+        """
+        Full-text search over name and bio, ordered by relevance
+        Portuguese tsvector on PostgreSQL, FTS5 on SQLite (see search.py)
         """
-        # Use a simple string contains approach that works across databases
-        # This will match the service name within the JSON string representation
-        import json
-        return queryset.filter(services__icontains=value)
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_professionals(queryset, value)
+
+    def filter_service_match(self, queryset, name, value):
+        """Only modifies how filter_service combines services"""
+        return queryset
+
+    def filter_geo_param(self, queryset, name, value):
+        """Proximity parameters are applied together in filter_queryset"""
+        return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        """Applied last in filter_queryset, after q may have set relevance order"""
+        return queryset
+
+
+class ProfessionalListingFilter(ProfessionalFilter):
+    """ProfessionalFilter over the ProfessionalListing read model (list endpoint)"""
+
+    class Meta(ProfessionalFilter.Meta):
+        model = ProfessionalListing
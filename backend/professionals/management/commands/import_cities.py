@@ -0,0 +1,70 @@
+"""
+Management command to import Brazilian cities
+Usage: python manage.py import_cities [--file cities.csv]
+Without --file, imports the bundled dataset (data_cities.py with coordinates
+from data_city_coordinates.py). A CSV has a header row and the columns
+state,name and optionally latitude,longitude. Existing cities are kept.
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from professionals.catalog import invalidate_catalog
+from professionals.constants import BRAZILIAN_STATES
+from professionals.data_cities import BRAZILIAN_CITIES
+from professionals.data_city_coordinates import CITY_COORDINATES
+from professionals.models import City
+
+
+def _float_or_none(value):
+    return float(value) if value not in (None, '') else None
+
+
+class Command(BaseCommand):
+    help = 'Imports cities from a CSV file or the bundled dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            help='CSV with state,name[,latitude,longitude] columns',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of cities inserted per query',
+        )
+
+    def bundled_rows(self):
+        for state, names in BRAZILIAN_CITIES.items():
+            for name in names:
+                latitude, longitude = CITY_COORDINATES.get(state, {}).get(name, (None, None))
+                yield state, name, latitude, longitude
+
+    def csv_rows(self, path):
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                for line, row in enumerate(csv.DictReader(f), start=2):
+                    state = (row.get('state') or '').strip().upper()
+                    name = (row.get('name') or '').strip()
+                    if state not in BRAZILIAN_STATES or not name:
+                        raise CommandError(f'{path}:{line}: invalid state or empty name')
+                    yield state, name, _float_or_none(row.get('latitude')), _float_or_none(row.get('longitude'))
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+    def handle(self, *args, **options):
+        rows = self.csv_rows(options['file']) if options['file'] else self.bundled_rows()
+        cities = [
+            City(state=state, name=name, latitude=latitude, longitude=longitude)
+            for state, name, latitude, longitude in rows
+        ]
+
+        before = City.objects.count()
+        # bulk_create sends no signals: the catalog is invalidated below
+        City.objects.bulk_create(cities, batch_size=options['batch_size'], ignore_conflicts=True)
+        created = City.objects.count() - before
+        invalidate_catalog()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} new cities ({len(cities) - created} already present)"
+        ))
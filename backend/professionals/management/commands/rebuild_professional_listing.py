@@ -0,0 +1,52 @@
+"""
+Management command to rebuild the ProfessionalListing read model
+Usage: python manage.py rebuild_professional_listing
+Needed only after writes that bypass signals (queryset.update(), raw SQL)
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from professionals.models import Professional, ProfessionalListing
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds ProfessionalListing rows from Professional'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of professionals processed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Professional.objects.order_by('pk')
+        total = queryset.count()
+        self.stdout.write(f"Rebuilding listing for {total} professionals...")
+
+        with transaction.atomic():
+            # Rows of professionals that no longer exist
+            stale = ProfessionalListing.objects.exclude(pk__in=Professional.objects.values('pk'))
+            removed, _ = stale.delete()
+
+        last_pk = 0
+        rebuilt = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            with transaction.atomic():
+                ProfessionalListing.objects.filter(pk__in=[p.pk for p in batch]).delete()
+                ProfessionalListing.objects.bulk_create(
+                    [ProfessionalListing.from_professional(p) for p in batch]
+                )
+
+            last_pk = batch[-1].pk
+            rebuilt += len(batch)
+            self.stdout.write(f"  {rebuilt}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt listing for {rebuilt} professionals ({removed} stale rows removed)"
+        ))
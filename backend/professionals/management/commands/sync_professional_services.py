@@ -0,0 +1,51 @@
+"""
+Management command to backfill the ProfessionalService lookup table
+Usage: python manage.py sync_professional_services
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from professionals.models import Professional, ProfessionalService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds ProfessionalService rows from Professional.services'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of professionals processed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Professional.objects.order_by('pk').only('pk', 'services')
+        total = queryset.count()
+        self.stdout.write(f"Syncing services for {total} professionals...")
+
+        last_pk = 0
+        synced = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            with transaction.atomic():
+                ids = [p.pk for p in batch]
+                ProfessionalService.objects.filter(professional_id__in=ids).delete()
+                ProfessionalService.objects.bulk_create(
+                    [
+                        ProfessionalService(professional_id=p.pk, service=service)
+                        for p in batch
+                        for service in set(p.services or [])
+                        if isinstance(service, str)
+                    ],
+                    ignore_conflicts=True,
+                )
+
+            last_pk = batch[-1].pk
+            synced += len(batch)
+            self.stdout.write(f"  {synced}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(f"Synced services for {synced} professionals"))
@@ -0,0 +1,263 @@
+"""
+Preference matching for the /professionals/match/ endpoint.
+
+Every professional is a row of a precomputed NumPy feature matrix:
+
+- one 0/1 column per service in SERVICE_TYPES
+- price per session
+- latitude/longitude in radians (NaN when the city has no coordinates)
+- offers online / offers in-person flags
+
+A preference profile becomes a weight vector and a few scalars, so scoring
+all candidates is a handful of vectorized operations over the matrix, and
+the top-k comes from argpartition instead of a full sort.
+
+The matrix is a per-process structure (see process_local.py) rebuilt after
+PROFESSIONAL_MATCH_MATRIX_TTL seconds.
+"""
+import threading
+import time
+
+import numpy as np
+
+from .constants import SERVICE_TYPES
+from .process_local import ProcessLocalStructure
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_MAX_DISTANCE_KM = 50
+
+# Relative weight of each score component. Components the profile doesn't
+# use (no budget, no location...) are left out and the rest renormalized
+COMPONENT_WEIGHTS = {
+    'services': 0.4,
+    'price': 0.2,
+    'distance': 0.2,
+    'attendance': 0.2,
+}
+
+_SERVICE_COLUMN = {service: i for i, service in enumerate(SERVICE_TYPES)}
+N_SERVICES = len(SERVICE_TYPES)
+PRICE = N_SERVICES
+LAT = N_SERVICES + 1
+LON = N_SERVICES + 2
+ONLINE = N_SERVICES + 3
+IN_PERSON = N_SERVICES + 4
+N_COLUMNS = N_SERVICES + 5
+
+
+def _feature_row(services, price, attendance_type, latitude, longitude):
+    row = np.zeros(N_COLUMNS)
+    for service in services or ():
+        column = _SERVICE_COLUMN.get(service)
+        if column is not None:
+            row[column] = 1.0
+    row[PRICE] = float(price)
+    row[LAT] = np.radians(latitude) if latitude is not None else np.nan
+    row[LON] = np.radians(longitude) if longitude is not None else np.nan
+    attendance_type = (attendance_type or '').lower()
+    row[ONLINE] = attendance_type in ('online', 'ambos')
+    row[IN_PERSON] = attendance_type in ('presencial', 'ambos')
+    return row
+
+
+class MatchMatrix:
+    """Feature matrix with one row per professional, oldest first"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.built_at = None
+        self._reset()
+
+    def _reset(self, capacity=0):
+        self.features = np.zeros((capacity, N_COLUMNS))
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.live = np.zeros(capacity, dtype=bool)
+        self._row_of = {}
+        self._size = 0
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def rebuild(self, rows):
+        """
+        Replace the contents with rows of
+        (id, services, price, attendance_type, latitude, longitude),
+        ordered oldest first
+        """
+        rows = list(rows)
+        with self._lock:
+            self._reset(capacity=len(rows))
+            for pk, services, price, attendance_type, latitude, longitude in rows:
+                self._append(pk, _feature_row(services, price, attendance_type, latitude, longitude))
+            self.built_at = time.monotonic()
+
+    def _append(self, pk, row):
+        if self._size == len(self.ids):
+            capacity = max(16, 2 * self._size)
+            self.features = np.resize(self.features, (capacity, N_COLUMNS))
+            self.ids = np.resize(self.ids, capacity)
+            self.live = np.resize(self.live, capacity)
+            self.live[self._size:] = False
+        self.features[self._size] = row
+        self.ids[self._size] = pk
+        self.live[self._size] = True
+        self._row_of[pk] = self._size
+        self._size += 1
+
+    def upsert(self, pk, services, price, attendance_type, latitude, longitude):
+        """Update a professional's row in place, or append it as the newest"""
+        row = _feature_row(services, price, attendance_type, latitude, longitude)
+        with self._lock:
+            position = self._row_of.get(pk)
+            if position is None:
+                self._append(pk, row)
+            else:
+                self.features[position] = row
+
+    def remove(self, pk):
+        with self._lock:
+            position = self._row_of.pop(pk, None)
+            if position is not None:
+                self.live[position] = False
+
+    def score(self, services=None, budget=None, point=None, attendance_type=None,
+              max_distance_km=DEFAULT_MAX_DISTANCE_KM):
+        """
+        Score every row against a preference profile, 0 (worst) to 1 (best)
+
+        services: {service name: weight}, share of the weight the professional covers
+        budget: full marks up to the budget, then linearly down to 0 at twice it
+        point: (lat, lon); full marks on the spot, 0 at max_distance_km or when
+            the city has no coordinates. Ignored for online-only preferences and
+            for professionals the client can see online
+        attendance_type: 'online', 'presencial' or 'ambos'; 1 if the
+            professional offers a compatible mode, else 0
+
+        Returns (scores, components) arrays covering all slots; removed rows
+        score -inf
+        """
+        with self._lock:
+            size = self._size
+            features = self.features[:size]
+            live = self.live[:size]
+
+        components = {}
+        weights = np.zeros(N_SERVICES)
+        for service, weight in (services or {}).items():
+            column = _SERVICE_COLUMN.get(service)
+            if column is not None and weight > 0:
+                weights[column] = weight
+        if weights.sum() > 0:
+            components['services'] = features[:, :N_SERVICES] @ (weights / weights.sum())
+
+        if budget is not None and budget > 0:
+            budget = float(budget)
+            overshoot = (features[:, PRICE] - budget) / budget
+            components['price'] = np.clip(1.0 - overshoot, 0.0, 1.0)
+
+        accepts_online = attendance_type in (None, 'online', 'ambos')
+        accepts_in_person = attendance_type in (None, 'presencial', 'ambos')
+
+        if point is not None and accepts_in_person:
+            lat = np.radians(point[0])
+            lon = np.radians(point[1])
+            row_lat = features[:, LAT]
+            row_lon = features[:, LON]
+            a = (
+                np.sin((row_lat - lat) / 2) ** 2
+                + np.cos(lat) * np.cos(row_lat) * np.sin((row_lon - lon) / 2) ** 2
+            )
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+            closeness = np.nan_to_num(np.clip(1.0 - distance / max_distance_km, 0.0, 1.0), nan=0.0)
+            if accepts_online:
+                # Distance doesn't matter for sessions that can happen online
+                closeness = np.where(features[:, ONLINE] > 0, 1.0, closeness)
+            components['distance'] = closeness
+
+        if attendance_type in ('online', 'presencial'):
+            column = ONLINE if attendance_type == 'online' else IN_PERSON
+            components['attendance'] = features[:, column].copy()
+
+        scores = np.zeros(size)
+        total_weight = sum(COMPONENT_WEIGHTS[name] for name in components)
+        for name, values in components.items():
+            scores += values * (COMPONENT_WEIGHTS[name] / total_weight)
+        if not components:
+            scores[:] = 1.0
+        scores[~live] = -np.inf
+        return scores, components
+
+    def top_k(self, k, **preferences):
+        """
+        The k best (id, score, {component: score}) tuples, best first
+        Ties go to the newest professional
+        """
+        scores, components = self.score(**preferences)
+        with self._lock:
+            ids = self.ids[:len(scores)].copy()
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if not len(candidates) or k <= 0:
+            return []
+        if len(candidates) > k:
+            # k-th best score without a full sort; keep everything tied with
+            # it so the tie-break below decides who makes the cut
+            threshold = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= threshold]
+        # Sort by score, then slot (newer first); lexsort's last key is primary
+        order = np.lexsort((-candidates, -scores[candidates]))[:k]
+        return [
+            (
+                int(ids[slot]),
+                float(scores[slot]),
+                {name: float(values[slot]) for name, values in components.items()},
+            )
+            for slot in candidates[order]
+        ]
+
+
+def _matrix_rows():
+    from .models import Professional
+
+    return (
+        Professional.objects.order_by('created_at', 'id')
+        .values_list('id', 'services', 'price_per_session', 'attendance_type', 'latitude', 'longitude')
+        .iterator(chunk_size=5000)
+    )
+
+
+_matrix = ProcessLocalStructure(
+    'Professional match matrix', MatchMatrix, _matrix_rows,
+    ttl_setting='PROFESSIONAL_MATCH_MATRIX_TTL',
+)
+
+
+def get_matrix():
+    """The process-wide matrix (see ProcessLocalStructure.get)"""
+    return _matrix.get()
+
+
+def match_professional(professional):
+    """Apply a committed save to the matrix"""
+    row = (
+        professional.pk,
+        professional.services,
+        professional.price_per_session,
+        professional.attendance_type,
+        professional.latitude,
+        professional.longitude,
+    )
+    _matrix.apply(lambda matrix: matrix.upsert(*row))
+
+
+def unmatch_professional(professional_id):
+    """Apply a committed deletion to the matrix"""
+    _matrix.apply(lambda matrix: matrix.remove(professional_id))
+
+
+def reset_matrix():
+    """Forget the matrix; the next get_matrix() rebuilds it (used by tests)"""
+    _matrix.reset()
@@ -0,0 +1,54 @@
+"""
+Bootstrap metadata for the frontend: service types, states, attendance
+choices and the full city catalog in one payload.
+The payload is rendered once per city catalog version, as JSON bytes plus a
+gzip copy, and identified by a hash of its content. /meta/<version>/ can then
+be cached forever, and /meta/ revalidated with a 304 on the version ETag.
+"""
+import gzip
+import hashlib
+import json
+import threading
+
+from .catalog import get_catalog
+from .constants import ATTENDANCE_CHOICES, BRAZILIAN_STATES, SERVICE_TYPES
+
+
+class MetaPayload:
+    """Rendered metadata: version, JSON bytes and their gzip compression"""
+
+    def __init__(self, catalog):
+        data = {
+            'service_types': SERVICE_TYPES,
+            'states': BRAZILIAN_STATES,
+            'attendance_types': [{'value': value, 'label': label} for value, label in ATTENDANCE_CHOICES],
+            'cities': {state: catalog.cities(state) for state in BRAZILIAN_STATES},
+        }
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        self.version = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+        data['version'] = self.version
+        self.body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        # mtime=0 keeps the compressed bytes identical across processes
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.catalog = catalog
+
+    def etag(self, gzipped=False):
+        """Strong ETag; the two encodings are different byte sequences"""
+        return f'"{self.version}-gzip"' if gzipped else f'"{self.version}"'
+
+
+_meta = None
+_lock = threading.Lock()
+
+
+def get_meta():
+    """The current payload, re-rendered when the city catalog was rebuilt"""
+    global _meta
+    catalog = get_catalog()
+    meta = _meta
+    if meta is None or meta.catalog is not catalog:
+        with _lock:
+            if _meta is None or _meta.catalog is not catalog:
+                _meta = MetaPayload(catalog)
+            meta = _meta
+    return meta
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_service_links(apps, schema_editor):
+    """One lookup row per service already stored in Professional.services"""
+    Professional = apps.get_model("professionals", "Professional")
+    ProfessionalService = apps.get_model("professionals", "ProfessionalService")
+
+    batch = []
+    for professional in Professional.objects.only("id", "services").order_by("id").iterator(chunk_size=1000):
+        services = {s for s in (professional.services or ()) if isinstance(s, str)}
+        batch.extend(ProfessionalService(professional_id=professional.id, service=s) for s in services)
+        if len(batch) >= 1000:
+            ProfessionalService.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ProfessionalService.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0006_populate_brazilian_cities"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfessionalService",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("service", models.CharField(max_length=100)),
+                (
+                    "professional",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="service_links",
+                        to="professionals.professional",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["service", "professional"],
+                        name="professiona_service_377da4_idx",
+                    )
+                ],
+                "unique_together": {("professional", "service")},
+            },
+        ),
+        migrations.RunPython(populate_service_links, migrations.RunPython.noop),
+    ]
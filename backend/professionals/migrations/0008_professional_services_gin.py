@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:50
+
+from django.db import migrations
+
+
+def create_services_gin_index(apps, schema_editor):
+    """GIN index for JSONB containment (@>) on services - PostgreSQL only"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS professionals_services_gin "
+        "ON professionals_professional USING gin (services)"
+    )
+
+
+def drop_services_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS professionals_services_gin")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0007_professional_service"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_services_gin_index, drop_services_gin_index),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+from professionals.text import normalize_search_text
+
+
+def populate_city_normalized(apps, schema_editor):
+    Professional = apps.get_model("professionals", "Professional")
+    professionals = list(Professional.objects.only("id", "city"))
+    for professional in professionals:
+        professional.city_normalized = normalize_search_text(professional.city)
+    Professional.objects.bulk_update(professionals, ["city_normalized"], batch_size=1000)
+
+
+def create_city_trigram_index(apps, schema_editor):
+    """Trigram index so LIKE '%...%' on city_normalized is index-backed - PostgreSQL only"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS professionals_city_normalized_trgm "
+        "ON professionals_professional USING gin (city_normalized gin_trgm_ops)"
+    )
+
+
+def drop_city_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS professionals_city_normalized_trgm")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0008_professional_services_gin"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="professional",
+            name="city_normalized",
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["city_normalized"], name="professiona_city_no_52804b_idx"
+            ),
+        ),
+        migrations.RunPython(populate_city_normalized, migrations.RunPython.noop),
+        migrations.RunPython(create_city_trigram_index, drop_city_trigram_index),
+    ]
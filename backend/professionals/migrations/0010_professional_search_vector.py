@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    PostgreSQL: backfill search_vector and add its GIN index
+    SQLite: create and fill the FTS5 table (skipped if FTS5 is not compiled in)
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "UPDATE professionals_professional SET search_vector = "
+            "setweight(to_tsvector('portuguese', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('portuguese', coalesce(bio, '')), 'B')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS professionals_search_vector_gin "
+            "ON professionals_professional USING gin (search_vector)"
+        )
+    elif vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            options = {row[0] for row in cursor.fetchall()}
+        if "ENABLE_FTS5" not in options:
+            return
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS professionals_professional_fts "
+            "USING fts5(name, bio, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO professionals_professional_fts (rowid, name, bio) "
+            "SELECT id, name, bio FROM professionals_professional"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS professionals_search_vector_gin")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS professionals_professional_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0009_professional_city_normalized"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="professional",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
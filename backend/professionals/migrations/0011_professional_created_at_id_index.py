@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0010_professional_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="professiona_created_586ca4_idx"
+            ),
+        ),
+    ]
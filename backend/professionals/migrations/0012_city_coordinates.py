@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+from professionals.data_city_coordinates import CITY_COORDINATES
+from professionals.text import normalize_search_text
+
+
+def populate_coordinates(apps, schema_editor):
+    """Fill City coordinates from the bundled dataset and copy them to professionals"""
+    City = apps.get_model("professionals", "City")
+    Professional = apps.get_model("professionals", "Professional")
+
+    cities = list(City.objects.all())
+    for city in cities:
+        city.latitude, city.longitude = CITY_COORDINATES.get(city.state, {}).get(city.name, (None, None))
+    City.objects.bulk_update(cities, ["latitude", "longitude"], batch_size=1000)
+
+    coordinates = {
+        (city.state, normalize_search_text(city.name)): (city.latitude, city.longitude)
+        for city in cities
+        if city.latitude is not None
+    }
+    professionals = list(Professional.objects.only("id", "city", "state"))
+    for professional in professionals:
+        key = (professional.state.upper(), normalize_search_text(professional.city))
+        professional.latitude, professional.longitude = coordinates.get(key, (None, None))
+    Professional.objects.bulk_update(professionals, ["latitude", "longitude"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0011_professional_created_at_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="professional",
+            name="latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="professional",
+            name="longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="professiona_latitud_fae57a_idx"
+            ),
+        ),
+        migrations.RunPython(populate_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0012_city_coordinates"),
+    ]
+
+    operations = [
+        # Superseded by the composite indexes below, which share their prefix
+        migrations.RemoveIndex(
+            model_name="professional",
+            name="professiona_state_26d882_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="professional",
+            name="professiona_price_p_2559c8_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="professional",
+            name="professiona_attenda_57b485_idx",
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["state", "-created_at", "-id"], name="professiona_state_a0f0c2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["state", "attendance_type", "-created_at", "-id"],
+                name="professiona_state_f219fb_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["attendance_type", "-created_at", "-id"],
+                name="professiona_attenda_949d3a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["price_per_session", "-created_at", "-id"],
+                name="professiona_price_p_512293_idx",
+            ),
+        ),
+    ]
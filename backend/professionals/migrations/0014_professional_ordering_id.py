@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0013_professional_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="professional",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0014_professional_ordering_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["state", "price_per_session", "-created_at", "-id"],
+                name="professiona_state_683063_idx",
+            ),
+        ),
+    ]
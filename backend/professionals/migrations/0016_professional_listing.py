@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+def populate_listing(apps, schema_editor):
+    """One listing row per existing professional"""
+    from professionals.models import Professional as CurrentProfessional
+
+    Professional = apps.get_model("professionals", "Professional")
+    ProfessionalListing = apps.get_model("professionals", "ProfessionalListing")
+    # Historical models don't carry the custom (S3) storage that builds photo URLs
+    storage = CurrentProfessional._meta.get_field("photo").storage
+
+    batch = []
+    for professional in Professional.objects.order_by("id").iterator(chunk_size=1000):
+        batch.append(ProfessionalListing(
+            id=professional.id,
+            name=professional.name,
+            city=professional.city,
+            city_normalized=professional.city_normalized,
+            state=professional.state,
+            price_per_session=professional.price_per_session,
+            attendance_type=professional.attendance_type,
+            services=list(professional.services or []),
+            photo_url=storage.url(professional.photo.name) if professional.photo else "",
+            latitude=professional.latitude,
+            longitude=professional.longitude,
+            created_at=professional.created_at,
+        ))
+        if len(batch) >= 1000:
+            ProfessionalListing.objects.bulk_create(batch)
+            batch = []
+    ProfessionalListing.objects.bulk_create(batch)
+
+
+def create_listing_postgres_indexes(apps, schema_editor):
+    """
+    The Professional indexes Django can't declare, for the read model: GIN for
+    JSONB containment on services (0008) and trigram GIN for LIKE on
+    city_normalized (0009) - PostgreSQL only
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS professionals_listing_services_gin "
+        "ON professionals_professionallisting USING gin (services)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS professionals_listing_city_normalized_trgm "
+        "ON professionals_professionallisting USING gin (city_normalized gin_trgm_ops)"
+    )
+
+
+def drop_listing_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS professionals_listing_services_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS professionals_listing_city_normalized_trgm")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("professionals", "0015_professional_state_price_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfessionalListing",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=255)),
+                ("city", models.CharField(max_length=100)),
+                ("city_normalized", models.CharField(max_length=100)),
+                ("state", models.CharField(max_length=2)),
+                ("price_per_session", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("attendance_type", models.CharField(max_length=20)),
+                ("services", models.JSONField(default=list)),
+                ("photo_url", models.CharField(blank=True, max_length=500)),
+                ("latitude", models.FloatField(blank=True, null=True)),
+                ("longitude", models.FloatField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(fields=["city_normalized"], name="professiona_city_no_69e95d_idx"),
+                    models.Index(fields=["state", "-created_at", "-id"], name="professiona_state_311654_idx"),
+                    models.Index(
+                        fields=["state", "attendance_type", "-created_at", "-id"],
+                        name="professiona_state_b3a1a0_idx",
+                    ),
+                    models.Index(
+                        fields=["attendance_type", "-created_at", "-id"], name="professiona_attenda_9bd8d0_idx"
+                    ),
+                    models.Index(
+                        fields=["price_per_session", "-created_at", "-id"], name="professiona_price_p_62a1a2_idx"
+                    ),
+                    models.Index(
+                        fields=["state", "price_per_session", "-created_at", "-id"],
+                        name="professiona_state_bfcbdc_idx",
+                    ),
+                    models.Index(fields=["latitude", "longitude"], name="professiona_latitud_e80e3f_idx"),
+                    models.Index(fields=["-created_at", "-id"], name="professiona_created_45f986_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_listing, migrations.RunPython.noop),
+        migrations.RunPython(create_listing_postgres_indexes, drop_listing_postgres_indexes),
+    ]
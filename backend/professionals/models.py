@@ -5,12 +5,14 @@ Defines the Professional model for holistic therapy service providers.
 import uuid
 import secrets
 from datetime import timedelta
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.conf import settings
 from django.utils import timezone
 from storage.backends import ProfilePhotoStorage
+from .text import normalize_search_text
 from .validators import (
     validate_name,
     validate_bio,
@@ -29,6 +31,9 @@ class City(models.Model):
     """
     state = models.CharField(max_length=2)  # BR state code (SP, RJ, etc.)
     name = models.CharField(max_length=100)
+    # City-centre coordinates from data_city_coordinates.py (proximity search)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     
     class Meta:
         ordering = ['state', 'name']
@@ -43,6 +48,18 @@ class City(models.Model):
     def __str__(self):
         return f"{self.name}/{self.state}"
 
+    @classmethod
+    def coordinates_for(cls, name, state):
+        """(latitude, longitude) of a city, or (None, None) if unknown"""
+        if not name or not state:
+            return None, None
+        row = (
+            cls.objects.filter(state=state.upper(), name__iexact=name.strip(), latitude__isnull=False)
+            .values_list('latitude', 'longitude')
+            .first()
+        )
+        return row or (None, None)
+
 
 class Professional(models.Model):
     """
@@ -70,6 +87,11 @@ class Professional(models.Model):
     # Location
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=2, validators=[validate_state_code])  # BR state code (SP, RJ, etc.)
+    # Unaccented, case-folded copy of city for searching (maintained in save())
+    city_normalized = models.CharField(max_length=100, blank=True, editable=False)
+    # Coordinates of the city, copied from City in save() (proximity search)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     
     # Pricing
     price_per_session = models.DecimalField(
@@ -99,21 +121,56 @@ class Professional(models.Model):
         validators=[validate_profile_photo]
     )
     
+    # Full-text document over name and bio (PostgreSQL only, see search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        # id breaks created_at ties so pages never overlap or skip rows
+        ordering = ['-created_at', '-id']
         indexes = [
             models.Index(fields=['city']),
-            models.Index(fields=['state']),
-            models.Index(fields=['price_per_session']),
-            models.Index(fields=['attendance_type']),
+            models.Index(fields=['city_normalized']),
+            # Equality filters followed by the default ordering, so filtered
+            # lists read rows in order instead of sorting them (see
+            # tests/unit/test_query_plans.py for the combinations covered)
+            models.Index(fields=['state', '-created_at', '-id']),
+            models.Index(fields=['state', 'attendance_type', '-created_at', '-id']),
+            models.Index(fields=['attendance_type', '-created_at', '-id']),
+            # ordering=price / -price (forwards / backwards)
+            models.Index(fields=['price_per_session', '-created_at', '-id']),
+            models.Index(fields=['state', 'price_per_session', '-created_at', '-id']),
+            # Bounding-box prefilter for proximity search
+            models.Index(fields=['latitude', 'longitude']),
+            # Default ordering and keyset pagination key
+            models.Index(fields=['-created_at', '-id']),
         ]
     
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        """
+        Keep city_normalized and the coordinates in step with city/state
+        state and attendance_type are stored in canonical case so filters can
+        compare them exactly and use their indexes
+        """
+        self.state = (self.state or '').strip().upper()
+        self.attendance_type = (self.attendance_type or '').strip().lower()
+        update_fields = kwargs.get('update_fields')
+        location_changed = update_fields is None or bool({'city', 'state'} & set(update_fields))
+        if location_changed:
+            self.city_normalized = normalize_search_text(self.city)
+            self.latitude, self.longitude = City.coordinates_for(self.city, self.state)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'city_normalized', 'latitude', 'longitude'}
+        # post_save receivers (ProfessionalListing, service links) commit or
+        # roll back together with the row itself
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
     
     
     @property
@@ -123,6 +180,117 @@ class Professional(models.Model):
             return self.photo.url
         return None
 
+    def sync_service_links(self):
+        """
+        Mirror the services JSON array into ProfessionalService rows
+        Only inserts/deletes the rows that actually changed
+        """
+        wanted = {s for s in (self.services or []) if isinstance(s, str)}
+        existing = set(self.service_links.values_list('service', flat=True))
+
+        stale = existing - wanted
+        if stale:
+            self.service_links.filter(service__in=stale).delete()
+
+        missing = wanted - existing
+        if missing:
+            ProfessionalService.objects.bulk_create(
+                [ProfessionalService(professional=self, service=s) for s in missing],
+                ignore_conflicts=True,
+            )
+
+
+class ProfessionalService(models.Model):
+    """
+    Normalized professional <-> service relation
+    One row per offered service, kept in sync with Professional.services
+    so service searches are an indexed equality lookup
+    """
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.CASCADE,
+        related_name='service_links'
+    )
+    service = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('professional', 'service')
+        indexes = [
+            models.Index(fields=['service', 'professional']),
+        ]
+
+    def __str__(self):
+        return f"{self.service} ({self.professional_id})"
+
+
+class ProfessionalListing(models.Model):
+    """
+    Narrow read model behind the professional list
+    One row per Professional holding only what list cards, filters and
+    orderings need - no bio, contact details or search document - so list
+    queries scan and sort a much smaller table. id is the professional's id.
+    Written by signals inside the Professional save/delete transaction
+    """
+    # Professional fields mirrored here; saves touching none of them skip the sync
+    SOURCE_FIELDS = {
+        'name', 'city', 'state', 'price_per_session', 'attendance_type',
+        'services', 'photo', 'latitude', 'longitude', 'created_at',
+    }
+
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=255)
+    city = models.CharField(max_length=100)
+    city_normalized = models.CharField(max_length=100)
+    state = models.CharField(max_length=2)
+    price_per_session = models.DecimalField(max_digits=10, decimal_places=2)
+    attendance_type = models.CharField(max_length=20)
+    # Same JSON array as Professional.services, in the professional's order;
+    # on PostgreSQL it has the same GIN index for containment (@>) filters
+    services = models.JSONField(default=list)
+    photo_url = models.CharField(max_length=500, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        # Same access paths as the Professional list indexes
+        indexes = [
+            models.Index(fields=['city_normalized']),
+            models.Index(fields=['state', '-created_at', '-id']),
+            models.Index(fields=['state', 'attendance_type', '-created_at', '-id']),
+            models.Index(fields=['attendance_type', '-created_at', '-id']),
+            models.Index(fields=['price_per_session', '-created_at', '-id']),
+            models.Index(fields=['state', 'price_per_session', '-created_at', '-id']),
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def from_professional(cls, professional):
+        return cls(
+            id=professional.pk,
+            name=professional.name,
+            city=professional.city,
+            city_normalized=professional.city_normalized,
+            state=professional.state,
+            price_per_session=professional.price_per_session,
+            attendance_type=professional.attendance_type,
+            services=list(professional.services or []),
+            photo_url=professional.photo_url or '',
+            latitude=professional.latitude,
+            longitude=professional.longitude,
+            created_at=professional.created_at,
+        )
+
+    @classmethod
+    def sync(cls, professional, using=None):
+        """Insert or update the listing row of a professional"""
+        cls.from_professional(professional).save(using=using)
+
 
 class EmailVerificationToken(models.Model):
     """
@@ -0,0 +1,260 @@
+"""
+Pagination for the professionals app.
+Offset pagination for existing clients plus keyset (cursor) pagination.
+"""
+import base64
+import json
+from functools import reduce
+import operator
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .caching import get_cached_count
+
+
+def _field_name(ordering_term):
+    return ordering_term.lstrip('-')
+
+
+def _is_descending(ordering_term):
+    return ordering_term.startswith('-')
+
+
+def _flip(ordering_term):
+    return ordering_term[1:] if _is_descending(ordering_term) else f'-{ordering_term}'
+
+
+def _ordering_field(queryset, name):
+    """Model field or annotation (e.g. distance_km) a sort key is read from"""
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    return queryset.model._meta.get_field(name)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over the queryset's ordering
+    The cursor stores the sort key values of the last (or first) row of the
+    page, so the next page is a 'WHERE key < last_key' range scan instead of
+    an OFFSET, and no COUNT(*) runs. The primary key is appended to the
+    ordering as a tie-breaker, which makes every position unique.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = 'Cursor inválido'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        """Queryset ordering (or Meta.ordering) with a unique tie-breaker"""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        ordering = ['-id' if t == '-pk' else 'id' if t == 'pk' else t for t in ordering]
+        if any(not isinstance(term, str) for term in ordering):
+            raise ValueError('Keyset pagination needs field-name ordering')
+        if not any(_field_name(term) == 'id' for term in ordering):
+            last = ordering[-1] if ordering else '-id'
+            ordering.append('-id' if _is_descending(last) else 'id')
+        return ordering
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset):
+        """
+        Cursor position as field values, or None on the first page
+        Values are parsed with each ordering field's to_python, so a tampered
+        cursor is a 404 like a malformed one rather than an error in the query
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = payload['v']
+            reverse = bool(payload['r'])
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError('cursor does not match the ordering')
+            values = [
+                _ordering_field(queryset, _field_name(term)).to_python(value)
+                for term, value in zip(self.ordering, values)
+            ]
+            if any(value is None for value in values):
+                raise ValueError('cursor value missing')
+        except (ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _position_values(self, row):
+        values = []
+        for term in self.ordering:
+            value = getattr(row, _field_name(term))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return values
+
+    def _after(self, values, reverse):
+        """
+        Rows strictly after the cursor position in the (possibly reversed)
+        ordering: (a < x) OR (a = x AND b < y) OR ... for descending keys
+        """
+        clauses = []
+        for i, term in enumerate(self.ordering):
+            descending = _is_descending(term) != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition = {_field_name(t): values[j] for j, t in enumerate(self.ordering[:i])}
+            condition[f'{_field_name(term)}__{lookup}'] = values[i]
+            clauses.append(Q(**condition))
+        return reduce(operator.or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset)
+        reverse = bool(cursor and cursor[1])
+
+        if cursor:
+            queryset = queryset.filter(self._after(cursor[0], reverse))
+        ordering = [_flip(t) for t in self.ordering] if reverse else self.ordering
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def _link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'offset')
+        cursor = self.encode_cursor(self._position_values(row), reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+def planner_estimate(queryset):
+    """
+    PostgreSQL row estimate for queryset, or None elsewhere
+    Unfiltered: pg_class.reltuples. Filtered: the planner's top-level row
+    estimate from EXPLAIN. Both are free compared to a COUNT(*)
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return max(int(row[0]), 0) if row else None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ProfessionalPagination(LimitOffsetPagination):
+    """
+    Offset pagination by default, keyset pagination on request
+    Clients opt in with ?pagination=cursor for the first page and then follow
+    the 'next'/'previous' links, which carry ?cursor=. Offset responses are
+    unchanged for older clients
+
+    In offset mode the total count is cached per filter set (see caching.py),
+    large PostgreSQL results use the planner estimate instead of COUNT(*),
+    and ?count=false skips counting altogether ('count' is then null)
+    """
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    keyset = None
+    has_next = False
+
+    def include_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() not in ('false', '0', 'no')
+
+    def get_count(self, queryset):
+        """Cached exact count, or a planner estimate past the threshold"""
+        def compute():
+            threshold = getattr(settings, 'PROFESSIONAL_COUNT_ESTIMATE_THRESHOLD', 10000)
+            estimate = planner_estimate(queryset)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+            return queryset.count()
+        return get_cached_count(self.request.query_params, compute)
+
+    def use_keyset(self, request):
+        return (
+            KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = KeysetPagination() if self.use_keyset(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        # get_count() needs the request before the parent class stores it
+        self.request = request
+        if self.include_count(request):
+            return super().paginate_queryset(queryset, request, view)
+
+        # No count: fetch one extra row to know whether a next page exists
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count = None
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[:self.limit]
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,170 @@
+"""
+Lazily (re)built per-process in-memory structures.
+
+The bitmap search index (search_index.py) and the match feature matrix
+(matching.py) are built from the database inside each worker process. Writes
+in this process are applied to them once they commit (see signals.py);
+writes in other workers are picked up by a full rebuild once the structure is
+older than its TTL setting. Only the very first build runs on a request
+thread; later rebuilds run in a background thread while requests keep using
+the previous build.
+
+Callers whose results end up in a versioned shared cache pass the listing
+version to get(). A build made under another version is rebuilt in the
+background, and until it is ready get() returns None so the caller queries
+the database rather than storing older results under the newer version.
+Versions moved on by this process's own writes don't need a rebuild: the
+write was already applied, and advance() carries the build over.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLocalStructure:
+    """
+    One process-wide structure, built from load_rows() on first use
+    factory() makes an empty structure with rebuild(rows), is_built, built_at
+    and len(); ttl_setting names the setting holding its maximum age in
+    seconds
+    """
+
+    def __init__(self, name, factory, load_rows, ttl_setting, default_ttl=60):
+        self.name = name
+        self.factory = factory
+        self.load_rows = load_rows
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self.structure = factory()
+        self.version = None  # listing version read before the current build
+        self._build_lock = threading.Lock()  # one build at a time
+        self._lock = threading.Lock()  # structure swaps, changes, version
+        self._building = False
+        self._pending = []  # changes committed while a build loads its rows
+
+    @property
+    def is_built(self):
+        return self.structure.is_built
+
+    def _current(self):
+        """The structure and the version it was built under, read together"""
+        with self._lock:
+            return self.structure, self.version
+
+    def _is_fresh(self, structure, built_version, version=None):
+        ttl = getattr(settings, self.ttl_setting, self.default_ttl)
+        return (
+            structure.is_built
+            and (version is None or built_version == version)
+            and time.monotonic() - structure.built_at < ttl
+        )
+
+    def rebuild(self, version=None):
+        """
+        Full rebuild from the database into a new structure, swapped in when
+        done; changes applied meanwhile are replayed onto it
+        version is read by the caller before the rows are, so the build holds
+        at least every write that version covers
+        """
+        with self._build_lock:
+            return self._build(version)
+
+    def _build(self, version):
+        with self._lock:
+            self._building = True
+            self._pending = []
+        try:
+            started = time.monotonic()
+            structure = self.factory()
+            structure.rebuild(self.load_rows())
+            with self._lock:
+                for change in self._pending:
+                    change(structure)
+                self.structure = structure
+                self.version = version
+        finally:
+            with self._lock:
+                self._building = False
+                self._pending = []
+        logger.info(
+            '%s built: %d rows in %.3fs',
+            self.name, len(structure), time.monotonic() - started,
+        )
+        return structure
+
+    def get(self, version=None):
+        """
+        The structure, built on first use. A build older than its TTL or made
+        under another listing version than the given one is rebuilt in the
+        background; meanwhile the old build is returned, or None when it
+        belongs to another version
+        """
+        structure, built_version = self._current()
+        if not structure.is_built:
+            with self._build_lock:
+                if not self.structure.is_built:
+                    self._build(version)
+            structure, built_version = self._current()
+        elif not self._is_fresh(structure, built_version, version):
+            self.start_rebuild(version)
+            structure, built_version = self._current()
+        if version is not None and built_version != version:
+            return None
+        return structure
+
+    def start_rebuild(self, version=None):
+        """Rebuild in a background thread unless a build is already running"""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        self._spawn(self._rebuild_in_background, version)
+
+    def _rebuild_in_background(self, version):
+        try:
+            self.rebuild(version)
+        except Exception:
+            logger.exception('%s rebuild failed', self.name)
+
+    def _spawn(self, target, *args):
+        def run():
+            try:
+                target(*args)
+            finally:
+                # Threads get their own database connections
+                connections.close_all()
+
+        threading.Thread(target=run, name=f'{self.name} rebuild', daemon=True).start()
+
+    def apply(self, change):
+        """
+        Apply a committed write, change(structure), to the current build and
+        to one being made
+        """
+        with self._lock:
+            if self.structure.is_built:
+                change(self.structure)
+            if self._building:
+                self._pending.append(change)
+
+    def advance(self, version):
+        """
+        This process moved the listing version on to version after applying
+        its write: a build current up to the previous version stays current
+        """
+        with self._lock:
+            if self.version is not None and self.version == version - 1:
+                self.version = version
+
+    def reset(self):
+        """Forget the structure; the next get() rebuilds it (tests)"""
+        with self._build_lock, self._lock:
+            self.structure = self.factory()
+            self.version = None
+            self._building = False
+            self._pending = []
@@ -0,0 +1,147 @@
+"""
+Full-text search for the professionals app.
+Maintains a Portuguese search document over Professional.name and bio.
+
+- PostgreSQL: Professional.search_vector (tsvector, GIN index) ranked with ts_rank
+- SQLite: FTS5 virtual table professionals_professional_fts ranked with bm25
+- Anything else: unranked icontains fallback
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, FloatField, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'portuguese'
+FTS_TABLE = 'professionals_professional_fts'
+
+# Fields feeding the search document; saves touching none of them skip the update
+SEARCH_FIELDS = {'name', 'bio'}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_fts_available = {}
+
+
+def _vendor(using):
+    return connections[using].vendor
+
+
+def sqlite_fts_available(using='default'):
+    """Whether the FTS5 table exists (it is skipped if SQLite lacks FTS5)"""
+    if using not in _fts_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [FTS_TABLE],
+            )
+            _fts_available[using] = cursor.fetchone() is not None
+    return _fts_available[using]
+
+
+def search_vector_expression():
+    """Weighted document: name counts more than bio"""
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('bio', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_document(professional, using='default'):
+    """Refresh the search document of a single professional"""
+    vendor = _vendor(using)
+    if vendor == 'postgresql':
+        type(professional).objects.using(using).filter(pk=professional.pk).update(
+            search_vector=search_vector_expression()
+        )
+    elif vendor == 'sqlite' and sqlite_fts_available(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, bio) VALUES (%s, %s, %s)",
+                [professional.pk, professional.name, professional.bio],
+            )
+
+
+def delete_search_document(professional_id, using='default'):
+    """Drop a deleted professional from the SQLite FTS table"""
+    if _vendor(using) == 'sqlite' and sqlite_fts_available(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [professional_id])
+
+
+def _has_document(queryset):
+    """Whether queryset's model carries name/bio itself (Professional does, the read model doesn't)"""
+    return any(field.name == 'search_vector' for field in queryset.model._meta.get_fields())
+
+
+def _documents(queryset):
+    """Professionals behind queryset's rows, which share their ids"""
+    from .models import Professional  # Import here to avoid circular imports
+    return Professional.objects.using(queryset.db)
+
+
+def _fts5_query(text):
+    """
+    Turn free text into a safe FTS5 expression
+    Every word is quoted (no operator injection) and prefix-matched, since
+    SQLite has no Portuguese stemmer: 'ansied' matches 'ansiedade'
+    """
+    tokens = _TOKEN_RE.findall(text)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_professionals(queryset, text):
+    """
+    Restrict queryset to professionals matching text, best matches first
+    Annotates search_rank (higher is better)
+    """
+    using = queryset.db
+    vendor = _vendor(using)
+
+    if vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        if _has_document(queryset):
+            return (
+                queryset.filter(search_vector=query)
+                .annotate(search_rank=SearchRank(F('search_vector'), query))
+                .order_by('-search_rank', '-created_at')
+            )
+        # Read model (see models.ProfessionalListing): rank the professionals
+        # holding the document and join back on the shared id
+        matches = (
+            _documents(queryset).filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+        )
+        return (
+            queryset.filter(pk__in=matches.values('pk'))
+            .annotate(search_rank=Subquery(matches.filter(pk=OuterRef('pk')).values('rank')[:1]))
+            .order_by('-search_rank', '-created_at')
+        )
+
+    if vendor == 'sqlite' and sqlite_fts_available(using):
+        match = _fts5_query(text)
+        if not match:
+            return queryset.none()
+        # Both the filter and the rank are subqueries of the list query, so
+        # the number of matches never turns into bound parameters
+        connection = connections[using]
+        row_id = '{}.{}'.format(
+            connection.ops.quote_name(queryset.model._meta.db_table),
+            connection.ops.quote_name(queryset.model._meta.pk.column),
+        )
+        matching_ids = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        # bm25 is lower-is-better; negate so search_rank sorts like ts_rank
+        rank = (
+            f"SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {row_id}"
+        )
+        return (
+            queryset.filter(pk__in=RawSQL(matching_ids, [match]))
+            .annotate(search_rank=RawSQL(rank, [match], output_field=FloatField()))
+            .order_by('-search_rank', '-created_at')
+        )
+
+    condition = Q(name__icontains=text) | Q(bio__icontains=text)
+    if _has_document(queryset):
+        return queryset.filter(condition)
+    return queryset.filter(pk__in=_documents(queryset).filter(condition).values('pk'))
@@ -0,0 +1,295 @@
+"""
+In-process bitmap search index for the professionals list endpoint.
+
+Answers the common filter combinations (service, state, attendance_type and a
+price range) plus pagination without querying the database:
+
+- every professional gets a slot, ordered by (created_at, id), so reading
+  slots from the highest down yields the default '-created_at' ordering
+- each facet value keeps a bitset (a Python int) of the slots that have it
+- prices live in a sorted array, so a range is two bisects
+
+The index is a per-process structure (see process_local.py) rebuilt after
+PROFESSIONAL_SEARCH_INDEX_TTL seconds, and when another process moves the
+listing version on, since list responses built from it are cached under that
+version.
+Enabled with the
+PROFESSIONAL_SEARCH_INDEX setting.
+"""
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+import threading
+import time
+
+from django.conf import settings
+
+from .process_local import ProcessLocalStructure
+
+FACETS = ('service', 'state', 'attendance_type')
+
+
+def _price_key(price):
+    """Prices are kept as integer cents: cheap to compare and sort"""
+    if not isinstance(price, Decimal):
+        price = Decimal(str(price))
+    return int(price * 100)
+
+
+def _normalize_row(services, state, attendance_type, price):
+    """Facet keys use the same casing the database filters compare against"""
+    return (
+        tuple({s: None for s in (services or ()) if isinstance(s, str)}),
+        (state or '').upper(),
+        (attendance_type or '').lower(),
+        _price_key(price),
+    )
+
+
+class ProfessionalSearchIndex:
+    """Bitsets per facet value plus a sorted price array"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.built_at = None
+        self._reset()
+
+    def _reset(self):
+        self._slot_of = {}  # professional id -> slot
+        self._ids = []  # slot -> professional id, None once deleted
+        self._rows = []  # slot -> (services, state, attendance_type, price in cents)
+        self._live = 0
+        self._bitmaps = {facet: {} for facet in FACETS}
+        self._price_keys = []  # sorted (price in cents, slot) pairs
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    # ------------------------------------------------------------------
+    # Building and maintenance
+    # ------------------------------------------------------------------
+
+    def rebuild(self, rows):
+        """
+        Replace the index contents
+        rows: iterable of (id, services, state, attendance_type, price),
+        already ordered by (created_at, id)
+        """
+        ids = []
+        stored = []
+        facet_slots = {facet: {} for facet in FACETS}
+        service_slots = facet_slots['service']
+        state_slots = facet_slots['state']
+        attendance_slots = facet_slots['attendance_type']
+
+        for slot, (pk, *values) in enumerate(rows):
+            row = _normalize_row(*values)
+            ids.append(pk)
+            stored.append(row)
+            services, state, attendance_type, _ = row
+            for service in services:
+                service_slots.setdefault(service, []).append(slot)
+            state_slots.setdefault(state, []).append(slot)
+            attendance_slots.setdefault(attendance_type, []).append(slot)
+
+        size = len(ids)
+        slot_of = dict(zip(ids, range(size)))
+        prices = sorted(zip((row[3] for row in stored), range(size)))
+        bitmaps = {
+            facet: {value: self._bits_from_slots(slots, size) for value, slots in values.items()}
+            for facet, values in facet_slots.items()
+        }
+
+        with self._lock:
+            self._slot_of = slot_of
+            self._ids = ids
+            self._rows = stored
+            self._live = (1 << size) - 1
+            self._bitmaps = bitmaps
+            self._price_keys = prices
+            self.built_at = time.monotonic()
+
+    def upsert(self, pk, services, state, attendance_type, price):
+        """Add a new professional or refresh an existing one"""
+        with self._lock:
+            slot = self._slot_of.get(pk)
+            if slot is None:
+                slot = len(self._ids)
+                self._slot_of[pk] = slot
+                self._ids.append(pk)
+                self._rows.append(None)
+            else:
+                self._clear_slot(slot)
+
+            services, state, attendance_type, price = _normalize_row(
+                services, state, attendance_type, price
+            )
+            bit = 1 << slot
+            for facet, value in (('state', state), ('attendance_type', attendance_type)):
+                self._bitmaps[facet][value] = self._bitmaps[facet].get(value, 0) | bit
+            for service in services:
+                self._bitmaps['service'][service] = self._bitmaps['service'].get(service, 0) | bit
+            insort(self._price_keys, (price, slot))
+            self._rows[slot] = (services, state, attendance_type, price)
+            self._live |= bit
+
+    def remove(self, pk):
+        """Drop a deleted professional; its slot is left empty"""
+        with self._lock:
+            slot = self._slot_of.pop(pk, None)
+            if slot is None:
+                return
+            self._clear_slot(slot)
+            self._ids[slot] = None
+            self._rows[slot] = None
+
+    def _clear_slot(self, slot):
+        row = self._rows[slot]
+        if row is None:
+            return
+        services, state, attendance_type, price = row
+        mask = ~(1 << slot)
+        for facet, values in (('service', services), ('state', (state,)), ('attendance_type', (attendance_type,))):
+            for value in values:
+                remaining = self._bitmaps[facet].get(value, 0) & mask
+                if remaining:
+                    self._bitmaps[facet][value] = remaining
+                else:
+                    self._bitmaps[facet].pop(value, None)
+        position = bisect_left(self._price_keys, (price, slot))
+        if position < len(self._price_keys) and self._price_keys[position] == (price, slot):
+            del self._price_keys[position]
+        self._live &= mask
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bits_from_slots(slots, size):
+        """Build a bitset from slot numbers in O(len(slots) + size / 8)"""
+        buffer = bytearray((size + 7) // 8)
+        for slot in slots:
+            buffer[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def _any_of(self, facet, values):
+        bitmap = self._bitmaps[facet]
+        bits = 0
+        for value in values:
+            bits |= bitmap.get(value, 0)
+        return bits
+
+    def search(self, services=None, states=None, attendance_types=None,
+               price_min=None, price_max=None, match_all_services=False,
+               offset=0, limit=None):
+        """
+        Return (ordered professional ids for the page, total matches)
+        Values within a facet are OR-ed, facets are AND-ed; match_all_services
+        requires every listed service instead of any
+        """
+        with self._lock:
+            bits = self._live
+            if services:
+                if match_all_services:
+                    for service in services:
+                        bits &= self._bitmaps['service'].get(service, 0)
+                else:
+                    bits &= self._any_of('service', services)
+            if states:
+                bits &= self._any_of('state', [s.upper() for s in states])
+            if attendance_types:
+                bits &= self._any_of('attendance_type', [a.lower() for a in attendance_types])
+            if bits and (price_min is not None or price_max is not None):
+                keys = self._price_keys
+                low = bisect_left(keys, (_price_key(price_min),)) if price_min is not None else 0
+                high = (
+                    bisect_right(keys, (_price_key(price_max), len(self._ids)))
+                    if price_max is not None else len(keys)
+                )
+                in_range = self._bits_from_slots(
+                    (slot for _, slot in keys[low:high]), len(self._ids)
+                )
+                bits &= in_range
+
+            total = bits.bit_count()
+            if limit is None:
+                limit = total
+
+            # bin() lists the highest slot (newest professional) first
+            digits = bin(bits)[2:] if bits else ''
+            top = len(digits) - 1
+            page = []
+            position = digits.find('1')
+            skipped = 0
+            while position != -1 and len(page) < limit:
+                if skipped >= offset:
+                    page.append(self._ids[top - position])
+                else:
+                    skipped += 1
+                position = digits.find('1', position + 1)
+            return page, total
+
+
+def is_enabled():
+    return getattr(settings, 'PROFESSIONAL_SEARCH_INDEX', False)
+
+
+def _index_rows():
+    from .models import Professional
+
+    return (
+        Professional.objects.order_by('created_at', 'id')
+        .values_list('id', 'services', 'state', 'attendance_type', 'price_per_session')
+        .iterator(chunk_size=5000)
+    )
+
+
+_index = ProcessLocalStructure(
+    'Professional search index', ProfessionalSearchIndex, _index_rows,
+    ttl_setting='PROFESSIONAL_SEARCH_INDEX_TTL',
+)
+
+
+def get_index(version=None):
+    """
+    The process-wide index (see ProcessLocalStructure.get)
+    Pass the listing version results will be cached under; None means the
+    index is still being rebuilt for it
+    """
+    return _index.get(version)
+
+
+def index_professional(professional):
+    """Apply a committed save to the index"""
+    if is_enabled():
+        row = (
+            professional.pk,
+            professional.services,
+            professional.state,
+            professional.attendance_type,
+            professional.price_per_session,
+        )
+        _index.apply(lambda index: index.upsert(*row))
+
+
+def unindex_professional(professional_id):
+    """Apply a committed deletion to the index"""
+    if is_enabled():
+        _index.apply(lambda index: index.remove(professional_id))
+
+
+def listing_version_moved(version):
+    """
+    This process bumped the listing version to version after applying its
+    write; an index current until then needs no rebuild
+    """
+    _index.advance(version)
+
+
+def reset_index():
+    """Forget the index; the next get_index() rebuilds it (used by tests)"""
+    _index.reset()
@@ -7,7 +7,7 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.mail import EmailMessage
 from django.conf import settings
-from .models import Professional
+from .models import Professional, ProfessionalListing
 from .validators import (
     validate_name,
     validate_bio,
@@ -17,7 +17,7 @@ from .validators import (
     validate_state_code,
     validate_profile_photo,
 )
-from .constants import SERVICE_TYPES
+from .constants import SERVICE_TYPES, ATTENDANCE_CHOICES
 import logging
 
 logger = logging.getLogger('professionals')
@@ -65,6 +65,15 @@ class ProfessionalSerializer(serializers.ModelSerializer):
         """Get photo URL or None"""
         return obj.photo_url
     
+    def to_representation(self, instance):
+        """
+        photo is the storage URL, like photo_url, rather than one built from
+        the request host: detail responses are cached as bytes for every host
+        """
+        data = super().to_representation(instance)
+        data['photo'] = instance.photo_url
+        return data
+    
     def validate_name(self, value):
         """Validate professional name using custom validator"""
         try:
@@ -143,7 +152,7 @@ class ProfessionalSerializer(serializers.ModelSerializer):
         if city and state:
             from .validators import validate_city_state_pair
             try:
-                validate_city_state_pair(city, state)
+                data['city'] = validate_city_state_pair(city, state)
             except DjangoValidationError as e:
                 raise serializers.ValidationError({
                     'city': str(e.message),
@@ -164,7 +173,18 @@ class ProfessionalSerializer(serializers.ModelSerializer):
         return data
 
 
-class ProfessionalSummarySerializer(serializers.ModelSerializer):
+class DistanceRepresentationMixin:
+    """Add distance_km when the list was filtered by proximity"""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        distance_km = getattr(instance, 'distance_km', None)
+        if distance_km is not None:
+            data['distance_km'] = round(distance_km, 1)
+        return data
+
+
+class ProfessionalSummarySerializer(DistanceRepresentationMixin, serializers.ModelSerializer):
     """
     Lightweight serializer for list views
     Only includes essential fields for cards
@@ -189,6 +209,23 @@ class ProfessionalSummarySerializer(serializers.ModelSerializer):
         return obj.photo_url
 
 
+class ProfessionalListingSerializer(DistanceRepresentationMixin, serializers.ModelSerializer):
+    """
+    List cards read from the ProfessionalListing read model
+    Same output as ProfessionalSummarySerializer
+    """
+    services = serializers.ListField(child=serializers.CharField(), read_only=True)
+    photo_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProfessionalListing
+        fields = ProfessionalSummarySerializer.Meta.fields
+
+    def get_photo_url(self, obj):
+        """Get photo URL or None"""
+        return obj.photo_url or None
+
+
 class ProfessionalCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating professional profiles with user registration
@@ -349,7 +386,7 @@ class ProfessionalCreateSerializer(serializers.ModelSerializer):
         if city and state:
             from .validators import validate_city_state_pair
             try:
-                validate_city_state_pair(city, state)
+                data['city'] = validate_city_state_pair(city, state)
             except DjangoValidationError as e:
                 raise serializers.ValidationError({
                     'city': str(e.message),
@@ -572,6 +609,59 @@ class CitySerializer(serializers.Serializer):
         return instance.name
 
 
+class MatchPreferencesSerializer(serializers.Serializer):
+    """
+    Preference profile for POST /professionals/match/
+    services maps service names to weights, e.g. {"Reiki": 2, "Yoga": 1}.
+    Location is lat/lon, or city/state resolved from the City table
+    """
+    services = serializers.DictField(
+        child=serializers.FloatField(min_value=0),
+        required=False,
+        default=dict,
+    )
+    budget = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    lat = serializers.FloatField(min_value=-90, max_value=90, required=False)
+    lon = serializers.FloatField(min_value=-180, max_value=180, required=False)
+    city = serializers.CharField(required=False)
+    state = serializers.CharField(required=False)
+    attendance_type = serializers.ChoiceField(choices=ATTENDANCE_CHOICES, required=False)
+    max_distance_km = serializers.FloatField(min_value=1, max_value=1000, default=50)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate_services(self, value):
+        """Accept service names case-insensitively; reject unknown ones"""
+        from .filters import canonical_service
+
+        services = {}
+        for name, weight in value.items():
+            service = canonical_service(name)
+            if service not in SERVICE_TYPES:
+                raise serializers.ValidationError(f'Serviço inválido: {name}')
+            services[service] = weight
+        return services
+
+    def validate(self, data):
+        """Resolve the location to a (lat, lon) point"""
+        from .models import City
+
+        has_lat, has_lon = 'lat' in data, 'lon' in data
+        if has_lat != has_lon:
+            raise serializers.ValidationError('Informe lat e lon juntos')
+        if has_lat:
+            data['point'] = (data['lat'], data['lon'])
+        elif data.get('city'):
+            if not data.get('state'):
+                raise serializers.ValidationError({'state': 'Estado é obrigatório junto com a cidade'})
+            latitude, longitude = City.coordinates_for(data['city'], data['state'])
+            if latitude is None:
+                raise serializers.ValidationError({'city': 'Cidade não encontrada'})
+            data['point'] = (latitude, longitude)
+        else:
+            data['point'] = None
+        return data
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     """
     Serializer for password reset request
@@ -0,0 +1,152 @@
+"""
+Signal handlers for the professionals app.
+Keeps derived search data in sync with Professional writes.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import City, EmailVerificationToken, Professional, ProfessionalListing
+from .search import SEARCH_FIELDS, update_search_document, delete_search_document
+from . import cdn, matching, search_index
+from .caching import bump_listing_version, delete_cached_detail, invalidate_verification_tokens
+from .catalog import invalidate_catalog
+
+
+@receiver(post_save, sender=Professional)
+def sync_professional_services(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mirror Professional.services into the ProfessionalService lookup table"""
+    if raw:
+        return
+    if update_fields is not None and 'services' not in update_fields:
+        return
+    instance.sync_service_links()
+
+
+@receiver(post_save, sender=Professional)
+def sync_professional_listing(sender, instance, raw=False, using='default', update_fields=None, **kwargs):
+    """Mirror list fields into the ProfessionalListing read model"""
+    if raw:
+        return
+    if update_fields is not None and not ProfessionalListing.SOURCE_FIELDS & set(update_fields):
+        return
+    ProfessionalListing.sync(instance, using=using)
+
+
+@receiver(post_delete, sender=Professional)
+def remove_professional_listing(sender, instance, using='default', **kwargs):
+    """Deleted professionals leave the read model in the same transaction"""
+    ProfessionalListing.objects.using(using).filter(pk=instance.pk).delete()
+
+
+@receiver(post_save, sender=Professional)
+def refresh_search_document(sender, instance, raw=False, using='default', update_fields=None, **kwargs):
+    """Re-index name/bio for full-text search when either changes"""
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    update_search_document(instance, using=using)
+
+
+@receiver(post_delete, sender=Professional)
+def remove_search_document(sender, instance, using='default', **kwargs):
+    """Drop deleted professionals from the full-text index"""
+    delete_search_document(instance.pk, using=using)
+
+
+@receiver(post_save, sender=Professional)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """
+    Apply the write to this process's bitmap search index once it commits;
+    a rolled-back write never reaches it
+    """
+    if not raw:
+        transaction.on_commit(lambda: search_index.index_professional(instance))
+
+
+@receiver(post_delete, sender=Professional)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Apply the deletion to this process's bitmap search index once it commits"""
+    pk = instance.pk
+    transaction.on_commit(lambda: search_index.unindex_professional(pk))
+
+
+@receiver(post_save, sender=Professional)
+def update_match_matrix(sender, instance, raw=False, **kwargs):
+    """Apply the write to this process's match feature matrix once it commits"""
+    if not raw:
+        transaction.on_commit(lambda: matching.match_professional(instance))
+
+
+@receiver(post_delete, sender=Professional)
+def remove_from_match_matrix(sender, instance, **kwargs):
+    """Apply the deletion to this process's match feature matrix once it commits"""
+    pk = instance.pk
+    transaction.on_commit(lambda: matching.unmatch_professional(pk))
+
+
+@receiver(post_save, sender=Professional)
+@receiver(post_delete, sender=Professional)
+def invalidate_listing_caches(sender, instance, raw=False, **kwargs):
+    """
+    Any write changes list results: move every listing cache key on, and
+    purge the professional's page and the superseded list pages from the CDN
+
+    Both wait for commit: a list request racing an earlier bump would cache
+    the old rows under the new version, and an earlier purge would let the
+    edge refetch the old page.
+
+    The search index receivers above registered their on_commit callbacks
+    first, so the write is in this process's index before the bump and the
+    index carries over to the new version without a rebuild.
+    """
+    if not raw:
+        pk = instance.pk
+
+        def invalidate():
+            version = bump_listing_version()
+            search_index.listing_version_moved(version)
+            cdn.purge_professional(pk, version)
+
+        transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Professional)
+@receiver(post_delete, sender=Professional)
+def invalidate_detail_cache(sender, instance, raw=False, **kwargs):
+    """
+    Drop the cached detail response after any write; API updates store the
+    new one right after (ProfessionalViewSet._write_detail_cache)
+    """
+    if not raw:
+        pk = instance.pk
+        transaction.on_commit(lambda: delete_cached_detail(pk))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_detail_cache(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Detail responses nest the user's username and email"""
+    if raw or (update_fields is not None and not {'username', 'email'} & set(update_fields)):
+        return
+    for pk in Professional.objects.filter(user=instance).values_list('pk', flat=True):
+        transaction.on_commit(lambda pk=pk: delete_cached_detail(pk))
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_city_catalog(sender, **kwargs):
+    """City rows changed: every process rebuilds its city catalog"""
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=EmailVerificationToken)
+@receiver(post_delete, sender=EmailVerificationToken)
+def invalidate_verification_token_set(sender, raw=False, **kwargs):
+    """
+    Rebuild the stored-token set once the write is visible; bumping
+    before commit could cache a set without a token that is about to exist
+    """
+    if not raw:
+        transaction.on_commit(invalidate_verification_tokens)
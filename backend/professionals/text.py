@@ -0,0 +1,24 @@
+"""
+Text normalization helpers for the professionals app.
+Used to build accent- and case-insensitive search keys.
+"""
+import unicodedata
+
+
+def normalize_search_text(value):
+    """
+    Fold text into a search key: no accents, case-folded, single spaces
+    'São  Paulo' -> 'sao paulo'
+    """
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def collation_key(value):
+    """
+    Sort key approximating Portuguese collation without a system locale:
+    letters compare by their base form first, so 'Águas' sorts with the A's
+    instead of after 'Z'; accents and then case only break ties
+    """
+    return (normalize_search_text(value), value.casefold(), value)
@@ -0,0 +1,188 @@
+"""
+Two-tier cache: a small per-process LRU (L1) in front of the Django cache
+backend (L2, Redis in production).
+
+L1 answers repeated reads of hot keys without a network round trip or
+unpickling. Entries expire after the L1 ttl and are evicted least recently
+used beyond maxsize. Writes go to both tiers; other processes see them once
+their L1 copy goes away, which happens:
+
+- after ttl seconds, or
+- once the optional version key in L2 changes: each L1 entry remembers the
+  version it was read under and is dropped when it no longer matches.
+  Bump the version (incr) to make every process re-read from L2. The version
+  itself is re-read at most every version_ttl seconds per process (see
+  read_version), so an L1 hit normally costs no round trip at all; call
+  forget_version after a bump to make this process see it at once.
+
+Values kept in L1 are shared between requests of the process and must not be
+mutated by callers.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+# Sentinel: "use the cache's default timeout" (None means never expire)
+DEFAULT_TIMEOUT = object()
+_MISSING = object()
+
+_instances = weakref.WeakSet()
+
+# version key -> (expires_at, value) of version counters read from L2
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def read_version(key, ttl):
+    """
+    Value of the version counter at key in L2, remembered for ttl seconds
+    All TieredCaches (and callers) sharing a version key share one read.
+    A missing counter (None) is not remembered
+    """
+    now = time.monotonic()
+    with _versions_lock:
+        entry = _versions.get(key)
+    if entry is not None and now < entry[0]:
+        return entry[1]
+    value = cache.get(key)
+    if value is not None and ttl:
+        with _versions_lock:
+            _versions[key] = (now + ttl, value)
+    return value
+
+
+def forget_version(key):
+    """Drop this process's copy of a version counter (after bumping it here)"""
+    with _versions_lock:
+        _versions.pop(key, None)
+
+
+class TieredCache:
+    """
+    A named two-tier cache; L2 keys are '<name>:<key>'
+
+    maxsize: L1 entries kept per process
+    ttl: seconds an entry may be served from L1 (None: until evicted)
+    timeout: default L2 timeout in seconds (None: no expiry)
+    version_key: L2 key of a counter whose changes invalidate L1
+    version_ttl: seconds the counter's value is reused before re-reading it
+    """
+
+    def __init__(self, name, maxsize=256, ttl=60, timeout=300, version_key=None, version_ttl=1):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timeout = timeout
+        self.version_key = version_key
+        self.version_ttl = version_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+        _instances.add(self)
+
+    def shared_key(self, key):
+        return f'{self.name}:{key}'
+
+    def _version(self):
+        return read_version(self.version_key, self.version_ttl) if self.version_key else None
+
+    def _get_local(self, key, version):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, entry_version, value = entry
+            if entry_version != version or (expires_at is not None and time.monotonic() >= expires_at):
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value, version):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._local[key] = (expires_at, version, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def _count(self, event):
+        with self._lock:
+            self._stats[event] += 1
+
+    def get(self, key, default=None):
+        version = self._version()
+        value = self._get_local(key, version)
+        if value is not _MISSING:
+            self._count('l1_hits')
+            return value
+        value = cache.get(self.shared_key(key), _MISSING)
+        if value is _MISSING:
+            self._count('misses')
+            return default
+        self._count('l2_hits')
+        self._set_local(key, value, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+        # Version read first: a bump racing this write makes the L1 copy stale
+        version = self._version()
+        cache.set(self.shared_key(key), value, timeout)
+        self._set_local(key, value, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """Store only if L2 has no value for key; returns whether it stored"""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+        version = self._version()
+        added = cache.add(self.shared_key(key), value, timeout)
+        if added:
+            self._set_local(key, value, version)
+        return added
+
+    def delete(self, key):
+        """Delete from L2 and this process's L1; other L1s drop it by version or ttl"""
+        cache.delete(self.shared_key(key))
+        with self._lock:
+            self._local.pop(key, None)
+
+    def get_or_set(self, key, compute, timeout=DEFAULT_TIMEOUT):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, timeout)
+        return value
+
+    def clear_local(self):
+        """Empty this process's L1 (tests, or after bulk changes)"""
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """This process's L1/L2 hit counts and ratios since the last reset"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._local)
+        total = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['l1_hits'] + stats['l2_hits']) / total if total else None
+        stats['l1_hit_ratio'] = stats['l1_hits'] / total if total else None
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+
+
+def clear_all_local():
+    """Empty the L1 of every TieredCache, and the version copies, in this process (tests)"""
+    for tiered in list(_instances):
+        tiered.clear_local()
+    with _versions_lock:
+        _versions.clear()
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProfessionalViewSet
+from .views import MetaView, ProfessionalViewSet
 
 router = DefaultRouter()
 router.register(r'professionals', ProfessionalViewSet, basename='professional')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('meta/', MetaView.as_view(), name='meta'),
+    path('meta/<str:version>/', MetaView.as_view(), name='meta-version'),
 ]
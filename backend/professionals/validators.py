@@ -5,21 +5,27 @@ Contains business logic validation functions.
 import re
 from django.core.exceptions import ValidationError
 from django.core.files.images import get_image_dimensions
-from .constants import SERVICE_TYPES
+from .constants import BRAZILIAN_STATES, SERVICE_TYPES
 
 
 def validate_city_state_pair(city, state):
     """
     Validate that city and state are a valid pair from City model.
     This is a module-level function used in serializer validation.
+    Checked against the in-process city catalog (case- and accent-insensitive),
+    so it costs no database query.
+    Returns the catalog's spelling of the city, which callers store so that
+    exact lookups (e.g. City.coordinates_for) find it.
     """
-    from .models import City  # Import here to avoid circular imports
+    from .catalog import get_catalog  # Import here to avoid circular imports
     
-    if not City.objects.filter(state=state, name__iexact=city).exists():
+    name = get_catalog().canonical_name(city, state)
+    if name is None:
         raise ValidationError(
             f'Cidade "{city}" não encontrada para o estado "{state}". '
             'Selecione uma cidade válida da lista de cidades disponíveis.'
         )
+    return name
 
 
 def validate_phone_number(value):
@@ -137,16 +143,9 @@ def validate_state_code(value):
     if len(value) != 2:
         raise ValidationError('Estado deve ter exatamente 2 letras')
 
-    # Brazilian states
-    valid_states = [
-        'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA',
-        'MT', 'MS', 'MG', 'PA', 'PB', 'PR', 'PE', 'PI', 'RJ', 'RN',
-        'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
-    ]
-
-    if value.upper() not in valid_states:
+    if value.upper() not in BRAZILIAN_STATES:
         raise ValidationError(
-            f'Estado inválido. Estados válidos: {", ".join(valid_states)}'
+            f'Estado inválido. Estados válidos: {", ".join(BRAZILIAN_STATES)}'
         )
 
     return value.upper()
@@ -183,4 +182,4 @@ def validate_bio(value):
         raise ValidationError('Bio deve ter pelo menos 20 caracteres')
 
     if len(value) > 2000:
-        raise ValidationError('Bio deve ter no máximo 2000 caracteres')
\ No newline at end of file
+        raise ValidationError('Bio deve ter no máximo 2000 caracteres')
\ No newline at end of file
@@ -2,27 +2,63 @@
 Views for the professionals app.
 Implements API endpoints for professional profiles.
 """
+import re
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 
-from .models import Professional, City, EmailVerificationToken
+from .models import Professional, ProfessionalListing, EmailVerificationToken
 from .serializers import (
     ProfessionalSerializer,
     ProfessionalSummarySerializer,
+    ProfessionalListingSerializer,
     ProfessionalCreateSerializer,
+    MatchPreferencesSerializer,
     EmailVerificationSerializer,
     ResendVerificationEmailSerializer,
     CitySerializer,
     PasswordResetRequestSerializer,
     PasswordResetConfirmSerializer,
 )
-from .filters import ProfessionalFilter
+from .filters import ProfessionalFilter, ProfessionalListingFilter, parse_attendance_types, parse_services, parse_states
+from .pagination import ProfessionalPagination
 from .permissions import IsAuthenticatedAndOwnerOrReadOnly
-from .constants import SERVICE_TYPES
+from .constants import BRAZILIAN_STATES, SERVICE_TYPES
+from . import cdn, matching, search_index
+from .caching import (
+    DETAIL_NOT_FOUND,
+    detail_etag,
+    facet_cache,
+    facet_cache_key,
+    facet_stale_key,
+    get_cached_detail,
+    get_listing_version,
+    list_cache,
+    list_cache_key,
+    list_etag,
+    list_stale_key,
+    not_modified_response,
+    set_cached_detail,
+    set_detail_not_found,
+    set_validators,
+    single_flight,
+    verification_token_may_exist,
+)
+from .catalog import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT, get_catalog
+from .facets import compute_facets
+from .meta import get_meta
 
 
 class ProfessionalViewSet(viewsets.ModelViewSet):
@@ -34,12 +70,28 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
     serializer_class = ProfessionalSerializer
     permission_classes = [IsAuthenticatedAndOwnerOrReadOnly]
     filter_backends = [DjangoFilterBackend]
-    filterset_class = ProfessionalFilter
+    pagination_class = ProfessionalPagination
+
+    @property
+    def filterset_class(self):
+        """Filters must target the model get_queryset() returns"""
+        if self.action == 'list':
+            return ProfessionalListingFilter
+        return ProfessionalFilter
+
+    def get_queryset(self):
+        """The list reads the narrow ProfessionalListing read model"""
+        if self.action == 'list':
+            return ProfessionalListing.objects.all()
+        if self.action == 'retrieve':
+            # The detail ETag covers the nested user
+            return super().get_queryset().select_related('user')
+        return super().get_queryset()
 
     def get_serializer_class(self):
         """Use summary serializer for list view"""
         if self.action == 'list':
-            return ProfessionalSummarySerializer
+            return ProfessionalListingSerializer
         return ProfessionalSerializer
 
     def get_permissions(self):
@@ -47,7 +99,7 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
         Allow anyone to read, register, and verify email
         Require authentication for other write operations
         """
-        if self.action in ['list', 'retrieve', 'service_types', 'register', 'verify_email', 'resend_verification']:
+        if self.action in ['list', 'retrieve', 'facets', 'match', 'service_types', 'register', 'verify_email', 'resend_verification']:
             # Allow anyone for these actions
             return [AllowAny()]
         else:
@@ -60,6 +112,241 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
         """
         serializer.save(user=self.request.user)
 
+    def perform_update(self, serializer):
+        """Save, then write the new detail response through to the cache"""
+        serializer.save()
+        self._write_detail_cache(serializer.instance)
+
+    # Query parameters the in-memory search index can answer on its own
+    SEARCH_INDEX_PARAMS = {
+        'service', 'service_match', 'state', 'attendance_type',
+        'price_min', 'price_max', 'limit', 'offset',
+    }
+
+    def list(self, request, *args, **kwargs):
+        """
+        GET /api/v1/professionals/
+        Served from the response cache when this exact request (parameters
+        canonicalized) was answered since the last Professional write.
+        Otherwise from the in-memory search index when enabled and the request
+        only uses parameters it supports, or a regular filtered query
+        The X-Cache header says which (HIT/MISS)
+        Concurrent misses for the same page compute it once; the others get
+        the previous version's page (X-Cache: STALE) or wait for the result
+        A matching If-None-Match gets a 304 before any of that
+        Successful responses are cacheable by a CDN (see cdn.py)
+        """
+        version = get_listing_version()
+        etag = list_etag(request, version)
+        surrogate_keys = [cdn.LIST_KEY, cdn.list_version_key(version)]
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return cdn.patch_public_cache(not_modified, request, surrogate_keys)
+
+        computed = {}
+
+        def compute():
+            response = None
+            if search_index.is_enabled() and set(request.query_params) <= self.SEARCH_INDEX_PARAMS:
+                response = self._list_from_search_index(request, version)
+            if response is None:
+                response = super(ProfessionalViewSet, self).list(request, *args, **kwargs)
+            computed['response'] = response
+            return (version, response.data) if response.status_code == status.HTTP_200_OK else None
+
+        entry, state = single_flight(
+            list_cache, list_cache_key(request, version), compute,
+            timeout=getattr(settings, 'PROFESSIONAL_LIST_CACHE_TTL', 300),
+            stale_key=list_stale_key(request), stats_name='list',
+        )
+        response = computed.get('response')
+        if entry is None:
+            response['X-Cache'] = 'MISS'
+            return response
+        entry_version, data = entry
+        if response is None:
+            response = Response(data)
+        response['X-Cache'] = state
+        set_validators(response, list_etag(request, entry_version))
+        if state == 'STALE':
+            # Served from before the last write while another request
+            # recomputes: never let a shared cache keep it
+            patch_cache_control(response, no_store=True)
+            return response
+
+        results = data.get('results', []) if isinstance(data, dict) else data
+        surrogate_keys += [cdn.professional_key(item['id']) for item in results]
+        return cdn.patch_public_cache(response, request, surrogate_keys)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        GET /api/v1/professionals/{id}/
+        Served as stored JSON bytes from the detail cache, which writes through
+        this view keep current; otherwise serialized and stored
+        Validated by ETag and Last-Modified (updated_at); a conditional
+        request for an unchanged profile gets a 304 without serializing it
+        Cacheable by a CDN under the professional's surrogate key
+        The X-Cache header says whether the detail cache answered (HIT/MISS)
+        Unknown ids are remembered for PROFESSIONAL_NOT_FOUND_CACHE_TTL seconds
+        """
+        pk = self._detail_cache_pk(request)
+        entry = get_cached_detail(pk) if pk is not None else None
+        if entry == DETAIL_NOT_FOUND:
+            raise Http404
+        instance = None
+        if entry is not None:
+            body, etag, last_modified = entry
+        else:
+            try:
+                instance = self.get_object()
+            except Http404:
+                if pk is not None:
+                    set_detail_not_found(pk)
+                raise
+            etag = detail_etag(instance, request.accepted_renderer.format)
+            last_modified = instance.updated_at
+        surrogate_keys = [cdn.professional_key(instance.pk if instance is not None else pk)]
+
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            if instance is None:
+                response = HttpResponse(body, content_type='application/json')
+            elif pk is None:
+                response = Response(self.get_serializer(instance).data)
+            else:
+                body, etag, last_modified = self._write_detail_cache(
+                    instance, self.get_serializer(instance).data, overwrite=False,
+                )
+                response = HttpResponse(body, content_type='application/json')
+            set_validators(response, etag, last_modified)
+        response['X-Cache'] = 'HIT' if instance is None else 'MISS'
+        return cdn.patch_public_cache(response, request, surrogate_keys)
+
+    def _detail_cache_pk(self, request):
+        """
+        The integer id of a detail request the cache may answer, else None
+        Only plain JSON requests are cached: query parameters can filter the
+        lookup and other renderers produce different bytes
+        """
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return None
+        try:
+            return int(self.kwargs[self.lookup_field])
+        except (KeyError, ValueError):
+            return None
+
+    def _write_detail_cache(self, instance, data=None, overwrite=True):
+        """
+        Render a professional's detail response and store it once the current
+        transaction commits. Returns (body, etag, last_modified)
+        Reads pass overwrite=False so a response rendered from a row read just
+        before a write can't replace the one the write stored
+        """
+        if data is None:
+            data = ProfessionalSerializer(instance, context=self.get_serializer_context()).data
+        body = JSONRenderer().render(data)
+        etag = detail_etag(instance)
+        last_modified = instance.updated_at
+        transaction.on_commit(
+            lambda: set_cached_detail(instance.pk, body, etag, last_modified, overwrite=overwrite)
+        )
+        return body, etag, last_modified
+
+    def _list_from_search_index(self, request, version):
+        """
+        Resolve filters and the requested page to ordered ids in memory, then
+        hydrate just that page by primary key
+        Returns None when the parameters don't validate, so the regular path
+        produces the usual error response, and while the index is being
+        rebuilt for the listing version the response is cached under
+        """
+        filterset = self.filterset_class(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            return None
+        index = search_index.get_index(version)
+        if index is None:
+            return None
+        data = filterset.form.cleaned_data
+
+        paginator = self.paginator
+        limit = paginator.get_limit(request)
+        offset = paginator.get_offset(request)
+        ids, total = index.search(
+            services=parse_services(data.get('service') or ''),
+            states=parse_states(data.get('state')) or None,
+            attendance_types=parse_attendance_types(data.get('attendance_type')) or None,
+            price_min=data.get('price_min'),
+            price_max=data.get('price_max'),
+            match_all_services=data.get('service_match') == 'all',
+            offset=offset,
+            limit=limit,
+        )
+
+        by_id = ProfessionalListing.objects.in_bulk(ids)
+        page = [by_id[pk] for pk in ids if pk in by_id]
+
+        # Same response shape as LimitOffsetPagination.paginate_queryset()
+        paginator.request = request
+        paginator.limit = limit
+        paginator.offset = offset
+        paginator.count = total
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        GET /api/v1/professionals/facets/
+        Returns match counts per service, state, attendance type and price
+        bucket for the search sidebar. Accepts the same query parameters as
+        the list endpoint; each facet ignores its own parameter
+        Cached per filter set and listing version, computed once under
+        concurrent misses (see caching.single_flight)
+        """
+        filterset = ProfessionalFilter(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        facets, state = single_flight(
+            facet_cache, facet_cache_key(request.query_params),
+            lambda: compute_facets(request.query_params, request=request),
+            timeout=getattr(settings, 'PROFESSIONAL_FACET_CACHE_TTL', 60),
+            stale_key=facet_stale_key(request.query_params), stats_name='facets',
+        )
+        return Response(facets, headers={'X-Cache': state})
+
+    @action(detail=False, methods=['post'])
+    def match(self, request):
+        """
+        POST /api/v1/professionals/match/
+        Ranks professionals against a preference profile (services with
+        weights, budget, location, attendance type) and returns the top
+        'limit' with their overall and per-component scores
+        Scoring runs over the in-process feature matrix (see matching.py)
+        """
+        serializer = MatchPreferencesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        preferences = serializer.validated_data
+
+        matches = matching.get_matrix().top_k(
+            preferences['limit'],
+            services=preferences['services'],
+            budget=preferences.get('budget'),
+            point=preferences['point'],
+            attendance_type=preferences.get('attendance_type'),
+            max_distance_km=preferences['max_distance_km'],
+        )
+
+        by_id = Professional.objects.in_bulk([pk for pk, _, _ in matches])
+        results = []
+        for pk, score, components in matches:
+            if pk not in by_id:
+                continue
+            data = ProfessionalSummarySerializer(by_id[pk], context={'request': request}).data
+            data['score'] = round(score, 4)
+            data['scores'] = {name: round(value, 4) for name, value in components.items()}
+            results.append(data)
+        return Response({'count': len(results), 'results': results})
+
     @action(detail=False, methods=['get'])
     def service_types(self, request):
         """
@@ -114,6 +401,15 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
         """
         import logging
         logger = logging.getLogger(__name__)
+
+        # Random guesses are rejected without a query or log lines, with the
+        # same response the serializer gives for an unknown token. The token
+        # is cleaned by the serializer's field first (e.g. surrounding spaces)
+        token = request.data.get('token')
+        if isinstance(token, str):
+            token = EmailVerificationSerializer().fields['token'].to_internal_value(token)
+            if token and not verification_token_may_exist(token):
+                return Response({'token': ['Token inválido']}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             serializer = EmailVerificationSerializer(data=request.data)
@@ -333,6 +629,7 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
             # Save new photo
             professional.photo = photo_file
             professional.save()
+            self._write_detail_cache(professional)
 
             # Return success response with photo URL
             return Response({
@@ -360,7 +657,9 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
             state: Two-letter state code (e.g., 'SP', 'RJ', 'MG') - case insensitive
         
         Returns:
-            List of city names for the state, sorted alphabetically
+            List of city names for the state, in Portuguese alphabetical order.
+            Pre-rendered by the in-process city catalog (no database query) and
+            cacheable by clients for CITY_CATALOG_MAX_AGE seconds
         """
         if not state or len(state) != 2:
             return Response(
@@ -368,37 +667,47 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate state code
-        valid_states = [
-            'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA',
-            'MT', 'MS', 'MG', 'PA', 'PB', 'PR', 'PE', 'PI', 'RJ', 'RN',
-            'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
-        ]
-        
         state_upper = state.upper()
-        if state_upper not in valid_states:
+        if state_upper not in BRAZILIAN_STATES:
             return Response(
-                {'error': f'Invalid state code: {state}. Valid codes: {", ".join(valid_states)}'},
+                {'error': f'Invalid state code: {state}. Valid codes: {", ".join(BRAZILIAN_STATES)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get cities from database
-        cities = City.objects.filter(state=state_upper).values_list('name', flat=True)
-        
-        if not cities.exists():
+        payload = get_catalog().state_payload(state_upper)
+        if payload is None:
             return Response(
                 {'error': f'No cities found for state: {state_upper}'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        # Sort using Python's sorted() to handle Unicode characters correctly
-        sorted_cities = sorted(cities)
-        
-        return Response({
-            'state': state_upper,
-            'cities': sorted_cities,
-            'count': len(sorted_cities)
-        }, status=status.HTTP_200_OK)
+        body, etag = payload
+
+        response = not_modified_response(request, etag)
+        if response is None:
+            response = HttpResponse(body, content_type='application/json; charset=utf-8')
+            response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.CITY_CATALOG_MAX_AGE)
+        return response
+
+    @action(detail=False, methods=['get'], url_path='cities/autocomplete')
+    def cities_autocomplete(self, request):
+        """
+        GET /api/v1/professionals/cities/autocomplete/?q=cam
+        Cities whose name starts with q (accent- and case-insensitive), with
+        their state. Optional: state=SP to restrict, limit (default 10, max 50)
+        Answered from the in-process city catalog, without a database query
+        """
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+        query = request.query_params.get('q', '')
+        results = get_catalog().autocomplete(query, limit=limit, state=request.query_params.get('state'))
+        return Response({'query': query, 'results': results}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def password_reset(self, request):
@@ -455,3 +764,44 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
             )
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MetaView(APIView):
+    """
+    GET /api/v1/meta/ and /api/v1/meta/{version}/
+    Service types, states, attendance choices and all cities in one
+    precompressed payload (see meta.py)
+    The unversioned URL must be revalidated (cheap 304 by ETag); a versioned
+    URL is immutable and cacheable forever, and redirects to the current
+    version once the payload has changed
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+    def get(self, request, version=None):
+        meta = get_meta()
+        if version is not None and version != meta.version:
+            response = HttpResponseRedirect(reverse('meta-version', kwargs={'version': meta.version}))
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        gzipped = bool(re.search(r'\bgzip\b', request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        etag = meta.etag(gzipped)
+        response = not_modified_response(request, etag)
+        if response is None:
+            response = HttpResponse(
+                meta.gzip_body if gzipped else meta.body,
+                content_type='application/json; charset=utf-8',
+            )
+            response['ETag'] = etag
+            if gzipped:
+                response['Content-Encoding'] = 'gzip'
+        response['X-Meta-Version'] = meta.version
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if version is None:
+            patch_cache_control(response, public=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=self.IMMUTABLE_MAX_AGE, immutable=True)
+        return response
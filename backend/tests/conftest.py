@@ -110,6 +110,43 @@ def ensure_cities_for_django_db_tests(db):
         traceback.print_exc()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start every test with an empty cache
+    Database changes are rolled back between tests but cached listing data,
+    per-process cache tiers, the city catalog and the match matrix would
+    otherwise survive them
+    """
+    from django.core.cache import cache
+    from professionals import cdn
+    from professionals.caching import clear_pending_cache_stats
+    from professionals.catalog import reset_catalog
+    from professionals.matching import reset_matrix
+    from professionals.tiered_cache import clear_all_local
+    cache.clear()
+    clear_all_local()
+    clear_pending_cache_stats()
+    reset_catalog()
+    reset_matrix()
+    cdn.purged.clear()
+    yield
+    cache.clear()
+    clear_all_local()
+    reset_catalog()
+    reset_matrix()
+
+
+@pytest.fixture(autouse=True)
+def inline_rebuilds(monkeypatch):
+    """
+    Background rebuilds of per-process structures run on the test thread, so
+    they see the test's transaction
+    """
+    from professionals.process_local import ProcessLocalStructure
+    monkeypatch.setattr(ProcessLocalStructure, '_spawn', lambda self, target, *args: target(*args))
+
+
 @pytest.fixture
 def api_client():
     """Provide a REST API test client"""
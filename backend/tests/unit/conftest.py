@@ -3,6 +3,7 @@ Pytest configuration for unit tests.
 Cities are now loaded at session start via pytest_sessionstart hook in root conftest.
 """
 import pytest
+from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 
 
@@ -11,3 +12,29 @@ def api_client():
     """Provide a REST API test client for unit tests"""
     return APIClient()
 
+
+
+@pytest.fixture
+def create_professional(db):
+    """
+    Factory for professionals with a user of the same name
+    Any Professional field can be overridden by keyword
+    """
+    from professionals.models import Professional
+
+    def create(username, **fields):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+        data = {
+            'name': username.title(),
+            'bio': 'Terapeuta holístico com experiência',
+            'services': ['Reiki'],
+            'city': 'São Paulo',
+            'state': 'SP',
+            'price_per_session': 150.00,
+            'attendance_type': 'presencial',
+            'email': f'{username}@example.com',
+        }
+        data.update(fields)
+        return Professional.objects.create(user=user, **data)
+
+    return create
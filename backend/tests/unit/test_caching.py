@@ -0,0 +1,605 @@
+"""
+Unit tests for the professionals caching helpers.
+Tests canonical parameters, the list and detail response caches,
+conditional GET, CDN headers and purging, stampede protection and negative
+caching.
+"""
+import hashlib
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from professionals import caching, cdn
+from professionals.caching import (
+    VERIFICATION_TOKENS_VERSION_KEY,
+    canonical_params,
+    facet_cache,
+    facet_cache_key,
+    get_cache_stats,
+    get_listing_version,
+    list_cache,
+    list_cache_key,
+    record_cache_event,
+    single_flight,
+    verification_token_may_exist,
+    verification_tokens_cache,
+)
+from professionals.models import EmailVerificationToken
+from professionals.tiered_cache import TieredCache
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """Treat the test cache like one every worker shares (Redis)"""
+    monkeypatch.setattr(caching, 'cache_is_shared', lambda: True)
+
+
+class TestCanonicalParams:
+    """Test canonical_params"""
+
+    def test_order_case_and_separators_ignored(self):
+        """Equivalent spellings of a filter set canonicalize the same"""
+        a = QueryDict('state=sp&service=Yoga,Reiki')
+        b = QueryDict('service=reiki&service=yoga&state=SP')
+        assert canonical_params(a, exclude=()) == canonical_params(b, exclude=())
+
+    def test_cursor_keeps_case(self):
+        """Cursors are opaque: case differences are different cursors"""
+        a = QueryDict('cursor=eyJ2IjpbXX0')
+        b = QueryDict('cursor=EYJ2IJPBXX0')
+        assert canonical_params(a, exclude=()) != canonical_params(b, exclude=())
+
+
+@pytest.mark.django_db
+class TestListResponseCache:
+    """Test the versioned list response cache"""
+
+    def test_repeat_request_is_a_hit(self, api_client, create_professional):
+        """An equivalent request is answered without touching the database"""
+        create_professional('ana')
+        first = api_client.get('/api/v1/professionals/?service=Reiki&city=são paulo')
+        assert first['X-Cache'] == 'MISS'
+
+        with CaptureQueriesContext(connection) as queries:
+            second = api_client.get('/api/v1/professionals/?city=SÃO PAULO&service=reiki')
+        assert second['X-Cache'] == 'HIT'
+        assert second.json() == first.json()
+        assert len(queries) == 0
+
+    def test_pagination_is_part_of_the_key(self, api_client, create_professional):
+        """Different pages are cached separately"""
+        create_professional('ana')
+        create_professional('bia')
+        first = api_client.get('/api/v1/professionals/?limit=1').json()
+        second = api_client.get('/api/v1/professionals/?limit=1&offset=1').json()
+        assert first['results'] != second['results']
+
+    def test_write_invalidates(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """Saving a professional moves the listing version on"""
+        ana = create_professional('ana')
+        api_client.get('/api/v1/professionals/')
+
+        ana.name = 'Ana Clara'
+        with django_capture_on_commit_callbacks(execute=True):
+            ana.save()
+
+        response = api_client.get('/api/v1/professionals/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['results'][0]['name'] == 'Ana Clara'
+
+    def test_errors_not_cached(self, api_client):
+        """Invalid requests are re-validated every time"""
+        api_client.get('/api/v1/professionals/?price_min=abc')
+        response = api_client.get('/api/v1/professionals/?price_min=abc')
+        assert response.status_code == 400
+        assert get_cache_stats('list')['hits'] == 0
+
+    def test_hit_miss_counters(self, api_client, create_professional):
+        """Hits and misses are counted in the shared cache"""
+        create_professional('ana')
+        api_client.get('/api/v1/professionals/?state=SP')
+        api_client.get('/api/v1/professionals/?state=sp')
+        api_client.get('/api/v1/professionals/?state=RJ')
+
+        assert get_cache_stats('list') == {'hits': 1, 'misses': 2, 'hit_ratio': pytest.approx(1 / 3)}
+
+    def test_counters_batched_per_process(self, settings):
+        """Events are counted in memory and reach the shared cache on flush"""
+        settings.PROFESSIONAL_CACHE_STATS_FLUSH_INTERVAL = 3600
+        record_cache_event('test', hit=True)
+        record_cache_event('test', hit=False)
+        assert cache.get('professionals:cache-stats:test:hits') is None
+
+        assert get_cache_stats('test') == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+        assert cache.get('professionals:cache-stats:test:hits') == 1
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """Test ETag / Last-Modified validation of list and detail responses"""
+
+    def test_detail_validators(self, api_client, create_professional):
+        """Detail responses carry a strong ETag and Last-Modified"""
+        ana = create_professional('ana')
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert response.status_code == 200
+        assert response['ETag'].startswith('"')
+        assert response['Last-Modified']
+
+    def test_detail_not_modified(self, api_client, create_professional):
+        """A matching If-None-Match gets a 304 with no body"""
+        ana = create_professional('ana')
+        etag = api_client.get(f'/api/v1/professionals/{ana.id}/')['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert not response.content
+        assert len(queries) == 1
+
+    def test_detail_if_modified_since(self, api_client, create_professional):
+        """An unchanged profile is not modified since its Last-Modified"""
+        ana = create_professional('ana')
+        last_modified = api_client.get(f'/api/v1/professionals/{ana.id}/')['Last-Modified']
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+    def test_detail_changes_with_profile_and_user(self, api_client, create_professional):
+        """Editing the profile or its user yields a new ETag"""
+        ana = create_professional('ana')
+        first = api_client.get(f'/api/v1/professionals/{ana.id}/')['ETag']
+
+        ana.bio = 'Terapeuta holística com nova experiência'
+        ana.save()
+        second = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_IF_NONE_MATCH=first)
+        assert second.status_code == 200
+
+        ana.user.email = 'ana.clara@example.com'
+        ana.user.save()
+        third = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_IF_NONE_MATCH=second['ETag'])
+        assert third.status_code == 200
+
+    def test_list_not_modified(self, api_client, create_professional):
+        """An equivalent list request with the ETag gets a 304"""
+        create_professional('ana')
+        etag = api_client.get('/api/v1/professionals/?state=SP&service=Reiki')['ETag']
+        response = api_client.get('/api/v1/professionals/?service=reiki&state=sp', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_list_etag_depends_on_filters(self, api_client, create_professional):
+        """Different filters or pages have different ETags"""
+        create_professional('ana')
+        assert (
+            api_client.get('/api/v1/professionals/?state=SP')['ETag']
+            != api_client.get('/api/v1/professionals/?state=RJ')['ETag']
+            != api_client.get('/api/v1/professionals/?state=RJ&limit=1')['ETag']
+        )
+
+    def test_list_etag_changes_on_write(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """A Professional write invalidates list ETags"""
+        ana = create_professional('ana')
+        etag = api_client.get('/api/v1/professionals/')['ETag']
+
+        ana.price_per_session = 180
+        with django_capture_on_commit_callbacks(execute=True):
+            ana.save()
+
+        response = api_client.get('/api/v1/professionals/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+class TestCdnCaching:
+    """Test shared-cache headers, surrogate keys and purging"""
+
+    def test_list_headers(self, api_client, settings, create_professional):
+        """List pages are publicly cacheable and tagged with their contents"""
+        settings.PROFESSIONAL_CACHE_S_MAXAGE = 120
+        settings.PROFESSIONAL_CACHE_STALE_WHILE_REVALIDATE = 600
+        ana = create_professional('ana')
+        response = api_client.get('/api/v1/professionals/')
+
+        cache_control = response['Cache-Control']
+        assert 'public' in cache_control
+        assert 's-maxage=120' in cache_control
+        assert 'stale-while-revalidate=600' in cache_control
+        keys = response['Surrogate-Key'].split()
+        assert 'professional-list' in keys
+        assert f'professional-list-v{get_listing_version()}' in keys
+        assert f'professional-{ana.id}' in keys
+
+    def test_cached_list_headers(self, api_client, create_professional):
+        """Response cache hits carry the same headers"""
+        ana = create_professional('ana')
+        api_client.get('/api/v1/professionals/')
+        response = api_client.get('/api/v1/professionals/')
+        assert response['X-Cache'] == 'HIT'
+        assert f'professional-{ana.id}' in response['Surrogate-Key'].split()
+
+    def test_detail_headers(self, api_client, settings, create_professional):
+        """Detail pages are tagged with the professional's key"""
+        settings.PROFESSIONAL_SURROGATE_KEY_HEADER = 'Cache-Tag'
+        ana = create_professional('ana')
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert 'public' in response['Cache-Control']
+        assert response['Cache-Tag'] == f'professional-{ana.id}'
+
+    def test_authenticated_requests_private(self, api_client, create_professional):
+        """Owners reading with credentials are never served from a shared cache"""
+        ana = create_professional('ana')
+        api_client.force_authenticate(user=ana.user)
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_AUTHORIZATION='Bearer token')
+        assert 'private' in response['Cache-Control']
+        assert 'Surrogate-Key' not in response
+
+    def test_errors_not_cacheable(self, api_client):
+        """Validation errors carry no public caching headers"""
+        response = api_client.get('/api/v1/professionals/?price_min=abc')
+        assert 'public' not in response.get('Cache-Control', '')
+
+    def test_write_purges_after_commit(self, django_capture_on_commit_callbacks, create_professional):
+        """A save purges the professional and the superseded list version"""
+        ana = create_professional('ana')
+        cdn.purged.clear()
+        version = get_listing_version()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ana.price_per_session = 200
+            ana.save()
+
+        assert f'professional-{ana.id}' in cdn.purged
+        assert f'professional-list-v{version}' in cdn.purged
+
+    def test_invalidation_waits_for_commit(self, django_capture_on_commit_callbacks, create_professional):
+        """Inside a transaction neither the version nor the CDN moves until commit"""
+        ana = create_professional('ana')
+        cdn.purged.clear()
+        version = get_listing_version()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                ana.price_per_session = 200
+                ana.save()
+                assert get_listing_version() == version
+                assert cdn.purged == []
+
+        assert get_listing_version() == version + 1
+        assert f'professional-{ana.id}' in cdn.purged
+
+    def test_delete_purges(self, django_capture_on_commit_callbacks, create_professional):
+        """A delete purges the professional's key"""
+        ana = create_professional('ana')
+        pk = ana.pk
+        with django_capture_on_commit_callbacks(execute=True):
+            ana.delete()
+        assert f'professional-{pk}' in cdn.purged
+
+    def test_purger_failure_does_not_break_writes(self, settings, django_capture_on_commit_callbacks, create_professional):
+        """A failing purger is logged, not raised"""
+        settings.PROFESSIONAL_CDN_PURGER = 'professionals.cdn.BasePurger'
+        with django_capture_on_commit_callbacks(execute=True):
+            create_professional('ana')
+
+
+@pytest.mark.django_db
+class TestDetailCache:
+    """Test the write-through cache of rendered detail responses"""
+
+    def test_read_populates_then_hits(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """The second read is served from the cache without queries"""
+        ana = create_professional('ana')
+        with django_capture_on_commit_callbacks(execute=True):
+            first = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert first['X-Cache'] == 'MISS'
+
+        with CaptureQueriesContext(connection) as queries:
+            second = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+        assert second['ETag'] == first['ETag']
+        assert second['Last-Modified'] == first['Last-Modified']
+        assert len(queries) == 0
+
+    def test_conditional_hit(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """A cached entry answers If-None-Match with a 304"""
+        ana = create_professional('ana')
+        with django_capture_on_commit_callbacks(execute=True):
+            etag = api_client.get(f'/api/v1/professionals/{ana.id}/')['ETag']
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['X-Cache'] == 'HIT'
+
+    def test_update_writes_through(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """An API update stores the new response; the next read is a hit"""
+        ana = create_professional('ana')
+        api_client.force_authenticate(user=ana.user)
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.get(f'/api/v1/professionals/{ana.id}/')
+            api_client.patch(f'/api/v1/professionals/{ana.id}/', {'price_per_session': '180.00'}, format='json')
+
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert response['X-Cache'] == 'HIT'
+        assert response.json()['price_per_session'] == '180.00'
+
+    def test_photo_upload_writes_through(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """Uploading a photo stores a response with the new photo_url"""
+        ana = create_professional('ana')
+        api_client.force_authenticate(user=ana.user)
+        photo = SimpleUploadedFile('photo.png', b'\x89PNG\r\n\x1a\n' + b'0' * 100, content_type='image/png')
+        with django_capture_on_commit_callbacks(execute=True):
+            upload = api_client.post(f'/api/v1/professionals/{ana.id}/upload-photo/', {'photo': photo}, format='multipart')
+        assert upload.status_code == 200
+
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert response['X-Cache'] == 'HIT'
+        assert response.json()['photo_url'] == upload.json()['photo_url']
+
+    def test_cached_photo_url_is_host_independent(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """A response cached through one host doesn't hand its host to another"""
+        ana = create_professional('ana')
+        api_client.force_authenticate(user=ana.user)
+        photo = SimpleUploadedFile('photo.png', b'\x89PNG\r\n\x1a\n' + b'0' * 100, content_type='image/png')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(
+                f'/api/v1/professionals/{ana.id}/upload-photo/', {'photo': photo},
+                format='multipart', HTTP_HOST='localhost',
+            )
+
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/', HTTP_HOST='127.0.0.1')
+        assert response['X-Cache'] == 'HIT'
+        assert 'localhost' not in response.content.decode()
+        assert response.json()['photo'] == response.json()['photo_url']
+
+    def test_other_writes_invalidate(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """Saves outside the API and user edits drop the cached response"""
+        ana = create_professional('ana')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.get(f'/api/v1/professionals/{ana.id}/')
+            ana.name = 'Ana Clara'
+            ana.save()
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['name'] == 'Ana Clara'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.get(f'/api/v1/professionals/{ana.id}/')
+            ana.user.email = 'ana.clara@example.com'
+            ana.user.save()
+        response = api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert response.json()['user']['email'] == 'ana.clara@example.com'
+
+    def test_destroy_deletes(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """A deleted professional is not served from the cache"""
+        ana = create_professional('ana')
+        api_client.force_authenticate(user=ana.user)
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.get(f'/api/v1/professionals/{ana.id}/')
+            api_client.delete(f'/api/v1/professionals/{ana.id}/')
+        assert api_client.get(f'/api/v1/professionals/{ana.id}/').status_code == 404
+
+    def test_non_canonical_ids_bypass(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """Only plain integer ids without query parameters use the cache"""
+        ana = create_professional('ana')
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.get(f'/api/v1/professionals/{ana.id}/')
+        assert api_client.get(f'/api/v1/professionals/{ana.id}/?state=SP')['X-Cache'] == 'MISS'
+
+
+class TestSingleFlight:
+    """Test single_flight stampede protection"""
+
+    def test_concurrent_misses_compute_once(self):
+        """Threads missing the same key share one computation"""
+        tiered = TieredCache('test-flight')
+        calls = []
+        barrier = threading.Barrier(8)
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        def worker():
+            barrier.wait()
+            results.append(single_flight(tiered, 'key', compute, timeout=60))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert [value for value, _ in results] == ['value'] * 8
+        assert sorted(state for _, state in results) == ['HIT'] * 7 + ['MISS']
+
+    def test_serves_stale_while_locked(self):
+        """Another caller's recompute is not waited for when a stale value exists"""
+        tiered = TieredCache('test-flight')
+        cache.set('stale-key', 'old')
+        cache.add(f"{tiered.shared_key('key')}:lock", 'someone-else')
+
+        value, state = single_flight(tiered, 'key', lambda: pytest.fail('must not compute'), 60, stale_key='stale-key')
+        assert (value, state) == ('old', 'STALE')
+
+    def test_computes_after_waiting(self, settings):
+        """Without a stale value, a waiter computes itself once the wait runs out"""
+        settings.PROFESSIONAL_RECOMPUTE_WAIT = 0.1
+        tiered = TieredCache('test-flight')
+        lock_key = f"{tiered.shared_key('key')}:lock"
+        cache.add(lock_key, 'someone-else')
+
+        assert single_flight(tiered, 'key', lambda: 'value', 60) == ('value', 'MISS')
+        assert cache.get(lock_key) == 'someone-else'  # not ours to release
+        assert tiered.get('key') == 'value'
+
+    def test_lock_released_on_error(self):
+        """A failing computation doesn't leave the key locked"""
+        tiered = TieredCache('test-flight')
+
+        def fail():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError):
+            single_flight(tiered, 'key', fail, 60)
+        assert cache.get(f"{tiered.shared_key('key')}:lock") is None
+
+    def test_uncacheable_result(self):
+        """None results are returned but not cached"""
+        tiered = TieredCache('test-flight')
+        assert single_flight(tiered, 'key', lambda: None, 60) == (None, 'MISS')
+        assert tiered.get('key') is None
+
+
+@pytest.mark.django_db
+class TestListAndFacetStampede:
+    """Test single-flight on the list and facet endpoints"""
+
+    def _lock(self, tiered, key):
+        cache.add(f'{tiered.shared_key(key)}:lock', 'another-request')
+
+    def test_list_serves_previous_page_during_recompute(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """After a write, a request racing the recompute gets the old page, uncacheable"""
+        ana = create_professional('ana')
+        first = api_client.get('/api/v1/professionals/?state=SP')
+
+        ana.price_per_session = 190
+        with django_capture_on_commit_callbacks(execute=True):
+            ana.save()
+        request = APIRequestFactory().get('/api/v1/professionals/?state=SP')
+        self._lock(list_cache, list_cache_key(Request(request)))
+
+        response = api_client.get('/api/v1/professionals/?state=SP')
+        assert response['X-Cache'] == 'STALE'
+        assert response.json() == first.json()
+        assert response['ETag'] == first['ETag']
+        assert 'no-store' in response['Cache-Control']
+        assert 'Surrogate-Key' not in response
+
+    def test_facets_cached(self, api_client, create_professional):
+        """Facet counts are computed once per filter set and listing version"""
+        create_professional('ana')
+        assert api_client.get('/api/v1/professionals/facets/?state=SP')['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/v1/professionals/facets/?state=sp&limit=5')
+        assert response['X-Cache'] == 'HIT'
+        assert len(queries) == 0
+
+    def test_facets_serve_stale_during_recompute(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """Facets racing a recompute get the previous counts"""
+        ana = create_professional('ana')
+        first = api_client.get('/api/v1/professionals/facets/').json()
+
+        ana.state = 'RJ'
+        with django_capture_on_commit_callbacks(execute=True):
+            ana.save()
+        self._lock(facet_cache, facet_cache_key(QueryDict()))
+
+        response = api_client.get('/api/v1/professionals/facets/')
+        assert response['X-Cache'] == 'STALE'
+        assert response.json() == first
+
+
+@pytest.mark.django_db
+class TestNegativeCaching:
+    """Test negative caching of missing professionals and unknown tokens"""
+
+    def test_missing_professional_cached(self, api_client):
+        """A second lookup of a missing id doesn't query the database"""
+        assert api_client.get('/api/v1/professionals/999999/').status_code == 404
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/v1/professionals/999999/')
+        assert response.status_code == 404
+        assert len(queries) == 0
+
+    def test_created_professional_replaces_negative_entry(self, api_client, django_capture_on_commit_callbacks, create_professional):
+        """Creating a professional with a remembered id makes it visible"""
+        ana = create_professional('ana')
+        next_id = ana.id + 1
+        assert api_client.get(f'/api/v1/professionals/{next_id}/').status_code == 404
+
+        with django_capture_on_commit_callbacks(execute=True):
+            bia = create_professional('bia')
+        assert bia.id == next_id
+        assert api_client.get(f'/api/v1/professionals/{next_id}/').status_code == 200
+
+    def test_unknown_token_skips_database_and_logs(self, api_client, caplog, shared_cache):
+        """Guessed verification codes are rejected from the cached token set"""
+        api_client.post('/api/v1/professionals/verify-email/', {'token': '000001'}, format='json')
+        caplog.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post('/api/v1/professionals/verify-email/', {'token': '000002'}, format='json')
+        assert response.status_code == 400
+        assert response.json() == {'token': ['Token inválido']}
+        assert len(queries) == 0
+        assert not caplog.records
+
+    def test_new_token_accepted_after_commit(self, api_client, django_capture_on_commit_callbacks, shared_cache):
+        """A token created after the set was built is still verified"""
+        api_client.post('/api/v1/professionals/verify-email/', {'token': '000001'}, format='json')
+        user = User.objects.create_user(username='new', email='new@example.com', password='SecurePass123', is_active=False)
+        with django_capture_on_commit_callbacks(execute=True):
+            token = EmailVerificationToken.create_token(user)
+
+        response = api_client.post('/api/v1/professionals/verify-email/', {'token': token.token}, format='json')
+        assert response.status_code == 200
+
+    def test_expired_token_still_reported_expired(self, api_client, shared_cache):
+        """Expired tokens stay in the set and still get the expiry error"""
+        user = User.objects.create_user(username='old', email='old@example.com', password='SecurePass123', is_active=False)
+        token = EmailVerificationToken.create_token(user, expiry_hours=-1)
+
+        response = api_client.post('/api/v1/professionals/verify-email/', {'token': token.token}, format='json')
+        assert response.status_code == 400
+        assert response.json() == {'token': ['Token expirado']}
+
+    def test_token_checked_after_trimming(self, api_client, shared_cache):
+        """The pre-check sees the token as the serializer cleans it"""
+        user = User.objects.create_user(username='new', email='new@example.com', password='SecurePass123', is_active=False)
+        token = EmailVerificationToken.create_token(user)
+
+        response = api_client.post('/api/v1/professionals/verify-email/', {'token': f' {token.token} '}, format='json')
+        assert response.status_code == 200
+
+    def test_per_process_cache_never_rejects(self, api_client):
+        """
+        Without a shared cache another worker's new token can't bump this
+        process's version, so every code goes to the database
+        """
+        api_client.post('/api/v1/professionals/verify-email/', {'token': '000001'}, format='json')
+        user = User.objects.create_user(username='new', email='new@example.com', password='SecurePass123', is_active=False)
+        token = EmailVerificationToken.create_token(user)  # no commit hook: no bump
+
+        response = api_client.post('/api/v1/professionals/verify-email/', {'token': token.token}, format='json')
+        assert response.status_code == 200
+
+    def test_missing_set_means_may_exist(self, shared_cache):
+        """A missing version or digest set sends the code to the database"""
+        assert verification_token_may_exist('000001')
+        assert not verification_token_may_exist('000001')
+        version = cache.get(VERIFICATION_TOKENS_VERSION_KEY)
+
+        verification_tokens_cache.delete(version)
+        assert verification_token_may_exist('000001')
+
+    def test_token_digests_are_keyed(self, shared_cache):
+        """The cached set never holds raw codes or plain hashes of them"""
+        user = User.objects.create_user(username='new', email='new@example.com', password='SecurePass123')
+        token = EmailVerificationToken.create_token(user)
+        verification_token_may_exist(token.token)
+        assert verification_token_may_exist(token.token)
+        digests = verification_tokens_cache.get(cache.get(VERIFICATION_TOKENS_VERSION_KEY))
+        assert token.token not in digests
+        assert hashlib.sha256(token.token.encode()).hexdigest()[:16] not in digests
@@ -0,0 +1,148 @@
+"""
+Unit tests for the in-process city catalog.
+Tests CityCatalog on its own and the cities autocomplete endpoint.
+"""
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from professionals.catalog import CityCatalog, get_catalog
+from professionals.models import City
+
+
+ROWS = [
+    ('SP', 'Campinas'),
+    ('MS', 'Campo Grande'),
+    ('PB', 'Campina Grande'),
+    ('BA', 'Camaçari'),
+    ('SP', 'São Paulo'),
+    ('MA', 'São Luís'),
+    ('SP', 'Santos'),
+]
+
+
+class TestCityCatalog:
+    """Test CityCatalog in isolation"""
+
+    def test_prefix_match_alphabetical(self):
+        """All names starting with the prefix, in folded alphabetical order"""
+        results = CityCatalog(ROWS).autocomplete('cam')
+        assert [r['name'] for r in results] == ['Camaçari', 'Campina Grande', 'Campinas', 'Campo Grande']
+
+    def test_accent_and_case_insensitive(self):
+        """'SAO' and 'são' both match São Paulo and São Luís"""
+        catalog = CityCatalog(ROWS)
+        assert catalog.autocomplete('SAO') == catalog.autocomplete('são')
+        assert [r['name'] for r in catalog.autocomplete('sao')] == ['São Luís', 'São Paulo']
+
+    def test_returns_state(self):
+        """Each result carries its state"""
+        assert CityCatalog(ROWS).autocomplete('santos') == [{'name': 'Santos', 'state': 'SP'}]
+
+    def test_limit(self):
+        """At most limit results"""
+        assert len(CityCatalog(ROWS).autocomplete('cam', limit=2)) == 2
+
+    def test_state_filter(self):
+        """state restricts results to one state"""
+        results = CityCatalog(ROWS).autocomplete('cam', state='sp')
+        assert results == [{'name': 'Campinas', 'state': 'SP'}]
+
+    def test_empty_or_unmatched_prefix(self):
+        """Blank and unmatched prefixes return nothing"""
+        catalog = CityCatalog(ROWS)
+        assert catalog.autocomplete('  ') == []
+        assert catalog.autocomplete('xyz') == []
+
+    def test_cities_in_portuguese_order(self):
+        """Accented initials sort with their base letter, not after Z"""
+        catalog = CityCatalog([('SP', 'Zacarias'), ('SP', 'Águas de Lindóia'), ('SP', 'Americana'), ('SP', 'Avaré')])
+        assert catalog.cities('sp') == ['Águas de Lindóia', 'Americana', 'Avaré', 'Zacarias']
+        assert catalog.cities('RJ') == []
+
+    def test_state_payload(self):
+        """Per-state JSON is rendered once, with an ETag over its bytes"""
+        catalog = CityCatalog(ROWS)
+        body, etag = catalog.state_payload('SP')
+        assert json.loads(body) == {'state': 'SP', 'cities': ['Campinas', 'Santos', 'São Paulo'], 'count': 3}
+        assert catalog.state_payload('sp') == (body, etag)
+        assert catalog.state_payload('RJ') is None
+
+
+@pytest.mark.django_db
+class TestCityCatalogRebuild:
+    """Test catalog invalidation on City writes"""
+
+    def test_new_city_visible_after_save(self):
+        """Saving a City rebuilds the catalog on next access"""
+        assert get_catalog().autocomplete('cidade nova') == []
+        City.objects.create(state='SP', name='Cidade Nova Paulista')
+        assert get_catalog().autocomplete('cidade nova') == [{'name': 'Cidade Nova Paulista', 'state': 'SP'}]
+
+    def test_deleted_city_disappears(self):
+        """Deleting a City rebuilds the catalog on next access"""
+        assert get_catalog().autocomplete('sorocaba')
+        City.objects.filter(state='SP', name='Sorocaba').delete()  # queryset delete still sends post_delete
+        assert get_catalog().autocomplete('sorocaba') == []
+
+
+@pytest.mark.django_db
+class TestCitiesAutocompleteEndpoint:
+    """Test GET /api/v1/professionals/cities/autocomplete/"""
+
+    def test_autocomplete(self, api_client):
+        """Anonymous users get matching cities with their state"""
+        response = api_client.get('/api/v1/professionals/cities/autocomplete/?q=camp')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['query'] == 'camp'
+        assert {'name': 'Campinas', 'state': 'SP'} in data['results']
+        assert {'name': 'Campo Grande', 'state': 'MS'} in data['results']
+
+    def test_no_database_query_once_built(self, api_client):
+        """After the first build, lookups don't hit the database"""
+        get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/v1/professionals/cities/autocomplete/?q=sao&state=SP&limit=5')
+        assert response.status_code == 200
+        assert {'name': 'São Paulo', 'state': 'SP'} in response.json()['results']
+        assert len(queries) == 0
+
+    def test_invalid_limit(self, api_client):
+        """Non-numeric limit is rejected"""
+        response = api_client.get('/api/v1/professionals/cities/autocomplete/?q=sao&limit=abc')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestCitiesByStateEndpoint:
+    """Test GET /api/v1/professionals/cities/{state}/ served from the catalog"""
+
+    def test_no_queries(self, api_client):
+        """Once the catalog is built, requests don't touch the database"""
+        get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/v1/professionals/cities/SP/')
+        assert response.status_code == 200
+        assert 'Campinas' in response.json()['cities']
+        assert len(queries) == 0
+
+    def test_cache_headers(self, api_client, settings):
+        """Responses are publicly cacheable and revalidate by ETag"""
+        settings.CITY_CATALOG_MAX_AGE = 3600
+        response = api_client.get('/api/v1/professionals/cities/SP/')
+        assert 'public' in response['Cache-Control']
+        assert 'max-age=3600' in response['Cache-Control']
+
+        revalidated = api_client.get('/api/v1/professionals/cities/SP/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert revalidated.status_code == 304
+        assert revalidated['ETag'] == response['ETag']
+
+    def test_city_write_changes_payload(self, api_client):
+        """A new city shows up and changes the ETag"""
+        first = api_client.get('/api/v1/professionals/cities/SP/')
+        City.objects.create(state='SP', name='Cidade Nova Paulista')
+        second = api_client.get('/api/v1/professionals/cities/SP/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == 200
+        assert 'Cidade Nova Paulista' in second.json()['cities']
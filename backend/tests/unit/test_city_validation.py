@@ -2,10 +2,18 @@
 Unit tests for city and state validation.
 Tests that professional registrations validate city-state pairs correctly.
 """
+import io
+
 import pytest
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
+from professionals.catalog import get_catalog
 from professionals.models import Professional, City
+from professionals.validators import validate_city_state_pair
 
 
 @pytest.fixture
@@ -240,3 +248,74 @@ class TestCityStateValidation:
         # Original values should be unchanged
         assert professional.city == 'São Paulo'
         assert professional.state == 'SP'
+
+
+    @pytest.mark.django_db
+    def test_update_stores_catalog_spelling(self, api_client, city_data):
+        """A city typed without accents is stored as the catalog spells it, with coordinates"""
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        professional = Professional.objects.create(
+            user=user,
+            name='João Silva',
+            bio='Especialista em Reiki com mais de 10 anos de experiência em terapias holísticas.',
+            services=['Reiki'],
+            city='Campinas',
+            state='SP',
+            price_per_session=150.00,
+            email='test@example.com'
+        )
+        api_client.force_authenticate(user=user)
+
+        response = api_client.patch(
+            f'/api/v1/professionals/{professional.id}/',
+            {'city': 'sao paulo', 'state': 'SP'},
+            format='json'
+        )
+
+        assert response.status_code == 200
+        professional.refresh_from_db()
+        assert professional.city == 'São Paulo'
+        assert professional.latitude is not None
+
+
+@pytest.mark.django_db
+class TestCityStatePairValidator:
+    """Test validate_city_state_pair against the in-process city catalog"""
+
+    def test_no_database_query(self, city_data):
+        """Validation is answered from memory once the catalog is built"""
+        get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            validate_city_state_pair('Campinas', 'SP')
+        assert len(queries) == 0
+
+    def test_case_and_accent_insensitive(self, city_data):
+        """'sao paulo' and 'SÃO PAULO' are São Paulo"""
+        assert validate_city_state_pair('sao paulo', 'SP') == 'São Paulo'
+        assert validate_city_state_pair('SÃO  PAULO', 'sp') == 'São Paulo'
+
+    def test_wrong_state(self, city_data):
+        """A city is only valid for its own state"""
+        with pytest.raises(DjangoValidationError):
+            validate_city_state_pair('Campinas', 'RJ')
+
+    def test_import_refreshes(self, tmp_path):
+        """Cities imported in bulk (no signals) become valid immediately"""
+        with pytest.raises(DjangoValidationError):
+            validate_city_state_pair('Cidade Importada', 'SP')
+
+        path = tmp_path / 'cities.csv'
+        path.write_text('state,name,latitude,longitude\nsp,Cidade Importada,-23.1,-46.5\n', encoding='utf-8')
+        call_command('import_cities', file=str(path), stdout=io.StringIO())
+
+        validate_city_state_pair('Cidade Importada', 'SP')
+        assert City.objects.get(state='SP', name='Cidade Importada').latitude == -23.1
+
+    def test_import_bundled_dataset_keeps_existing(self):
+        """Importing the bundled dataset twice creates nothing the second time"""
+        out = io.StringIO()
+        call_command('import_cities', stdout=out)
+        count = City.objects.count()
+        call_command('import_cities', stdout=out)
+        assert City.objects.count() == count
+        assert 'Imported 0 new cities' in out.getvalue()
@@ -0,0 +1,105 @@
+"""
+Unit tests for facet counts.
+Tests compute_facets and the /professionals/facets/ endpoint.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from professionals.models import Professional
+from professionals.facets import compute_facets
+
+
+@pytest.fixture
+def professionals():
+    """Professionals spread over services, states, attendance and prices"""
+    rows = [
+        ('joao', ['Reiki', 'Yoga'], 'SP', 'presencial', 80),
+        ('maria', ['Acupuntura'], 'RJ', 'online', 150),
+        ('pedro', ['Reiki'], 'SP', 'ambos', 250),
+        ('ana', ['Yoga'], 'MG', 'online', 600),
+    ]
+    created = []
+    for username, services, state, attendance_type, price in rows:
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+        created.append(Professional.objects.create(
+            user=user,
+            name=username.title(),
+            bio='Terapeuta holístico com experiência',
+            services=services,
+            city='Cidade',
+            state=state,
+            price_per_session=price,
+            attendance_type=attendance_type,
+            email=f'{username}@example.com',
+        ))
+    return created
+
+
+def _counts(entries):
+    return {entry['value']: entry['count'] for entry in entries}
+
+
+@pytest.mark.django_db
+class TestComputeFacets:
+    """Test compute_facets"""
+
+    def test_unfiltered_counts(self, professionals):
+        """Every facet counts all professionals"""
+        facets = compute_facets({})
+
+        services = _counts(facets['service'])
+        assert services['Reiki'] == 2
+        assert services['Yoga'] == 2
+        assert services['Acupuntura'] == 1
+        assert services['Florais'] == 0
+        assert _counts(facets['state']) == {'MG': 1, 'RJ': 1, 'SP': 2}
+        assert _counts(facets['attendance_type']) == {'presencial': 1, 'online': 2, 'ambos': 1}
+        assert [b['count'] for b in facets['price']] == [1, 1, 1, 0, 1]
+
+    def test_filters_narrow_other_facets(self, professionals):
+        """A state filter narrows service, attendance and price counts"""
+        facets = compute_facets({'state': 'SP'})
+
+        assert _counts(facets['service'])['Reiki'] == 2
+        assert _counts(facets['service'])['Acupuntura'] == 0
+        assert _counts(facets['attendance_type']) == {'presencial': 1, 'online': 0, 'ambos': 1}
+
+    def test_facet_ignores_its_own_filter(self, professionals):
+        """Selecting a state still reports the other states' counts"""
+        facets = compute_facets({'state': 'SP'})
+        assert _counts(facets['state']) == {'MG': 1, 'RJ': 1, 'SP': 2}
+
+    def test_one_query_per_facet(self, professionals):
+        """Counts use grouped aggregation, not a COUNT per option"""
+        with CaptureQueriesContext(connection) as queries:
+            compute_facets({'service': 'Reiki', 'price_max': 300})
+        assert len(queries) == 4
+
+
+@pytest.mark.django_db
+class TestFacetsEndpoint:
+    """Test GET /api/v1/professionals/facets/"""
+
+    def test_facets_returns_200(self, api_client, professionals):
+        """Anonymous users can read facet counts"""
+        response = api_client.get('/api/v1/professionals/facets/?attendance_type=online')
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {'service', 'state', 'attendance_type', 'price'}
+        assert _counts(data['state']) == {'MG': 1, 'RJ': 1}
+
+    def test_facets_with_full_text_search(self, api_client, professionals):
+        """q restricts facets like it restricts the list"""
+        maria = professionals[1]
+        maria.bio = 'Especialista em acupuntura'
+        maria.save()
+
+        data = api_client.get('/api/v1/professionals/facets/?q=acupuntura').json()
+        assert _counts(data['state']) == {'RJ': 1}
+
+    def test_facets_invalid_params(self, api_client, professionals):
+        """Invalid filter values are rejected like on the list endpoint"""
+        response = api_client.get('/api/v1/professionals/facets/?price_min=abc')
+        assert response.status_code == 400
+        assert 'price_min' in response.json()
@@ -2,10 +2,13 @@
 Unit tests for professional filters.
 Tests filtering logic for Professional queryset.
 """
+import io
 import pytest
 from django.contrib.auth.models import User
+from django.db import connection
 from professionals.models import Professional
 from professionals.filters import ProfessionalFilter
+from professionals.search import FTS_TABLE, sqlite_fts_available
 
 
 @pytest.fixture
@@ -245,4 +248,411 @@ class TestProfessionalFilter:
         results = filterset.qs
 
         # Should return all professionals (empty filters ignored)
-        assert results.count() == 3
\ No newline at end of file
+        assert results.count() == 3
+
+class TestServiceLookupTable:
+    """Test the ProfessionalService relation behind the service filter"""
+
+    @pytest.mark.django_db
+    def test_service_links_created_on_save(self, professionals):
+        """Saving a professional mirrors its services into ProfessionalService"""
+        prof1 = professionals[0]
+        services = set(prof1.service_links.values_list('service', flat=True))
+        assert services == {'Reiki', 'Meditação'}
+
+    @pytest.mark.django_db
+    def test_service_links_follow_updates(self, professionals):
+        """Removed services stop matching, added services start matching"""
+        prof1 = professionals[0]
+        prof1.services = ['Yoga']
+        prof1.save()
+
+        assert set(prof1.service_links.values_list('service', flat=True)) == {'Yoga'}
+        names = [p.name for p in ProfessionalFilter(data={'service': 'Yoga'}).qs]
+        assert names == ['João Silva']
+        reiki_names = [p.name for p in ProfessionalFilter(data={'service': 'Reiki'}).qs]
+        assert 'João Silva' not in reiki_names
+
+    @pytest.mark.django_db
+    def test_filter_by_service_case_insensitive(self, professionals):
+        """Service names are canonicalized before the exact lookup"""
+        results = ProfessionalFilter(data={'service': 'reiki'}).qs
+        assert results.count() == 2
+
+    @pytest.mark.django_db
+    def test_filter_by_service_does_not_match_substrings(self, professionals):
+        """A service name that contains the query is not a match"""
+        prof2 = professionals[1]
+        prof2.services = ['Reiki Xamânico']
+        prof2.save()
+
+        names = [p.name for p in ProfessionalFilter(data={'service': 'Reiki'}).qs]
+        assert 'Maria Santos' not in names
+        assert ProfessionalFilter(data={'service': 'Rei'}).qs.count() == 0
+
+    @pytest.mark.django_db
+    def test_backfill_command_rebuilds_links(self, professionals):
+        """sync_professional_services restores rows missing from the lookup table"""
+        from django.core.management import call_command
+        from professionals.models import ProfessionalService
+
+        ProfessionalService.objects.all().delete()
+        assert ProfessionalFilter(data={'service': 'Reiki'}).qs.count() == 0
+
+        call_command('sync_professional_services', stdout=io.StringIO())
+
+        assert ProfessionalService.objects.count() == 6
+        assert ProfessionalFilter(data={'service': 'Reiki'}).qs.count() == 2
+
+
+class TestMultiServiceFilter:
+    """Test 'any of' / 'all of' semantics for several services"""
+
+    @pytest.mark.django_db
+    def test_any_of_services(self, professionals):
+        """Comma-separated services match professionals offering any of them"""
+        results = ProfessionalFilter(data={'service': 'Acupuntura,Tarot'}).qs
+        names = sorted(p.name for p in results)
+        assert names == ['Maria Santos', 'Pedro Costa']
+
+    @pytest.mark.django_db
+    def test_all_of_services(self, professionals):
+        """service_match=all requires every listed service"""
+        results = ProfessionalFilter(data={
+            'service': 'Reiki,Tarot',
+            'service_match': 'all',
+        }).qs
+        assert [p.name for p in results] == ['Pedro Costa']
+
+    @pytest.mark.django_db
+    def test_all_of_single_service(self, professionals):
+        """service_match=all with one service behaves like a plain lookup"""
+        results = ProfessionalFilter(data={'service': 'Reiki', 'service_match': 'all'}).qs
+        assert results.count() == 2
+
+    @pytest.mark.django_db
+    def test_invalid_service_match(self, professionals):
+        """Unknown service_match values are rejected"""
+        filterset = ProfessionalFilter(data={'service': 'Reiki', 'service_match': 'some'})
+        assert not filterset.is_valid()
+        assert 'service_match' in filterset.errors
+
+    @pytest.mark.django_db
+    def test_backend_selection_by_vendor(self, professionals):
+        """SQLite uses the lookup-table backend"""
+        from professionals.filters import (
+            get_service_backend,
+            PostgresServiceSearchBackend,
+        )
+        backend = get_service_backend(Professional.objects.all())
+        assert not isinstance(backend, PostgresServiceSearchBackend)
+
+    @pytest.mark.django_db
+    def test_listing_uses_containment_on_postgres(self, monkeypatch):
+        """The read model gets the JSONB containment backend like Professional"""
+        from django.db import connections
+        from professionals.filters import (
+            get_service_backend,
+            PostgresServiceSearchBackend,
+        )
+        from professionals.models import ProfessionalListing
+        monkeypatch.setattr(connections['default'], 'vendor', 'postgresql')
+        backend = get_service_backend(ProfessionalListing.objects.all())
+        assert isinstance(backend, PostgresServiceSearchBackend)
+
+
+class TestCityNormalization:
+    """Test accent-insensitive city search"""
+
+    @pytest.mark.django_db
+    def test_city_normalized_maintained_on_save(self, professionals):
+        """city_normalized is derived from city on every save"""
+        prof1 = professionals[0]
+        assert prof1.city_normalized == 'sao paulo'
+
+        prof1.city = 'Ribeirão Preto'
+        prof1.save(update_fields=['city'])
+        prof1.refresh_from_db()
+        assert prof1.city_normalized == 'ribeirao preto'
+
+    @pytest.mark.django_db
+    def test_filter_by_city_without_accents(self, professionals):
+        """'Sao Paulo' matches 'São Paulo'"""
+        results = ProfessionalFilter(data={'city': 'Sao Paulo'}).qs
+        assert [p.name for p in results] == ['João Silva']
+
+    @pytest.mark.django_db
+    def test_filter_by_city_case_insensitive(self, professionals):
+        """Upper-case input with accents still matches"""
+        results = ProfessionalFilter(data={'city': 'SÃO PAULO'}).qs
+        assert [p.name for p in results] == ['João Silva']
+
+    @pytest.mark.django_db
+    def test_filter_by_city_inner_word(self, professionals):
+        """Partial searches match inside the city name"""
+        results = ProfessionalFilter(data={'city': 'horizonte'}).qs
+        assert [p.name for p in results] == ['Pedro Costa']
+
+
+class TestFullTextSearch:
+    """Test the q full-text filter over name and bio"""
+
+    @pytest.mark.django_db
+    def test_search_bio_word(self, professionals):
+        """Words from the bio match"""
+        results = ProfessionalFilter(data={'q': 'acupuntura'}).qs
+        assert [p.name for p in results] == ['Maria Santos']
+
+    @pytest.mark.django_db
+    def test_search_is_accent_insensitive(self, professionals):
+        """'holistico' matches 'holístico'"""
+        results = ProfessionalFilter(data={'q': 'holistico'}).qs
+        assert [p.name for p in results] == ['Pedro Costa']
+
+    @pytest.mark.django_db
+    def test_search_ranks_name_above_bio(self, professionals):
+        """A match in the name outranks a match in the bio"""
+        prof3 = professionals[2]
+        prof3.bio = 'Terapeuta holístico, aluno de Maria por muitos anos'
+        prof3.save()
+
+        results = list(ProfessionalFilter(data={'q': 'Maria'}).qs)
+        assert [p.name for p in results] == ['Maria Santos', 'Pedro Costa']
+        assert results[0].search_rank > results[1].search_rank
+
+    @pytest.mark.django_db
+    def test_search_document_updates_on_save(self, professionals):
+        """Editing the bio re-indexes the professional"""
+        prof1 = professionals[0]
+        prof1.bio = 'Trabalho com chakras e ansiedade'
+        prof1.save()
+
+        assert [p.name for p in ProfessionalFilter(data={'q': 'chakras'}).qs] == ['João Silva']
+        assert ProfessionalFilter(data={'q': 'Especialista Reiki'}).qs.count() == 0
+
+    @pytest.mark.django_db
+    def test_search_ignores_query_syntax(self, professionals):
+        """Operators and quotes in q are treated as plain words"""
+        results = ProfessionalFilter(data={'q': '"Reiki" OR NEAR('}).qs
+        assert results.count() == 0
+
+    @pytest.mark.django_db
+    def test_search_combines_with_filters(self, professionals):
+        """q narrows the other filters"""
+        results = ProfessionalFilter(data={'q': 'especialista', 'state': 'RJ'}).qs
+        assert [p.name for p in results] == ['Maria Santos']
+
+    @pytest.mark.django_db
+    def test_search_parameters_independent_of_match_count(self, professionals):
+        """Many matches don't become one bound parameter each (SQLite's variable limit)"""
+        if connection.vendor != 'sqlite' or not sqlite_fts_available():
+            pytest.skip('SQLite FTS5 ranking')
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, bio) VALUES (%s, %s, %s)",
+                [(100_000 + i, 'Terapeuta', 'Especialista em Reiki') for i in range(2000)],
+            )
+
+        qs = ProfessionalFilter(data={'q': 'reiki'}).qs
+        _, params = qs.query.sql_with_params()
+        assert len(params) < 10
+        assert [p.name for p in qs] == ['João Silva']
+
+
+class TestProximitySearch:
+    """Test lat/lon/radius_km proximity filtering"""
+
+    # Praça da Sé, São Paulo
+    SAO_PAULO = {'lat': -23.55, 'lon': -46.63}
+
+    @pytest.fixture
+    def nearby(self, professionals):
+        """Adds a professional in Guarulhos (~15 km from São Paulo) and one in Campinas (~85 km)"""
+        created = []
+        for username, city in [('guarulhos', 'Guarulhos'), ('campinas', 'Campinas')]:
+            user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+            created.append(Professional.objects.create(
+                user=user,
+                name=f'Terapeuta {city}',
+                bio='Terapeuta holístico com experiência',
+                services=['Reiki'],
+                city=city,
+                state='SP',
+                price_per_session=120.00,
+                attendance_type='presencial',
+                email=f'{username}@example.com',
+            ))
+        return professionals + created
+
+    @pytest.mark.django_db
+    def test_coordinates_copied_from_city(self, professionals):
+        """Saving a professional copies the City coordinates"""
+        prof1 = professionals[0]
+        assert prof1.latitude == pytest.approx(-23.55)
+        assert prof1.longitude == pytest.approx(-46.63)
+
+        prof1.city = 'Campinas'
+        prof1.save(update_fields=['city'])
+        prof1.refresh_from_db()
+        assert prof1.latitude == pytest.approx(-22.91)
+
+    @pytest.mark.django_db
+    def test_unknown_city_has_no_coordinates(self, professionals):
+        """Cities missing from the catalog never match a radius"""
+        prof1 = professionals[0]
+        prof1.city = 'Cidade Inexistente'
+        prof1.save()
+        assert prof1.latitude is None
+        assert ProfessionalFilter(data={**self.SAO_PAULO, 'radius_km': 500}).qs.filter(pk=prof1.pk).count() == 0
+
+    @pytest.mark.django_db
+    def test_within_radius(self, nearby):
+        """Only professionals inside the circle match"""
+        results = ProfessionalFilter(data={**self.SAO_PAULO, 'radius_km': 25}).qs
+        assert sorted(p.name for p in results) == ['João Silva', 'Terapeuta Guarulhos']
+
+        wider = ProfessionalFilter(data={**self.SAO_PAULO, 'radius_km': 100}).qs
+        assert wider.count() == 3
+
+    @pytest.mark.django_db
+    def test_distance_ordering(self, nearby):
+        """ordering=distance sorts nearest first and exposes distance_km"""
+        results = list(ProfessionalFilter(data={**self.SAO_PAULO, 'radius_km': 100, 'ordering': 'distance'}).qs)
+        assert [p.city for p in results] == ['São Paulo', 'Guarulhos', 'Campinas']
+        assert results[0].distance_km == pytest.approx(0, abs=0.01)
+        assert 10 < results[1].distance_km < 20
+        assert 75 < results[2].distance_km < 95
+
+    @pytest.mark.django_db
+    def test_combines_with_other_filters(self, nearby):
+        """Proximity narrows the other filters"""
+        results = ProfessionalFilter(data={**self.SAO_PAULO, 'radius_km': 100, 'price_max': 130}).qs
+        assert [p.city for p in results] == ['Campinas', 'Guarulhos']
+
+    @pytest.mark.django_db
+    def test_lat_without_lon_is_invalid(self, professionals):
+        """lat and lon must be given together"""
+        filterset = ProfessionalFilter(data={'lat': -23.55})
+        assert not filterset.is_valid()
+        assert 'lon' in filterset.errors
+
+    @pytest.mark.django_db
+    def test_distance_ordering_requires_coordinates(self, professionals):
+        """ordering=distance without a point is rejected"""
+        filterset = ProfessionalFilter(data={'ordering': 'distance'})
+        assert not filterset.is_valid()
+        assert 'ordering' in filterset.errors
+
+    @pytest.mark.django_db
+    def test_list_endpoint_with_cursor_pagination(self, api_client, nearby):
+        """Distance-sorted results page with keyset cursors"""
+        url = '/api/v1/professionals/?lat=-23.55&lon=-46.63&radius_km=100&ordering=distance&pagination=cursor&limit=2'
+        first = api_client.get(url).json()
+        assert [p['city'] for p in first['results']] == ['São Paulo', 'Guarulhos']
+        assert first['results'][1]['distance_km'] < 20
+
+        second = api_client.get(first['next']).json()
+        assert [p['city'] for p in second['results']] == ['Campinas']
+
+
+class TestMultiValueFilters:
+    """Test several values for service, state and attendance_type"""
+
+    @pytest.mark.django_db
+    def test_comma_separated_states(self, professionals):
+        """state=SP,RJ matches either state"""
+        results = ProfessionalFilter(data={'state': 'sp,RJ'}).qs
+        assert sorted(p.state for p in results) == ['RJ', 'SP']
+
+    @pytest.mark.django_db
+    def test_repeated_parameters(self, professionals):
+        """Repeated parameters behave like a comma-separated list"""
+        from django.http import QueryDict
+        data = QueryDict('state=SP&state=MG&attendance_type=presencial&attendance_type=AMBOS')
+        results = ProfessionalFilter(data=data).qs
+        assert sorted(p.name for p in results) == ['João Silva', 'Pedro Costa']
+
+    @pytest.mark.django_db
+    def test_services_and_states_combined(self, professionals):
+        """Values are OR-ed within a filter and AND-ed across filters"""
+        results = ProfessionalFilter(data={'service': 'Reiki,Acupuntura', 'state': 'RJ,MG'}).qs
+        assert sorted(p.name for p in results) == ['Maria Santos', 'Pedro Costa']
+
+    @pytest.mark.django_db
+    def test_single_query(self, professionals):
+        """All values are resolved by one SQL statement"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        filterset = ProfessionalFilter(data={
+            'service': 'Reiki,Acupuntura',
+            'state': 'SP,RJ,MG',
+            'attendance_type': 'online,ambos',
+        })
+        with CaptureQueriesContext(connection) as queries:
+            names = sorted(p.name for p in filterset.qs)
+        assert names == ['Maria Santos', 'Pedro Costa']
+        assert len(queries) == 1
+
+    @pytest.mark.django_db
+    def test_stable_pagination_with_equal_timestamps(self, api_client, professionals):
+        """Pages never repeat or skip rows when created_at ties"""
+        for professional in professionals:
+            professional.created_at = professionals[0].created_at
+            professional.save()
+
+        seen = []
+        for offset in range(3):
+            data = api_client.get(f'/api/v1/professionals/?state=SP&state=RJ&state=MG&limit=1&offset={offset}').json()
+            seen.extend(p['id'] for p in data['results'])
+        assert seen == sorted((p.id for p in professionals), reverse=True)
+
+
+class TestOrdering:
+    """Test the ordering whitelist"""
+
+    @pytest.mark.django_db
+    def test_cheapest_first(self, professionals):
+        """ordering=price sorts by ascending price"""
+        results = ProfessionalFilter(data={'ordering': 'price'}).qs
+        assert [p.name for p in results] == ['Pedro Costa', 'João Silva', 'Maria Santos']
+
+    @pytest.mark.django_db
+    def test_most_expensive_first(self, professionals):
+        """ordering=-price sorts by descending price"""
+        results = ProfessionalFilter(data={'ordering': '-price'}).qs
+        assert [p.name for p in results] == ['Maria Santos', 'João Silva', 'Pedro Costa']
+
+    @pytest.mark.django_db
+    def test_newest_first(self, professionals):
+        """ordering=newest matches the default ordering"""
+        results = ProfessionalFilter(data={'ordering': 'newest'}).qs
+        assert [p.name for p in results] == ['Pedro Costa', 'Maria Santos', 'João Silva']
+
+    @pytest.mark.django_db
+    def test_ordering_overrides_relevance(self, professionals):
+        """An explicit ordering replaces q's relevance order"""
+        results = ProfessionalFilter(data={'q': 'especialista', 'ordering': '-price'}).qs
+        assert [p.name for p in results] == ['Maria Santos', 'João Silva']
+
+    @pytest.mark.django_db
+    def test_unknown_ordering_rejected(self, api_client, professionals):
+        """Only whitelisted sort keys are accepted"""
+        response = api_client.get('/api/v1/professionals/?ordering=bio')
+        assert response.status_code == 400
+        assert 'ordering' in response.json()
+
+    @pytest.mark.django_db
+    def test_price_ordering_with_cursor_pagination(self, api_client, professionals):
+        """Price-sorted pages follow cursors without gaps, ties included"""
+        professionals[1].price_per_session = 150
+        professionals[1].save()
+
+        url = '/api/v1/professionals/?ordering=price&pagination=cursor&limit=1'
+        seen = []
+        while url:
+            data = api_client.get(url).json()
+            seen.extend(p['name'] for p in data['results'])
+            url = data['next']
+        # Equal prices: newest first
+        assert seen == ['Pedro Costa', 'Maria Santos', 'João Silva']
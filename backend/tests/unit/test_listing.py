@@ -0,0 +1,113 @@
+"""
+Unit tests for the ProfessionalListing read model.
+Tests signal maintenance, the rebuild command and the list endpoint reading it.
+"""
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from professionals.models import Professional, ProfessionalListing
+
+
+@pytest.mark.django_db
+class TestListingMaintenance:
+    """Test that signals keep the read model in step"""
+
+    def test_created_with_professional(self, create_professional):
+        """Creating a professional writes its listing row"""
+        professional = create_professional('ana', city='Santos', services=['Reiki', 'Yoga'])
+        listing = ProfessionalListing.objects.get(pk=professional.pk)
+        assert listing.name == 'Ana'
+        assert listing.city == 'Santos'
+        assert listing.city_normalized == 'santos'
+        assert listing.services == ['Reiki', 'Yoga']
+        assert listing.created_at == professional.created_at
+
+    def test_services_keep_professional_order(self, create_professional):
+        """Services are listed in the order the professional chose"""
+        professional = create_professional('ana', services=['Yoga', 'Florais', 'Reiki'])
+        assert ProfessionalListing.objects.get(pk=professional.pk).services == ['Yoga', 'Florais', 'Reiki']
+
+    def test_updated_with_professional(self, create_professional):
+        """List fields follow updates, including update_fields saves"""
+        professional = create_professional('ana')
+        professional.price_per_session = 90
+        professional.services = ['Florais']
+        professional.save(update_fields=['price_per_session', 'services'])
+
+        listing = ProfessionalListing.objects.get(pk=professional.pk)
+        assert listing.price_per_session == 90
+        assert listing.services == ['Florais']
+
+    def test_unrelated_update_skips_sync(self, create_professional):
+        """Saves that only touch non-list fields don't rewrite the row"""
+        professional = create_professional('ana')
+        professional.bio = 'Outra bio com bastante texto sobre terapias'
+        with CaptureQueriesContext(connection) as queries:
+            professional.save(update_fields=['bio'])
+        assert not any(ProfessionalListing._meta.db_table in q['sql'] for q in queries)
+
+    def test_deleted_with_professional(self, create_professional):
+        """Deleting the user cascades to the professional and its listing"""
+        professional = create_professional('ana')
+        professional.user.delete()
+        assert not ProfessionalListing.objects.filter(pk=professional.pk).exists()
+
+    def test_rolled_back_with_professional(self, create_professional):
+        """A failed transaction leaves neither row behind"""
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                professional = create_professional('ana')
+                raise RuntimeError
+        assert not ProfessionalListing.objects.filter(pk=professional.pk).exists()
+
+    def test_rebuild_command(self, create_professional):
+        """The command repairs rows changed behind the signals' back"""
+        professional = create_professional('ana')
+        Professional.objects.filter(pk=professional.pk).update(name='Ana Maria')
+        ProfessionalListing.objects.create(
+            id=999999, name='Fantasma', city='X', city_normalized='x', state='SP',
+            price_per_session=1, attendance_type='online', created_at=professional.created_at,
+        )
+
+        call_command('rebuild_professional_listing', stdout=io.StringIO())
+
+        assert ProfessionalListing.objects.get(pk=professional.pk).name == 'Ana Maria'
+        assert not ProfessionalListing.objects.filter(pk=999999).exists()
+
+
+@pytest.mark.django_db
+class TestListReadsListing:
+    """Test GET /api/v1/professionals/ served from the read model"""
+
+    def test_list_never_reads_professional_table(self, api_client, create_professional):
+        """Filtering, counting and serializing use only the narrow table"""
+        create_professional('ana')
+        create_professional('bia', state='RJ', city='Niterói')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/v1/professionals/?service=Reiki&state=SP&ordering=price')
+        assert response.status_code == 200
+        assert [p['name'] for p in response.json()['results']] == ['Ana']
+        assert not any('"professionals_professional"' in q['sql'] for q in queries)
+
+    def test_list_response_shape(self, api_client, create_professional):
+        """Cards keep the summary serializer's fields"""
+        create_professional('ana', services=['Reiki', 'Yoga'])
+        result = api_client.get('/api/v1/professionals/').json()['results'][0]
+        assert set(result) == {
+            'id', 'name', 'services', 'city', 'state',
+            'price_per_session', 'attendance_type', 'photo_url',
+        }
+        assert result['services'] == ['Reiki', 'Yoga']
+        assert result['photo_url'] is None
+
+    def test_full_text_search_joins_back(self, api_client, create_professional):
+        """q still searches name and bio, which only Professional holds"""
+        create_professional('ana', bio='Especialista em florais e ansiedade')
+        create_professional('bia')
+
+        data = api_client.get('/api/v1/professionals/?q=ansiedade').json()
+        assert [p['name'] for p in data['results']] == ['Ana']
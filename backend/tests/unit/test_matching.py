@@ -0,0 +1,169 @@
+"""
+Unit tests for preference matching.
+Tests the NumPy feature matrix on its own and the /professionals/match/ endpoint.
+"""
+from decimal import Decimal
+import time
+
+import pytest
+from professionals.matching import MatchMatrix
+from professionals import matching
+
+
+SAO_PAULO = (-23.55, -46.63)
+CAMPINAS = (-22.91, -47.06)
+
+ROWS = [
+    # id, services, price, attendance_type, latitude, longitude - oldest first
+    (1, ['Reiki', 'Yoga'], Decimal('100.00'), 'presencial', *SAO_PAULO),
+    (2, ['Acupuntura'], Decimal('300.00'), 'online', None, None),
+    (3, ['Reiki'], Decimal('150.00'), 'ambos', *CAMPINAS),
+    (4, ['Yoga'], Decimal('80.00'), 'presencial', *CAMPINAS),
+]
+
+
+@pytest.fixture
+def matrix():
+    """Matrix built from ROWS"""
+    m = MatchMatrix()
+    m.rebuild(ROWS)
+    return m
+
+
+def _ids(matches):
+    return [pk for pk, _, _ in matches]
+
+
+class TestMatchMatrix:
+    """Test MatchMatrix in isolation"""
+
+    def test_service_weights(self, matrix):
+        """Covering more of the weighted services scores higher"""
+        matches = matrix.top_k(4, services={'Reiki': 2, 'Yoga': 1})
+        assert _ids(matches)[0] == 1
+        assert matches[0][1] == pytest.approx(1.0)
+        scores = {pk: score for pk, score, _ in matches}
+        assert scores[3] == pytest.approx(2 / 3)
+        assert scores[4] == pytest.approx(1 / 3)
+        assert scores[2] == 0
+
+    def test_price_fit(self, matrix):
+        """Within budget is a perfect fit, twice the budget scores zero"""
+        _, components = matrix.score(budget=150)
+        assert list(components['price']) == pytest.approx([1.0, 0.0, 1.0, 1.0])
+
+    def test_distance(self, matrix):
+        """Nearby in-person professionals score higher; online sessions ignore distance"""
+        _, components = matrix.score(point=SAO_PAULO, max_distance_km=100)
+        closeness = components['distance']
+        assert closeness[0] == pytest.approx(1.0)
+        assert closeness[1] == 1.0  # online only
+        assert closeness[2] == 1.0  # 'ambos' can meet online
+        assert 0 < closeness[3] < 0.3  # ~85 km away, in person only
+
+    def test_in_person_preference_uses_distance_for_everyone(self, matrix):
+        """presencial preference scores distance even for 'ambos' professionals"""
+        _, components = matrix.score(point=SAO_PAULO, attendance_type='presencial', max_distance_km=100)
+        assert components['distance'][2] < 0.3
+        assert components['distance'][1] == 0  # no coordinates
+        assert list(components['attendance']) == [1, 0, 1, 1]
+
+    def test_online_preference_ignores_distance(self, matrix):
+        """Online-only clients aren't scored on distance"""
+        matches = matrix.top_k(4, point=SAO_PAULO, attendance_type='online')
+        assert 'distance' not in matches[0][2]
+        assert _ids(matches)[:2] == [3, 2]
+
+    def test_empty_profile_ranks_newest_first(self, matrix):
+        """With no preferences every score ties and the newest wins"""
+        assert _ids(matrix.top_k(2)) == [4, 3]
+
+    def test_upsert_and_remove(self, matrix):
+        """Writes update rows in place, append new ones and hide removed ones"""
+        matrix.upsert(2, ['Reiki', 'Yoga'], 90, 'online', None, None)
+        matrix.upsert(5, ['Reiki', 'Yoga'], 90, 'online', None, None)
+        matrix.remove(1)
+        matches = matrix.top_k(10, services={'Reiki': 1, 'Yoga': 1})
+        assert _ids(matches)[:2] == [5, 2]
+        assert 1 not in _ids(matches)
+        assert len(matrix) == 4
+
+    def test_scores_100k_profiles_in_milliseconds(self):
+        """Scoring and top-k over 100k rows stays well under 100 ms"""
+        services = ['Reiki', 'Yoga', 'Florais', 'Acupuntura']
+        attendance = ['presencial', 'online', 'ambos']
+        rows = [
+            (i, [services[i % 4], services[(i // 4) % 4]], 50 + i % 400, attendance[i % 3],
+             -30 + (i % 1000) / 100, -50 + (i % 700) / 100)
+            for i in range(100_000)
+        ]
+        m = MatchMatrix()
+        m.rebuild(rows)
+
+        started = time.perf_counter()
+        matches = m.top_k(
+            10,
+            services={'Reiki': 2, 'Yoga': 1},
+            budget=150,
+            point=SAO_PAULO,
+            attendance_type='presencial',
+        )
+        elapsed = time.perf_counter() - started
+        assert len(matches) == 10
+        assert elapsed < 0.1
+
+
+@pytest.mark.django_db
+class TestMatchEndpoint:
+    """Test POST /api/v1/professionals/match/"""
+
+    def test_ranks_by_preferences(self, api_client, create_professional):
+        """Best overall fit comes first, with per-component scores"""
+        create_professional('perto', services=['Reiki', 'Yoga'], price_per_session=120)
+        create_professional('longe', services=['Reiki'], city='Campinas', price_per_session=250)
+        create_professional('online', services=['Florais'], attendance_type='online', price_per_session=90)
+
+        response = api_client.post('/api/v1/professionals/match/', {
+            'services': {'reiki': 2, 'Yoga': 1},
+            'budget': 150,
+            'city': 'São Paulo',
+            'state': 'SP',
+            'attendance_type': 'presencial',
+            'limit': 2,
+        }, format='json')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 2
+        assert [p['name'] for p in data['results']] == ['Perto', 'Longe']
+        assert data['results'][0]['score'] == pytest.approx(1.0)
+        assert set(data['results'][0]['scores']) == {'services', 'price', 'distance', 'attendance'}
+
+    def test_matrix_follows_profile_changes(self, api_client, create_professional):
+        """Saves and deletes after the build are reflected immediately"""
+        first = create_professional('p1', services=['Reiki'])
+        api_client.post('/api/v1/professionals/match/', {}, format='json')  # builds the matrix
+        assert matching.get_matrix().is_built
+
+        second = create_professional('p2', services=['Yoga'])
+        first.delete()
+
+        data = api_client.post('/api/v1/professionals/match/', {'services': {'Yoga': 1}}, format='json').json()
+        assert [p['id'] for p in data['results']] == [second.id]
+
+    def test_invalid_service(self, api_client):
+        """Unknown services are rejected"""
+        response = api_client.post('/api/v1/professionals/match/', {'services': {'Astrologia': 1}}, format='json')
+        assert response.status_code == 400
+        assert 'services' in response.json()
+
+    def test_lat_requires_lon(self, api_client):
+        """lat and lon must be given together"""
+        response = api_client.post('/api/v1/professionals/match/', {'lat': -23.5}, format='json')
+        assert response.status_code == 400
+
+    def test_unknown_city(self, api_client):
+        """Cities without coordinates can't be used as a location"""
+        response = api_client.post('/api/v1/professionals/match/', {'city': 'Atlântida', 'state': 'SP'}, format='json')
+        assert response.status_code == 400
+        assert 'city' in response.json()
@@ -0,0 +1,80 @@
+"""
+Unit tests for the bootstrap metadata endpoint.
+Tests GET /api/v1/meta/ and its versioned, immutable variant.
+"""
+import gzip
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from professionals.constants import BRAZILIAN_STATES, SERVICE_TYPES
+from professionals.models import City
+
+
+@pytest.fixture
+def api_client():
+    """API client fixture"""
+    return APIClient()
+
+
+@pytest.mark.django_db
+class TestMetaEndpoint:
+    """Test GET /api/v1/meta/"""
+
+    def test_payload(self, api_client):
+        """Service types, states, attendance choices and cities per state"""
+        response = api_client.get('/api/v1/meta/')
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data['service_types'] == SERVICE_TYPES
+        assert data['states'] == BRAZILIAN_STATES
+        assert {'value': 'online', 'label': 'Online'} in data['attendance_types']
+        assert 'Campinas' in data['cities']['SP']
+        assert set(data['cities']) == set(BRAZILIAN_STATES)
+        assert data['version'] == response['X-Meta-Version']
+
+    def test_precompressed(self, api_client):
+        """Clients accepting gzip get the precompressed body"""
+        plain = api_client.get('/api/v1/meta/')
+        compressed = api_client.get('/api/v1/meta/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.content) == plain.content
+        assert compressed['ETag'] != plain['ETag']
+        assert 'Accept-Encoding' in compressed['Vary']
+
+    def test_revalidation(self, api_client):
+        """The unversioned URL must revalidate, and gets a 304 without queries"""
+        response = api_client.get('/api/v1/meta/')
+        assert 'no-cache' in response['Cache-Control']
+
+        with CaptureQueriesContext(connection) as queries:
+            revalidated = api_client.get('/api/v1/meta/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert revalidated.status_code == 304
+        assert len(queries) == 0
+
+    def test_versioned_url_immutable(self, api_client):
+        """The current version's URL is cacheable forever"""
+        version = api_client.get('/api/v1/meta/')['X-Meta-Version']
+        response = api_client.get(f'/api/v1/meta/{version}/')
+
+        assert response.status_code == 200
+        assert 'immutable' in response['Cache-Control']
+        assert 'max-age=31536000' in response['Cache-Control']
+        assert json.loads(response.content)['version'] == version
+
+    def test_city_change_new_version(self, api_client):
+        """A city write changes the version; old versioned URLs redirect"""
+        old = api_client.get('/api/v1/meta/')['X-Meta-Version']
+        City.objects.create(state='SP', name='Cidade Nova Paulista')
+
+        response = api_client.get('/api/v1/meta/')
+        assert response['X-Meta-Version'] != old
+        assert 'Cidade Nova Paulista' in response.json()['cities']['SP']
+
+        redirect = api_client.get(f'/api/v1/meta/{old}/')
+        assert redirect.status_code == 302
+        assert redirect['Location'] == f"/api/v1/meta/{response['X-Meta-Version']}/"
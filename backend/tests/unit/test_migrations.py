@@ -0,0 +1,50 @@
+"""
+Unit tests for the professionals data migrations.
+Each test migrates back to just before a migration, writes rows with the
+historical models and migrates forward again.
+"""
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+
+def _migrate(target):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate([target])
+    return executor.loader.project_state([target]).apps
+
+
+@pytest.fixture
+def migrator():
+    """Migrate to the given node; the schema is brought back to the latest one afterwards"""
+    yield _migrate
+    _migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('professionals')[0])
+
+
+@pytest.mark.django_db(transaction=True)
+class TestServiceLinksBackfill:
+    """Test 0007_professional_service populating the lookup table"""
+
+    def test_existing_services_are_linked(self, migrator):
+        """Professionals created before the lookup table get one row per service"""
+        apps = migrator(('professionals', '0006_populate_brazilian_cities'))
+        User = apps.get_model('auth', 'User')
+        Professional = apps.get_model('professionals', 'Professional')
+        user = User.objects.create(username='ana', email='ana@example.com')
+        professional = Professional.objects.create(
+            user=user,
+            name='Ana',
+            bio='Terapeuta holística com experiência',
+            services=['Reiki', 'Yoga', 'Reiki'],
+            city='São Paulo',
+            state='SP',
+            price_per_session=150,
+            attendance_type='presencial',
+            email='ana@example.com',
+        )
+
+        apps = migrator(('professionals', '0007_professional_service'))
+        ProfessionalService = apps.get_model('professionals', 'ProfessionalService')
+        services = ProfessionalService.objects.filter(professional_id=professional.id)
+        assert sorted(services.values_list('service', flat=True)) == ['Reiki', 'Yoga']
@@ -0,0 +1,168 @@
+"""
+Unit tests for professional list pagination.
+Tests keyset (cursor) mode and that offset mode is unchanged.
+"""
+import base64
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from professionals.models import Professional
+
+
+@pytest.fixture
+def professionals():
+    """Five professionals with distinct creation times, two sharing one"""
+    base = timezone.now()
+    created = []
+    for i in range(5):
+        user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='testpass123')
+        professional = Professional.objects.create(
+            user=user,
+            name=f'Profissional {chr(65 + i)}',
+            bio='Terapeuta holístico com experiência',
+            services=['Reiki'],
+            city='São Paulo',
+            state='SP',
+            price_per_session=100 + i,
+            attendance_type='presencial',
+            email=f'user{i}@example.com',
+        )
+        created.append(professional)
+    # user3 and user4 share a timestamp so the id tie-breaker matters
+    for i, professional in enumerate(created):
+        stamp = base + timedelta(minutes=min(i, 3))
+        Professional.objects.filter(pk=professional.pk).update(created_at=stamp)
+    return created
+
+
+def _expected_order(professionals):
+    return [p.id for p in sorted(
+        Professional.objects.filter(pk__in=[p.pk for p in professionals]),
+        key=lambda p: (p.created_at, p.id),
+        reverse=True,
+    )]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test ?pagination=cursor on GET /api/v1/professionals/"""
+
+    def test_walk_forward_covers_every_row_once(self, api_client, professionals):
+        """Following next links returns all rows in (-created_at, -id) order"""
+        url = '/api/v1/professionals/?pagination=cursor&limit=2'
+        seen = []
+        pages = 0
+        while url:
+            data = api_client.get(url).json()
+            assert 'count' not in data
+            seen.extend(p['id'] for p in data['results'])
+            url = data['next']
+            pages += 1
+        assert seen == _expected_order(professionals)
+        assert pages == 3
+
+    def test_previous_link_returns_previous_page(self, api_client, professionals):
+        """previous walks back to the same rows"""
+        first = api_client.get('/api/v1/professionals/?pagination=cursor&limit=2').json()
+        assert first['previous'] is None
+
+        second = api_client.get(first['next']).json()
+        back = api_client.get(second['previous']).json()
+        assert [p['id'] for p in back['results']] == [p['id'] for p in first['results']]
+        assert back['previous'] is None
+        assert back['next'] is not None
+
+    def test_cursor_respects_filters(self, api_client, professionals):
+        """Filters stay applied across pages"""
+        professionals[0].services = ['Yoga']
+        professionals[0].save()
+
+        url = '/api/v1/professionals/?service=Reiki&pagination=cursor&limit=3'
+        first = api_client.get(url).json()
+        second = api_client.get(first['next']).json()
+        ids = [p['id'] for p in first['results'] + second['results']]
+        assert professionals[0].id not in ids
+        assert len(ids) == 4
+        assert second['next'] is None
+
+    def test_invalid_cursor_returns_404(self, api_client, professionals):
+        """Tampered cursors are rejected"""
+        response = api_client.get('/api/v1/professionals/?cursor=not-a-cursor')
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('values', [
+        ['not-a-date', 1],
+        ['2026-01-01T00:00:00+00:00', 'abc'],
+        [{'a': 1}, 1],
+        ['2026-01-01T00:00:00+00:00', None],
+    ])
+    def test_tampered_cursor_values_return_404(self, api_client, professionals, values):
+        """Well-formed cursors with values of the wrong type are rejected, not a 500"""
+        payload = json.dumps({'v': values, 'r': 0}).encode()
+        cursor = base64.urlsafe_b64encode(payload).decode().rstrip('=')
+        response = api_client.get(f'/api/v1/professionals/?cursor={cursor}')
+        assert response.status_code == 404
+
+    def test_distance_cursor_walks_pages(self, api_client, professionals):
+        """Cursors over an annotation (distance_km) parse with its output field"""
+        url = '/api/v1/professionals/?lat=-23.55&lon=-46.63&ordering=distance&pagination=cursor&limit=2'
+        seen = []
+        while url:
+            data = api_client.get(url).json()
+            seen.extend(p['id'] for p in data['results'])
+            url = data['next']
+        assert sorted(seen) == sorted(p.id for p in professionals)
+
+    def test_offset_mode_unchanged(self, api_client, professionals):
+        """Without a cursor the response keeps count/next/previous/results"""
+        data = api_client.get('/api/v1/professionals/?limit=2&offset=2').json()
+        assert data['count'] == 5
+        assert [p['id'] for p in data['results']] == _expected_order(professionals)[2:4]
+
+
+@pytest.mark.django_db
+class TestCachedCounts:
+    """Test count caching and ?count=false in offset mode"""
+
+    def test_count_is_cached_per_filter_set(self, api_client, professionals):
+        """A repeated (equivalent) filter set reuses the cached count"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.get('/api/v1/professionals/?state=SP&service=Reiki')
+        with CaptureQueriesContext(connection) as queries:
+            data = api_client.get('/api/v1/professionals/?service=reiki&state=sp&offset=0').json()
+        assert data['count'] == 5
+        assert not any('COUNT(' in q['sql'].upper() for q in queries)
+
+    def test_write_invalidates_cached_count(self, api_client, professionals, django_capture_on_commit_callbacks):
+        """Saving a professional bumps the listing version"""
+        assert api_client.get('/api/v1/professionals/?service=Reiki').json()['count'] == 5
+
+        professionals[0].services = ['Yoga']
+        with django_capture_on_commit_callbacks(execute=True):
+            professionals[0].save()
+
+        assert api_client.get('/api/v1/professionals/?service=Reiki').json()['count'] == 4
+
+    def test_count_false_skips_count(self, api_client, professionals):
+        """count is null and next is still computed"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            data = api_client.get('/api/v1/professionals/?count=false&limit=2').json()
+        assert data['count'] is None
+        assert len(data['results']) == 2
+        assert 'offset=2' in data['next']
+        assert not any('COUNT(' in q['sql'].upper() for q in queries)
+
+    def test_count_false_last_page(self, api_client, professionals):
+        """No next link once the rows run out"""
+        data = api_client.get('/api/v1/professionals/?count=false&limit=2&offset=4').json()
+        assert len(data['results']) == 1
+        assert data['next'] is None
+        assert 'offset=2' in data['previous']
@@ -0,0 +1,80 @@
+"""
+Unit tests for the per-process structure holder.
+"""
+from professionals import process_local
+from professionals.process_local import ProcessLocalStructure
+
+
+class FakeStructure:
+    def __init__(self):
+        self.built_at = None
+        self.rows = []
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def rebuild(self, rows):
+        self.rows = list(rows)
+        self.built_at = process_local.time.monotonic()
+
+
+class TestProcessLocalStructure:
+    """Test building, TTL rebuilds and reset"""
+
+    def _holder(self, loads):
+        return ProcessLocalStructure(
+            'test', FakeStructure, lambda: loads.append(1) or [len(loads)],
+            ttl_setting='TEST_STRUCTURE_TTL',
+        )
+
+    def test_built_once_then_reused(self, settings):
+        """The first get() builds; later ones reuse the build within the TTL"""
+        settings.TEST_STRUCTURE_TTL = 60
+        loads = []
+        holder = self._holder(loads)
+        assert not holder.is_built
+        assert holder.get().rows == [1]
+        assert holder.get().rows == [1]
+        assert len(loads) == 1
+
+    def test_rebuilt_after_ttl(self, settings, monkeypatch):
+        """A build older than the TTL is replaced on the next get()"""
+        settings.TEST_STRUCTURE_TTL = 60
+        now = [1000.0]
+        monkeypatch.setattr(process_local.time, 'monotonic', lambda: now[0])
+        loads = []
+        holder = self._holder(loads)
+        holder.get()
+        now[0] += 61
+        assert holder.get().rows == [2]
+
+    def test_reset(self, settings):
+        """reset() forgets the build"""
+        settings.TEST_STRUCTURE_TTL = 60
+        holder = self._holder([])
+        holder.get()
+        holder.reset()
+        assert not holder.is_built
+
+    def test_rebuilt_when_version_moves_on(self, settings):
+        """A build made under another listing version is replaced at once"""
+        settings.TEST_STRUCTURE_TTL = 60
+        loads = []
+        holder = self._holder(loads)
+        assert holder.get(version=1).rows == [1]
+        assert holder.get(version=1).rows == [1]
+        assert holder.get(version=2).rows == [2]
+        assert holder.version == 2
+
+    def test_none_while_rebuilding_for_new_version(self, settings):
+        """Callers don't get a build older than their version while another thread rebuilds"""
+        settings.TEST_STRUCTURE_TTL = 60
+        holder = self._holder([])
+        holder.get(version=1)
+        with holder._build_lock:
+            assert holder.get(version=2) is None
+            assert holder.get(version=1) is holder.structure
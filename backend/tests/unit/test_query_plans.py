@@ -0,0 +1,185 @@
+"""
+Query plan regression tests for the professional list.
+Captures EXPLAIN for each filter combination ProfessionalFilter allows, on
+the ProfessionalListing read model the list endpoint queries, and fails when
+the plan falls back to a full scan (of the table, or of an index for a
+filtered query) or an explicit sort.
+Runs against whichever database the test settings use (SQLite or PostgreSQL).
+"""
+import re
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from professionals.filters import ProfessionalListingFilter
+from professionals.models import Professional, ProfessionalListing
+
+
+PAGE_SIZE = 12
+
+# No filter: walking an ordering index is the plan, and it stops once the
+# page is full. No table scan, no sort
+ORDERED_WALK_COMBINATIONS = [
+    {},
+    {'ordering': 'newest'},
+    {'ordering': 'price'},
+    {'ordering': '-price'},
+]
+
+# Filter combinations the indexes must serve in order: the filter is an index
+# search (no walk over the whole table or index), and no sort
+INDEXED_COMBINATIONS = [
+    {'state': 'SP'},
+    {'attendance_type': 'online'},
+    {'state': 'SP', 'attendance_type': 'online'},
+    {'state': 'sp', 'attendance_type': 'ONLINE'},
+    {'state': 'SP', 'service': 'Reiki'},
+    {'attendance_type': 'online', 'service': 'Reiki,Yoga'},
+    {'state': 'SP', 'city': 'campinas'},
+    {'state': 'SP', 'ordering': 'price'},
+    {'state': 'SP', 'ordering': '-price'},
+    {'price_min': 100, 'price_max': 200, 'ordering': 'price'},
+    {'state': 'SP', 'price_max': 200, 'ordering': '-price'},
+]
+
+# Combinations that must not scan the table but legitimately sort: the
+# candidates come from a different index than the ordering (relevance,
+# distance, a price range or a service lookup), or from several ranges of one
+# index (multi-value IN), and only the matches are sorted
+SORTED_COMBINATIONS = [
+    {'service': 'Reiki'},
+    {'price_min': 100, 'price_max': 200},
+    {'state': 'SP', 'price_max': 200},
+    {'state': 'SP', 'attendance_type': 'presencial', 'price_min': 100, 'price_max': 300},
+    {'q': 'reiki'},
+    {'lat': -23.55, 'lon': -46.63, 'radius_km': 25},
+    {'lat': -23.55, 'lon': -46.63, 'radius_km': 25, 'ordering': 'distance'},
+    {'state': 'SP,RJ'},
+    {'state': 'SP,RJ', 'attendance_type': 'online,ambos'},
+    {'service': 'Reiki,Yoga', 'state': 'SP,RJ'},
+]
+
+TABLE = ProfessionalListing._meta.db_table
+
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(rf'Seq Scan on {TABLE}\b'),
+    # 'SCAN <table>' without 'USING ... INDEX' reads every row
+    'sqlite': re.compile(rf'\bSCAN {TABLE}\s*$', re.MULTILINE),
+}
+# Plans that visit every row of the table or of one of its indexes. SQLite
+# only uses an index to narrow the rows in 'SEARCH <table> USING ... INDEX
+# (<condition>)'; 'SCAN <table> USING INDEX' walks all of it
+FULL_SCAN_PATTERNS = {
+    'postgresql': SEQ_SCAN_PATTERNS['postgresql'],
+    'sqlite': re.compile(rf'\bSCAN {TABLE}\b'),
+}
+SORT_PATTERNS = {
+    'postgresql': re.compile(r'\bSort\b'),
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+}
+
+
+def query_plan(queryset):
+    """
+    EXPLAIN output for queryset
+    On PostgreSQL, sequential scans and sorts are priced out first, so they
+    only show up when no index can produce the result
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.explain()
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+    return queryset.explain()
+
+
+def list_queryset(params):
+    """The first page of the list endpoint's query for params"""
+    filterset = ProfessionalListingFilter(data=params, queryset=ProfessionalListing.objects.all())
+    assert filterset.is_valid(), filterset.errors
+    return filterset.qs[:PAGE_SIZE]
+
+
+def _combination_id(params):
+    return '&'.join(f'{key}={value}' for key, value in params.items()) or 'unfiltered'
+
+
+@pytest.fixture
+def professionals():
+    """A few rows so every filter has something to match"""
+    rows = [
+        ('joao', ['Reiki', 'Yoga'], 'São Paulo', 'SP', 'presencial', 150),
+        ('maria', ['Acupuntura'], 'Campinas', 'SP', 'online', 200),
+        ('pedro', ['Reiki'], 'Rio de Janeiro', 'RJ', 'ambos', 100),
+    ]
+    for username, services, city, state, attendance_type, price in rows:
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+        Professional.objects.create(
+            user=user,
+            name=username.title(),
+            bio='Terapeuta holístico, trabalho com reiki',
+            services=services,
+            city=city,
+            state=state,
+            price_per_session=price,
+            attendance_type=attendance_type,
+            email=f'{username}@example.com',
+        )
+
+
+def _plan_or_skip(params):
+    try:
+        return query_plan(list_queryset(params))
+    except EmptyResultSet:
+        pytest.skip('filter short-circuits to an empty result without a query')
+
+
+@pytest.mark.django_db
+class TestListQueryPlans:
+    """EXPLAIN every supported filter combination"""
+
+    @pytest.mark.parametrize('params', ORDERED_WALK_COMBINATIONS, ids=_combination_id)
+    def test_ordered_walk(self, professionals, params):
+        """Unfiltered pages walk an index in list order: no table scan, no sort"""
+        plan = _plan_or_skip(params)
+        assert not SEQ_SCAN_PATTERNS[connection.vendor].search(plan), plan
+        assert not SORT_PATTERNS[connection.vendor].search(plan), plan
+
+    @pytest.mark.parametrize('params', INDEXED_COMBINATIONS, ids=_combination_id)
+    def test_indexed_combination(self, professionals, params):
+        """Rows come from an index search in list order: no full scan, no sort"""
+        plan = _plan_or_skip(params)
+        assert not FULL_SCAN_PATTERNS[connection.vendor].search(plan), plan
+        assert not SORT_PATTERNS[connection.vendor].search(plan), plan
+
+    @pytest.mark.parametrize('params', SORTED_COMBINATIONS, ids=_combination_id)
+    def test_sorted_combination(self, professionals, params):
+        """Candidates come from an index search; only the matches are sorted"""
+        plan = _plan_or_skip(params)
+        assert not FULL_SCAN_PATTERNS[connection.vendor].search(plan), plan
+
+    def test_city_search_uses_trigram_index(self, professionals):
+        """
+        A contains-style city filter can't use a btree index; on PostgreSQL
+        the trigram GIN index on city_normalized serves it
+        """
+        if connection.vendor != 'postgresql':
+            pytest.skip('trigram index is PostgreSQL only')
+        plan = _plan_or_skip({'city': 'paulo'})
+        assert not FULL_SCAN_PATTERNS['postgresql'].search(plan), plan
+
+    def test_harness_detects_sort_and_scan(self, professionals):
+        """Sanity check: an unindexed ordering is reported"""
+        plan = query_plan(ProfessionalListing.objects.order_by('name')[:PAGE_SIZE])
+        assert SORT_PATTERNS[connection.vendor].search(plan)
+        if connection.vendor == 'sqlite':
+            assert SEQ_SCAN_PATTERNS['sqlite'].search(plan)
+
+    def test_harness_detects_full_index_walk(self, professionals):
+        """Sanity check: a filter answered by walking a whole index is reported"""
+        if connection.vendor != 'sqlite':
+            pytest.skip('SQLite plan wording')
+        plan = query_plan(list_queryset({'city': 'paulo'}))
+        assert 'USING INDEX' in plan
+        assert FULL_SCAN_PATTERNS['sqlite'].search(plan)
@@ -0,0 +1,187 @@
+"""
+Unit tests for the in-memory bitmap search index.
+Tests the index on its own and the list endpoint served from it.
+"""
+from decimal import Decimal
+import time
+
+import pytest
+from professionals.caching import bump_listing_version
+from professionals.models import Professional
+from professionals.search_index import ProfessionalSearchIndex
+from professionals import search_index
+
+
+ROWS = [
+    # id, services, state, attendance_type, price - oldest first
+    (1, ['Reiki', 'Yoga'], 'SP', 'presencial', Decimal('100.00')),
+    (2, ['Acupuntura'], 'RJ', 'online', Decimal('200.00')),
+    (3, ['Reiki'], 'SP', 'online', Decimal('150.00')),
+    (4, ['Yoga', 'Tai Chi'], 'MG', 'ambos', Decimal('80.00')),
+]
+
+
+@pytest.fixture
+def index():
+    """Index built from ROWS"""
+    idx = ProfessionalSearchIndex()
+    idx.rebuild(ROWS)
+    return idx
+
+
+class TestProfessionalSearchIndex:
+    """Test ProfessionalSearchIndex in isolation"""
+
+    def test_unfiltered_returns_newest_first(self, index):
+        """Highest slot (newest) comes first"""
+        ids, total = index.search()
+        assert ids == [4, 3, 2, 1]
+        assert total == 4
+
+    def test_facets_are_and_ed(self, index):
+        """Different facets narrow each other"""
+        ids, total = index.search(services=['Reiki'], states=['SP'], attendance_types=['online'])
+        assert ids == [3]
+        assert total == 1
+
+    def test_values_within_facet_are_or_ed(self, index):
+        """Several values for one facet widen the match"""
+        ids, _ = index.search(states=['RJ', 'MG'])
+        assert ids == [4, 2]
+
+    def test_match_all_services(self, index):
+        """match_all_services requires every service"""
+        ids, _ = index.search(services=['Reiki', 'Yoga'], match_all_services=True)
+        assert ids == [1]
+
+    def test_price_range_is_inclusive(self, index):
+        """price_min/price_max behave like gte/lte"""
+        ids, _ = index.search(price_min=Decimal('100'), price_max=Decimal('150'))
+        assert ids == [3, 1]
+
+    def test_state_and_attendance_case_insensitive(self, index):
+        """Facet values are compared like the iexact database filters"""
+        ids, _ = index.search(states=['sp'], attendance_types=['ONLINE'])
+        assert ids == [3]
+
+    def test_pagination(self, index):
+        """offset/limit slice the ordered ids, total covers all matches"""
+        ids, total = index.search(offset=1, limit=2)
+        assert ids == [3, 2]
+        assert total == 4
+
+    def test_upsert_new_professional_is_newest(self, index):
+        """New rows take the next slot, so they sort first"""
+        index.upsert(5, ['Reiki'], 'SP', 'online', 120)
+        ids, _ = index.search(services=['Reiki'])
+        assert ids == [5, 3, 1]
+
+    def test_upsert_existing_replaces_facets(self, index):
+        """Updating a professional moves it between facet values and prices"""
+        index.upsert(1, ['Florais'], 'BA', 'online', Decimal('300.00'))
+        assert index.search(services=['Reiki'])[0] == [3]
+        assert index.search(states=['BA'])[0] == [1]
+        assert index.search(price_min=Decimal('250'))[0] == [1]
+
+    def test_remove(self, index):
+        """Removed professionals never match"""
+        index.remove(3)
+        ids, total = index.search(services=['Reiki'])
+        assert ids == [1]
+        assert total == 1
+        assert len(index) == 3
+
+    def test_rebuild_100k_profiles_under_a_second(self):
+        """Full rebuild stays well under a second at 100k profiles"""
+        states = ['SP', 'RJ', 'MG', 'BA', 'PR']
+        rows = [
+            (i, ['Reiki', 'Yoga'] if i % 2 else ['Florais'], states[i % 5],
+             'online' if i % 3 else 'presencial', Decimal(50 + i % 400))
+            for i in range(100_000)
+        ]
+        idx = ProfessionalSearchIndex()
+        started = time.perf_counter()
+        idx.rebuild(rows)
+        assert time.perf_counter() - started < 1.0
+        assert len(idx) == 100_000
+
+
+@pytest.fixture
+def search_index_enabled(settings):
+    """Enable the index for the test and start from an empty one"""
+    settings.PROFESSIONAL_SEARCH_INDEX = True
+    search_index.reset_index()
+    yield
+    search_index.reset_index()
+
+
+@pytest.mark.django_db
+class TestListFromSearchIndex:
+    """Test GET /api/v1/professionals/ served by the search index"""
+
+    def test_list_matches_database_results(self, api_client, search_index_enabled, create_professional):
+        """Index answers equal the regular filtered query"""
+        create_professional('p1', services=['Reiki'], state='SP', price_per_session=100)
+        create_professional('p2', services=['Yoga'], state='RJ', price_per_session=200)
+        create_professional('p3', services=['Reiki', 'Yoga'], state='SP', price_per_session=300)
+
+        response = api_client.get('/api/v1/professionals/?service=Reiki&state=SP&price_max=250')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 1
+        assert [p['name'] for p in data['results']] == ['P1']
+        assert search_index.get_index().is_built
+
+    def test_signals_keep_index_current(self, api_client, search_index_enabled, create_professional):
+        """Saves and deletes after the build show up immediately"""
+        first = create_professional('p1', services=['Reiki'])
+        api_client.get('/api/v1/professionals/')  # builds the index
+
+        second = create_professional('p2', services=['Reiki'])
+        first.delete()
+
+        data = api_client.get('/api/v1/professionals/?service=Reiki').json()
+        assert [p['id'] for p in data['results']] == [second.id]
+        assert data['count'] == 1
+
+    def test_rebuilt_after_write_in_another_process(self, api_client, search_index_enabled, create_professional):
+        """
+        A write this process's signals never saw still shows up once the
+        listing version moves on, instead of being cached under it
+        """
+        professional = create_professional('p1', services=['Reiki'])
+        assert api_client.get('/api/v1/professionals/?service=Reiki').json()['count'] == 1
+
+        Professional.objects.filter(pk=professional.pk).update(services=['Yoga'])
+        bump_listing_version()
+
+        assert api_client.get('/api/v1/professionals/?service=Reiki').json()['count'] == 0
+        assert api_client.get('/api/v1/professionals/?service=Yoga').json()['count'] == 1
+
+    def test_pagination_links(self, api_client, search_index_enabled, create_professional):
+        """Pagination metadata matches LimitOffsetPagination"""
+        for i in range(3):
+            create_professional(f'p{i}')
+
+        data = api_client.get('/api/v1/professionals/?limit=2').json()
+        assert data['count'] == 3
+        assert len(data['results']) == 2
+        assert 'offset=2' in data['next']
+        assert data['previous'] is None
+
+    def test_unsupported_params_use_database(self, api_client, search_index_enabled, create_professional):
+        """Parameters the index can't answer fall back to the database"""
+        create_professional('p1', city='Campinas')
+        data = api_client.get('/api/v1/professionals/?city=campinas').json()
+        assert data['count'] == 1
+        assert not search_index._index.is_built
+
+    def test_multi_value_params(self, api_client, search_index_enabled, create_professional):
+        """Comma-separated and repeated values reach the index as lists"""
+        create_professional('p1', state='SP', attendance_type='online')
+        create_professional('p2', state='RJ', attendance_type='ambos')
+        create_professional('p3', state='MG', attendance_type='online')
+
+        data = api_client.get('/api/v1/professionals/?state=SP,RJ&attendance_type=online&attendance_type=ambos').json()
+        assert data['count'] == 2
+        assert search_index.get_index().is_built
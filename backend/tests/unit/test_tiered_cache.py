@@ -0,0 +1,156 @@
+"""
+Unit tests for the two-tier cache.
+Runs against the locmem cache backend the test settings use as L2.
+"""
+import pytest
+from django.core.cache import cache
+from professionals import tiered_cache
+from professionals.tiered_cache import TieredCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(tiered_cache.time, 'monotonic', fake)
+    return fake
+
+
+class TestTieredCache:
+    """Test TieredCache with the locmem backend as the shared tier"""
+
+    def test_l1_hit_skips_shared_cache(self):
+        """Once read, a value is served from process memory"""
+        tiered = TieredCache('test', maxsize=10)
+        tiered.set('a', 1)
+        cache.delete('test:a')  # only L1 has it now
+        assert tiered.get('a') == 1
+        assert tiered.stats()['l1_hits'] == 1
+
+    def test_l2_fills_l1(self):
+        """A value another process stored is read from L2 once"""
+        tiered = TieredCache('test', maxsize=10)
+        cache.set('test:a', 'shared')
+        assert tiered.get('a') == 'shared'
+        assert tiered.get('a') == 'shared'
+        stats = tiered.stats()
+        assert (stats['l2_hits'], stats['l1_hits'], stats['misses']) == (1, 1, 0)
+
+    def test_miss(self):
+        """Missing keys return the default and count as misses"""
+        tiered = TieredCache('test')
+        assert tiered.get('nope', 'default') == 'default'
+        assert tiered.stats()['misses'] == 1
+
+    def test_lru_eviction(self):
+        """Beyond maxsize, the least recently used entry leaves L1"""
+        tiered = TieredCache('test', maxsize=2)
+        tiered.set('a', 1)
+        tiered.set('b', 2)
+        tiered.get('a')
+        tiered.set('c', 3)
+        cache.clear()
+        assert tiered.get('a') == 1
+        assert tiered.get('b') is None
+        assert tiered.get('c') == 3
+        assert tiered.stats()['size'] == 2
+
+    def test_ttl(self, clock):
+        """L1 entries expire after ttl and are re-read from L2"""
+        tiered = TieredCache('test', ttl=5)
+        tiered.set('a', 1)
+        cache.set('test:a', 2)  # changed by another process
+        clock.now += 4
+        assert tiered.get('a') == 1
+        clock.now += 2
+        assert tiered.get('a') == 2
+
+    def test_version_change_drops_l1(self, clock):
+        """Another process's version bump drops L1 copies once the version is re-read"""
+        cache.set('test-version', 1)
+        tiered = TieredCache('test', version_key='test-version', version_ttl=1)
+        tiered.set('a', 1)
+        cache.set('test:a', 2)
+        assert tiered.get('a') == 1
+
+        cache.incr('test-version')
+        assert tiered.get('a') == 1
+        clock.now += 1
+        assert tiered.get('a') == 2
+
+    def test_forget_version_sees_own_bump(self):
+        """After bumping here, forget_version makes the change visible at once"""
+        cache.set('test-version', 1)
+        tiered = TieredCache('test', version_key='test-version')
+        tiered.set('a', 1)
+        cache.set('test:a', 2)
+
+        cache.incr('test-version')
+        tiered_cache.forget_version('test-version')
+        assert tiered.get('a') == 2
+
+    def test_l1_hit_reads_nothing_from_l2(self, monkeypatch):
+        """With the version remembered, an L1 hit makes no shared-cache call"""
+        cache.set('test-version', 1)
+        tiered = TieredCache('test', version_key='test-version')
+        tiered.set('a', 1)
+
+        calls = []
+        monkeypatch.setattr(tiered_cache.cache, 'get', lambda *args, **kwargs: calls.append(args))
+        assert tiered.get('a') == 1
+        assert calls == []
+
+    def test_add(self):
+        """add() never replaces an existing shared value"""
+        tiered = TieredCache('test')
+        assert tiered.add('a', 1)
+        assert not tiered.add('a', 2)
+        assert tiered.get('a') == 1
+
+    def test_delete(self):
+        """delete() removes the value from both tiers"""
+        tiered = TieredCache('test')
+        tiered.set('a', 1)
+        tiered.delete('a')
+        assert tiered.get('a') is None
+        assert cache.get('test:a') is None
+
+    def test_get_or_set(self):
+        """compute runs only on a miss"""
+        tiered = TieredCache('test')
+        calls = []
+        assert tiered.get_or_set('a', lambda: calls.append(1) or 'value') == 'value'
+        assert tiered.get_or_set('a', lambda: calls.append(1) or 'other') == 'value'
+        assert len(calls) == 1
+
+    def test_hit_ratio(self):
+        """hit_ratio counts both tiers, l1_hit_ratio only memory hits"""
+        tiered = TieredCache('test')
+        assert tiered.stats()['hit_ratio'] is None
+        tiered.get('a')
+        tiered.set('a', 1)
+        tiered.get('a')
+        tiered.get('a')
+        cache.set('test:b', 2)
+        tiered.get('b')
+        stats = tiered.stats()
+        assert stats['hit_ratio'] == pytest.approx(3 / 4)
+        assert stats['l1_hit_ratio'] == pytest.approx(2 / 4)
+
+        tiered.reset_stats()
+        assert tiered.stats()['hit_ratio'] is None
+
+    def test_clear_all_local(self):
+        """clear_all_local() empties every instance's L1"""
+        first, second = TieredCache('one'), TieredCache('two')
+        first.set('a', 1)
+        second.set('a', 2)
+        tiered_cache.clear_all_local()
+        assert first.stats()['size'] == second.stats()['size'] == 0
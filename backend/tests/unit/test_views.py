@@ -9,6 +9,7 @@ from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from professionals.models import Professional
 from professionals.constants import SERVICE_TYPES
+from professionals.text import collation_key
 
 
 @pytest.fixture
@@ -75,13 +76,13 @@ class TestProfessionalViewSet:
 
     @pytest.mark.django_db
     def test_get_serializer_class_list(self, user, professional):
-        """Test that list action uses ProfessionalSummarySerializer"""
+        """Test that list action serializes the ProfessionalListing read model"""
         from professionals.views import ProfessionalViewSet
-        from professionals.serializers import ProfessionalSummarySerializer
+        from professionals.serializers import ProfessionalListingSerializer
 
         viewset = ProfessionalViewSet()
         viewset.action = 'list'
-        assert viewset.get_serializer_class() == ProfessionalSummarySerializer
+        assert viewset.get_serializer_class() == ProfessionalListingSerializer
 
     @pytest.mark.django_db
     def test_get_serializer_class_detail(self, user, professional):
@@ -434,15 +435,16 @@ class TestProfessionalViewSet:
         City.objects.get_or_create(state='SP', name='Santos')
         
         response = api_client.get('/api/v1/professionals/cities/SP/')
+        data = response.json()
         
         assert response.status_code == 200
-        assert response.data['state'] == 'SP'
-        assert response.data['count'] >= 3
-        assert 'São Paulo' in response.data['cities']
-        assert 'Campinas' in response.data['cities']
-        assert 'Santos' in response.data['cities']
-        # Cities should be sorted
-        assert response.data['cities'] == sorted(response.data['cities'])
+        assert data['state'] == 'SP'
+        assert data['count'] >= 3
+        assert 'São Paulo' in data['cities']
+        assert 'Campinas' in data['cities']
+        assert 'Santos' in data['cities']
+        # Cities should be sorted (Portuguese order: accents don't push names last)
+        assert data['cities'] == sorted(data['cities'], key=collation_key)
 
     @pytest.mark.django_db
     def test_cities_endpoint_invalid_state(self, api_client):
@@ -473,5 +475,5 @@ class TestProfessionalViewSet:
         response = api_client.get('/api/v1/professionals/cities/mg/')
         
         assert response.status_code == 200
-        assert response.data['state'] == 'MG'
-        assert 'Belo Horizonte' in response.data['cities']
\ No newline at end of file
+        assert response.json()['state'] == 'MG'
+        assert 'Belo Horizonte' in response.json()['cities']
\ No newline at end of file